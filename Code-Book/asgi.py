@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Code-Book.settings')
+os.environ.setdefault('CODE_BOOK_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+
+# Imported once the apps are loaded by get_asgi_application().
+from core.concurrency import warm_read_workers  # noqa: E402
+
+warm_read_workers()
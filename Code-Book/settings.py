@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,32 +42,46 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'authentication.apps.AuthenticationConfig',
     'core.apps.CoreConfig',
+    'api.apps.ApiConfig',
     'model_utils',
     'bootstrap5',
     'django_forms_bootstrap',
     'crispy_bootstrap5',
     'sortedm2m',
+    'rest_framework',
 ]
 
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetCursorPagination',
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.NamespaceVersioning',
+    'ALLOWED_VERSIONS': ['v1'],
+}
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 MIDDLEWARE = [
+    'core.middleware.QueryInstrumentationMiddleware',
+    'core.middleware.RequestProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'Code-Book.urls'
 
+# Django templates, with the render time of every request recorded (see core.template_backends)
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -80,18 +96,92 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'Code-Book.wsgi.application'
+ASGI_APPLICATION = 'Code-Book.asgi.application'
+
+# Serve the detail pages with their async views, which read concurrently. Enabled by asgi.py for ASGI deployments,
+# WSGI deployments keep the sync views.
+ASYNC_VIEWS = os.environ.get('CODE_BOOK_ASYNC_VIEWS') == '1'
+
+# The number of threads the async views run their concurrent reads in. Each thread keeps its own database connection,
+# so this also bounds the connections opened by the async views per process.
+ASYNC_READ_WORKERS = 4
 
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connections are kept open between requests (CONN_MAX_AGE) and set up by core.signals.configure_sqlite_connection
+# with SQLITE_PRAGMAS. Read replicas are given as a comma separated list of SQLite files in CODE_BOOK_DB_REPLICAS
+# (refreshed from the primary by the sync_sqlite_replicas command), see core.routers.
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+        },
     }
 }
 
+for index, replica in enumerate(filter(None, os.environ.get('CODE_BOOK_DB_REPLICAS', '').split(','))):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Seconds the reads of a session stay on the primary after it made a write request
+REPLICA_PIN_SECONDS = 10
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# Whether the process is running the test suite
+TESTING = sys.argv[1:2] == ['test']
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/ref/settings/#caches
+
+# The skill posting lists, the skill catalog version and the rendered cards must be seen by every process serving the
+# site, so the cache is kept in files shared by the processes of a host, or in Redis (which needs the redis package)
+# when CODE_BOOK_REDIS_URL is set, to share it between hosts. The tests use a cache of their own process.
+
+if TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+elif os.environ.get('CODE_BOOK_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CODE_BOOK_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -140,6 +230,125 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# Keyset pagination of the list views
+
+KEYSET_PAGE_SIZE = 12
+KEYSET_MAX_PAGE_SIZE = 100
+
+# Seconds a cached skill posting list is kept before it is rebuilt from the database
+
+SKILL_INDEX_TIMEOUT = 60 * 60
+
+# Largest skill filter match applied as an id IN (...) list, larger ones are tested against the rows of the page walk
+
+SKILL_FILTER_MAX_IDS = 1000
+
+# Number of skills suggested by the skill autocomplete of the project and profile forms (see core.skill_catalog)
+
+SKILL_AUTOCOMPLETE_LIMIT = 10
+
+# Most entries of the word index scanned by a skill autocomplete lookup, however many words start with the prefix
+SKILL_AUTOCOMPLETE_MAX_SCAN = 200
+
+# Seconds a rendered project or profile card is kept in the cache
+
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Seconds a process counts the card cache hits and misses in memory before adding them to the shared counters
+CARD_CACHE_STATS_INTERVAL = 10
+
+# Half life in seconds of a vote in the trending score of a project, and the moment its weight was first 1 (see
+# core.ranking). recompute_project_counters moves the epoch forward, run it every few months so that the weights never
+# overflow (which they would 1024 half lives after the last move).
+
+TRENDING_HALF_LIFE = 60 * 60 * 24 * 3
+TRENDING_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+# Seconds a reverse proxy may serve an anonymous project or profile page without revalidating it
+
+DETAIL_PAGE_MAX_AGE = 60
+
+# Number of similar projects (and profiles) precomputed by core.recommendations and shown on a detail page
+
+RECOMMENDATIONS_TOP_K = 6
+
+# The posting lists of the skills of more objects than this are cut to the objects of smallest norm when computing the
+# recommendations, walking them in full would make the rebuild quadratic (see core.recommendations)
+RECOMMENDATIONS_MAX_SKILL_FREQUENCY = 200
+
+# Per view budgets checked by core.middleware.QueryInstrumentationMiddleware, keyed by URL name.
+# Supported limits: queries, duplicate_queries, similar_queries, db_time_ms, template_time_ms and total_time_ms.
+# REQUEST_BUDGET_ACTION is either 'log' or 'raise', the test suite raises so that a regression fails the test making
+# the request.
+
+REQUEST_BUDGETS = {
+    'core:projects': {'queries': 10, 'similar_queries': 2},
+    'core:project': {'queries': 12, 'similar_queries': 2},
+    'core:project-reviews': {'queries': 4, 'similar_queries': 1},
+    'authentication:profiles': {'queries': 10, 'similar_queries': 2},
+    'authentication:user-profile': {'queries': 10, 'similar_queries': 2},
+}
+REQUEST_BUDGET_ACTION = 'raise' if TESTING else 'log'
+
+# Background task queue (see core.task_queue): seconds a worker leases the jobs it claims, seconds an idle worker
+# waits before polling again, and the attempts and the backoff (doubling from TASK_RETRY_DELAY seconds, up to
+# TASK_MAX_RETRY_DELAY) of failing jobs.
+
+TASK_LEASE_SECONDS = 60 * 5
+TASK_POLL_INTERVAL = 1.0
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10
+TASK_MAX_RETRY_DELAY = 60 * 60
+
+# Seconds an uploaded image reused by a new upload is protected from being deleted as unreferenced (see
+# core.storage). Uploads are stored under images/blobs/ by their digest, so the web server serving MEDIA_URL can send
+# them with a far future Cache-Control header.
+
+BLOB_GRACE_SECONDS = 60 * 60
+
+# Regular expressions of the statements whose full scans or temporary sorts are expected, skipped by the
+# audit_query_plans command.
+
+QUERY_PLAN_AUDIT_EXPECTED = [
+    # The skill catalog (see core.skill_catalog) is loaded whole, once per version.
+    r'^SELECT [^;]* FROM "authentication_skill"$',
+    # Prefetching the sorted skills of a page of objects sorts the rows of that page only.
+    r'^SELECT \("\w+_skills"\."\w+_id"\) AS "_prefetch_related_val_\w+", .* ORDER BY \("\w+_skills"\.sort_value\) ASC$',
+]
+
+# Profiling of a sample of requests (see core.profiling). Requests are profiled at random with the probability
+# REQUEST_PROFILE_SAMPLE_RATE, when their URL name is listed in REQUEST_PROFILE_VIEWS, or when they carry an
+# X-Profile-Token header equal to REQUEST_PROFILE_TOKEN. REQUEST_PROFILER is 'cprofile' (exact, slower) or 'sampling'
+# (stack samples every REQUEST_PROFILE_SAMPLING_INTERVAL seconds). The last REQUEST_PROFILE_MAX_FILES profiles are kept
+# in REQUEST_PROFILE_DIR, each with its REQUEST_PROFILE_TOP_FUNCTIONS hottest functions, and the profile_report command
+# summarizes them. Profiling is off by default.
+
+REQUEST_PROFILE_SAMPLE_RATE = float(os.environ.get('CODE_BOOK_PROFILE_SAMPLE_RATE', 0))
+REQUEST_PROFILE_VIEWS = []
+REQUEST_PROFILE_TOKEN = os.environ.get('CODE_BOOK_PROFILE_TOKEN')
+REQUEST_PROFILER = os.environ.get('CODE_BOOK_PROFILER', 'cprofile')
+REQUEST_PROFILE_SAMPLING_INTERVAL = 0.005
+REQUEST_PROFILE_DIR = os.path.join(BASE_DIR, 'request-profiles')
+REQUEST_PROFILE_MAX_FILES = 200
+REQUEST_PROFILE_TOP_FUNCTIONS = 100
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # The metrics of every request are logged while developing, not while testing.
+        'core.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO' if DEBUG and not TESTING else 'WARNING',
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
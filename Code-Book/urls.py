@@ -4,13 +4,45 @@ URL configuration for the project.
 This file defines the URL patterns for the project, mapping URLs to corresponding views.
 """
 
+import os
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import URLResolver, include, path
+from django.urls.resolvers import RoutePattern
+
+from core.storage import BLOB_PREFIX
+from core.views import serve_blob
+
+
+
+class LazyURLResolver(URLResolver):
+    """
+    A namespaced URLResolver whose URLconf is only imported once a request or a ``reverse()`` needs one of its URLs.
+
+    The root resolver populates every included resolver on the first ``reverse()``, which would import the URLconf
+    in the first request of every process. A namespaced resolver is only looked up by its namespace there, so it is
+    populated once its URLconf is loaded.
+    """
+
+    def _populate(self):
+        if 'urlconf_module' in self.__dict__:
+            super()._populate()
+
+
+def lazy_include(route, urlconf, app_name, namespace):
+    """ Like ``path(route, include(urlconf, namespace))`` with the URLconf imported lazily, see LazyURLResolver """
+
+    return LazyURLResolver(RoutePattern(route, is_endpoint=False), urlconf, app_name=app_name, namespace=namespace)
+
 
 urlpatterns = [
     path('', include('authentication.urls')),
     path('core/', include('core.urls')),
+    # The REST framework (and the requests, yaml and urllib3 it imports) is only loaded by the first API request.
+    lazy_include('api/v1/', 'api.urls', app_name='api', namespace='v1'),
     path('admin/', admin.site.urls),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+] + static(
+    settings.MEDIA_URL + BLOB_PREFIX, view=serve_blob, document_root=os.path.join(settings.MEDIA_ROOT, BLOB_PREFIX)
+) + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,11 @@
+"""
+This file defines the configuration for the 'api' app, the read-only REST API over projects, profiles, skills and
+reviews.
+"""
+
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api'
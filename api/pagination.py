@@ -0,0 +1,41 @@
+""" Cursor pagination of the API, built on the keyset paginator of the HTML pages """
+
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+from core.pagination import KeysetPaginator
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Paginates by ``(created, id)``, or by the ``(key, descending)`` pair returned by the view's
+    ``get_keyset_ordering()``, with opaque ``after`` and ``before`` cursors. The rows are narrowed by the view's
+    ``skill_match``, if any.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        key, descending = view.get_keyset_ordering() if hasattr(view, 'get_keyset_ordering') else ('created', False)
+        self.request = request
+        paginator = KeysetPaginator(queryset, key=key, descending=descending, match=getattr(view, 'skill_match', None))
+        self.page = paginator.get_page(request.query_params)
+        return self.page.object_list
+
+    def _link(self, query):
+        return self.request.build_absolute_uri(f'{self.request.path}?{query}')
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self._link(self.page.next_query) if self.page.has_next else None,
+            'previous': self._link(self.page.previous_query) if self.page.has_previous else None,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,125 @@
+"""
+Serializers of the read-only API.
+
+Every serializer supports sparse fieldsets: only the fields listed in the ``fields`` context entry are rendered, and
+``columns``, ``related`` and ``prefetch`` tell the views which model columns, joins and prefetches each field needs,
+so the SQL is narrowed down along with the output.
+"""
+
+from django.contrib.auth.models import User
+from rest_framework import serializers
+
+from authentication.models import Profile, Skill
+from core.models import Project, Review
+
+AUTHOR_COLUMNS = ('user__username', 'user__first_name', 'user__last_name')
+
+
+class SparseFieldsetSerializer(serializers.ModelSerializer):
+    """
+    A model serializer rendering only the requested fields.
+
+    ``columns`` maps a field to the model columns it reads (the field's own name by default), ``related`` to the
+    relation it follows with select_related and ``prefetch`` to the relation it prefetches.
+    """
+
+    columns = {}
+    related = {}
+    prefetch = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested:
+            return {name: field for name, field in fields.items() if name in requested}
+        return fields
+
+    @classmethod
+    def field_names(cls):
+        return list(cls.Meta.fields)
+
+    @classmethod
+    def query_plan(cls, fields):
+        """ Returns the ``(columns, related, prefetch)`` the given fields need """
+
+        columns, related, prefetch = [], [], []
+        for name in fields:
+            if name in cls.prefetch:
+                prefetch.append(cls.prefetch[name])
+                continue
+            columns.extend(cls.columns.get(name, (name,)))
+            if name in cls.related:
+                related.append(cls.related[name])
+        return columns, related, prefetch
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    """ The user behind a project, a profile or a review """
+
+    name = serializers.CharField(source='get_full_name')
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'name']
+
+
+class EmbeddedSkillSerializer(serializers.ModelSerializer):
+    """ A skill embedded in a project or a profile """
+
+    class Meta:
+        model = Skill
+        fields = ['id', 'name']
+
+
+class SkillSerializer(SparseFieldsetSerializer):
+
+    class Meta:
+        model = Skill
+        fields = ['id', 'name', 'description', 'created', 'modified']
+
+
+class ProjectSerializer(SparseFieldsetSerializer):
+
+    author = AuthorSerializer(source='user')
+    skills = EmbeddedSkillSerializer(many=True)
+
+    columns = {'author': ('user', *AUTHOR_COLUMNS)}
+    related = {'author': 'user'}
+    prefetch = {'skills': 'skills'}
+
+    class Meta:
+        model = Project
+        fields = [
+            'id', 'title', 'description', 'author', 'skills', 'featured_image', 'youtube_link', 'demo_link',
+            'source_code_link', 'up_votes', 'down_votes', 'review_count', 'wilson_score', 'trending_score', 'created',
+            'modified',
+        ]
+
+
+class ProfileSerializer(SparseFieldsetSerializer):
+
+    user = AuthorSerializer()
+    skills = EmbeddedSkillSerializer(many=True)
+
+    columns = {'user': ('user', *AUTHOR_COLUMNS)}
+    related = {'user': 'user'}
+    prefetch = {'skills': 'skills'}
+
+    class Meta:
+        model = Profile
+        fields = [
+            'id', 'user', 'short_intro', 'bio', 'profile_picture', 'gender', 'github', 'linkedin', 'youtube', 'skills',
+            'created', 'modified',
+        ]
+
+
+class ReviewSerializer(SparseFieldsetSerializer):
+
+    author = AuthorSerializer(source='user')
+
+    columns = {'author': ('user', *AUTHOR_COLUMNS)}
+    related = {'author': 'user'}
+
+    class Meta:
+        model = Review
+        fields = ['id', 'project', 'author', 'vote', 'body', 'created', 'modified']
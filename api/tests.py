@@ -0,0 +1,76 @@
+""" Tests of the read-only API """
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from authentication.models import Profile, Skill
+from core.models import Project, Review
+
+
+class ReadOnlyAPITests(TestCase):
+    """ Tests paginating, narrowing and conditionally fetching projects through the API """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', first_name='First', last_name='Last')
+        cls.reviewer = User.objects.create_user(username='reviewer')
+        Profile.objects.create(user=cls.author)
+        cls.skills = [Skill.objects.create(name=name) for name in ('Django', 'React', 'PHP')]
+        cls.projects = []
+        for index in range(5):
+            project = Project.objects.create(user=cls.author, title=f'Project {index}')
+            project.skills.set(cls.skills[index % 3:])
+            cls.projects.append(project)
+
+    def test_pages_embed_skills_without_n_plus_one(self):
+        url = reverse('v1:project-list')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'page_size': 2})
+        # The page and one prefetch of the skills.
+        self.assertEqual(len(context.captured_queries), 2)
+
+        results = response.json()['results']
+        self.assertEqual([result['title'] for result in results], ['Project 0', 'Project 1'])
+        self.assertEqual([skill['name'] for skill in results[1]['skills']], ['React', 'PHP'])
+        self.assertEqual(results[0]['author'], {'id': self.author.pk, 'username': 'author', 'name': 'First Last'})
+
+        titles = []
+        while url:
+            page = self.client.get(url, {'page_size': 2} if not titles else None).json()
+            titles.extend(result['title'] for result in page['results'])
+            url = page['next']
+        self.assertEqual(titles, [project.title for project in self.projects])
+
+    def test_sparse_fieldsets_narrow_the_query(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('v1:project-list'), {'fields': 'id,title'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title'})
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('description', context.captured_queries[0]['sql'])
+
+        response = self.client.get(reverse('v1:project-list'), {'fields': 'title,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_conditional_get(self):
+        url = reverse('v1:project-detail', kwargs={'pk': self.projects[0].pk})
+        response = self.client.get(url)
+        self.assertEqual(response.json()['review_count'], 0)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(context.captured_queries), 1)
+
+        # A review changes the counters of the project, so its validators change as well.
+        Review.objects.create(user=self.reviewer, project=self.projects[0], vote='Up')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['review_count'], 1)
+
+        list_url = reverse('v1:skill-list')
+        etag = self.client.get(list_url)['ETag']
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
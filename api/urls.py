@@ -0,0 +1,15 @@
+""" URL configuration for the 'api' app, included once per API version """
+
+from rest_framework.routers import DefaultRouter
+
+from api import views
+
+router = DefaultRouter()
+router.register('projects', views.ProjectViewSet, basename='project')
+router.register('profiles', views.ProfileViewSet, basename='profile')
+router.register('skills', views.SkillViewSet, basename='skill')
+router.register('reviews', views.ReviewViewSet, basename='review')
+
+app_name = 'api'
+
+urlpatterns = router.urls
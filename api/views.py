@@ -0,0 +1,130 @@
+"""
+Views of the read-only API.
+
+Lists are cursor paginated (see ``KeysetCursorPagination``), ``?fields=`` narrows both the output and the columns
+selected, and skills are embedded with one prefetch query per page. Responses carry an ETag and a Last-Modified header
+derived from the ``modified`` timestamps of the objects, so clients can poll with If-None-Match and get a 304 before
+anything is prefetched or serialized.
+"""
+
+from django.db.models import prefetch_related_objects
+from django.http import Http404
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from api.serializers import ProfileSerializer, ProjectSerializer, ReviewSerializer, SkillSerializer
+from authentication.models import Profile, Skill
+from core.conditional import make_etag, not_modified, set_validators
+from core.models import Project, Review
+from core.ranking import SORT_ORDERINGS
+from core.skill_index import SkillFilterMixin
+
+
+class ReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
+    """ A read-only viewset with sparse fieldsets and conditional GET """
+
+    lookup_value_regex = r'\d+'
+
+    def get_keyset_ordering(self):
+        return 'created', False
+
+    def get_requested_fields(self):
+        """ Returns the fields listed in ``?fields=``, all the fields of the serializer by default """
+
+        if not hasattr(self, '_requested_fields'):
+            available = self.get_serializer_class().field_names()
+            requested = [name for name in self.request.query_params.get('fields', '').split(',') if name]
+            unknown = [name for name in requested if name not in available]
+            if unknown:
+                raise ValidationError({'fields': [f'Unknown fields: {", ".join(unknown)}.']})
+            self._requested_fields = requested or available
+        return self._requested_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_requested_fields()
+        return context
+
+    def get_queryset(self):
+        columns, related, self.prefetch_lookups = self.get_serializer_class().query_plan(self.get_requested_fields())
+        key, _ = self.get_keyset_ordering()
+        return super().get_queryset().select_related(*related).only('created', 'modified', key, *columns)
+
+    def list(self, request, *args, **kwargs):
+        objects = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginator.page
+        etag = make_etag(
+            request.version,
+            self.get_requested_fields(),
+            [(obj.pk, obj.modified.timestamp()) for obj in objects],
+            page.has_next,
+            page.has_previous,
+        )
+        last_modified = max((obj.modified for obj in objects), default=None)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        prefetch_related_objects(objects, *self.prefetch_lookups)
+        response = self.get_paginated_response(self.get_serializer(objects, many=True).data)
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        modified = queryset.filter(pk=kwargs['pk']).values_list('modified', flat=True).first()
+        if modified is None:
+            raise Http404
+        etag = make_etag(request.version, self.get_requested_fields(), int(kwargs['pk']), modified.timestamp())
+        response = not_modified(request, etag, modified)
+        if response is not None:
+            return response
+
+        instance = self.get_object()
+        prefetch_related_objects([instance], *self.prefetch_lookups)
+        return set_validators(Response(self.get_serializer(instance).data), etag, modified)
+
+
+class SkillViewSet(ReadOnlyViewSet):
+    """ Lists and retrieves skills """
+
+    queryset = Skill.objects.all()
+    serializer_class = SkillSerializer
+
+
+class ProjectViewSet(SkillFilterMixin, ReadOnlyViewSet):
+    """
+    Lists and retrieves projects.
+
+    The list takes the ``?skills=``, ``?any_skills=`` and ``?exclude_skills=`` filters and ``?sort=top`` or
+    ``?sort=trending`` like the projects page.
+    """
+
+    queryset = Project.objects.all()
+    serializer_class = ProjectSerializer
+    skill_index_kind = 'project'
+
+    def get_keyset_ordering(self):
+        return SORT_ORDERINGS.get(self.request.query_params.get('sort'), super().get_keyset_ordering())
+
+
+class ProfileViewSet(SkillFilterMixin, ReadOnlyViewSet):
+    """ Lists and retrieves profiles, the list takes the same skill filters as the profiles page """
+
+    queryset = Profile.objects.all()
+    serializer_class = ProfileSerializer
+    skill_index_kind = 'profile'
+
+
+class ReviewViewSet(ReadOnlyViewSet):
+    """ Lists and retrieves reviews, ``?project=<id>`` lists the reviews of a single project """
+
+    queryset = Review.objects.all()
+    serializer_class = ReviewSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        project = self.request.query_params.get('project', '')
+        if project.isdigit():
+            queryset = queryset.filter(project_id=project)
+        return queryset
@@ -1,22 +1,21 @@
 """ This module contains Django forms for handling Profile and Skill creation """
 
 from django import forms
-from sortedm2m.forms import SortedCheckboxSelectMultiple
 
 from authentication.models import Profile, Skill
+from authentication.widgets import SkillAutocompleteWidget
 
 
 class ProfileForm(forms.ModelForm):
     """ A form for creating and updating user profiles """
 
-    skills = SortedCheckboxSelectMultiple()
-
     class Meta:
         model = Profile
         exclude = ['user']
 
         widgets = {
             'date_of_birth': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+            'skills': SkillAutocompleteWidget(),
         }
 
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-17 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_url_fields_add_sorted_many2many_skills'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['created', 'id'], name='profile_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.2 on 2026-10-17 20:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_profile_created_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='The TF-IDF weighted cosine similarity of the skills of both profiles.')),
+                ('profile', models.ForeignKey(help_text='The profile the neighbour is recommended for.', on_delete=django.db.models.deletion.CASCADE, related_name='similar_profiles', to='authentication.profile')),
+                ('similar', models.ForeignKey(help_text='The recommended profile.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentication.profile')),
+            ],
+            options={
+                'ordering': ['profile', '-score'],
+                'indexes': [models.Index(fields=['profile', '-score'], name='similar_profile_score_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similarprofile',
+            constraint=models.UniqueConstraint(fields=('profile', 'similar'), name='unique_similar_profile'),
+        ),
+    ]
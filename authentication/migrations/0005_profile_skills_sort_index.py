@@ -0,0 +1,20 @@
+# Generated by Django 4.2.2 on 2026-10-17 22:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_similar_profile'),
+    ]
+
+    operations = [
+        # The through table of the sorted skills is created by the field, so its index is added with plain SQL. It
+        # serves the skills of a profile in their sorted order without a temporary sort.
+        migrations.RunSQL(
+            'CREATE INDEX "authentication_profile_skills_sort_idx" '
+            'ON "authentication_profile_skills" ("profile_id", "sort_value")',
+            'DROP INDEX "authentication_profile_skills_sort_idx"',
+        ),
+    ]
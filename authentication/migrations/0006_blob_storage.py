@@ -0,0 +1,19 @@
+# Generated by Django 4.2.2 on 2026-10-17 21:05
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_profile_skills_sort_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, db_index=True, default='profiles/user-default.png', help_text='A profile picture of the user, stored once per distinct content (see core.storage).', null=True, storage=core.storage.ContentAddressedStorage(), upload_to='profiles/'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.2 on 2026-10-17 21:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_blob_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='down_votes_received',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of down votes the projects of the user have received.'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='last_activity',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='When the user last published a project or wrote a review, or created the profile.'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of projects of the user.'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='reviews_written',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of reviews the user has written.'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='up_votes_received',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of up votes the projects of the user have received.'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['project_count', 'id'], name='profile_project_count_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['reviews_written', 'id'], name='profile_reviews_written_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['up_votes_received', 'id'], name='profile_up_votes_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['last_activity', 'id'], name='profile_last_activity_id_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.2 on 2026-10-17 21:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_profile_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='similarprofile',
+            name='created',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the neighbour was stored, the list of neighbours being replaced as a whole.'),
+        ),
+    ]
@@ -2,9 +2,13 @@
 
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
+from model_utils import FieldTracker
 from model_utils.models import TimeStampedModel
 from sortedm2m.fields import SortedManyToManyField
 
+from core.storage import ContentAddressedStorage
+
 
 class Profile(TimeStampedModel):
     """ Model representing a user profile """
@@ -35,10 +39,12 @@ class Profile(TimeStampedModel):
     )
     profile_picture = models.ImageField(
         upload_to='profiles/',
+        storage=ContentAddressedStorage(),
         default='profiles/user-default.png',
         blank=True,
         null=True,
-        help_text='A profile picture of the user.'
+        db_index=True,
+        help_text='A profile picture of the user, stored once per distinct content (see core.storage).'
     )
     github = models.CharField(
         max_length=200,
@@ -73,11 +79,47 @@ class Profile(TimeStampedModel):
         help_text='The date of birth of the user.'
     )
 
+    # Activity stats maintained by the signal handlers of the core app (see core.utils).
+    project_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='The number of projects of the user.'
+    )
+    reviews_written = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='The number of reviews the user has written.'
+    )
+    up_votes_received = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='The number of up votes the projects of the user have received.'
+    )
+    down_votes_received = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='The number of down votes the projects of the user have received.'
+    )
+    last_activity = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        help_text='When the user last published a project or wrote a review, or created the profile.'
+    )
+
+    tracker = FieldTracker(fields=['profile_picture'])
+
     def __str__(self):
         return self.user.get_full_name()
 
     class Meta:
         ordering = ['created']
+        indexes = [
+            models.Index(fields=['created', 'id'], name='profile_created_id_idx'),
+            models.Index(fields=['project_count', 'id'], name='profile_project_count_id_idx'),
+            models.Index(fields=['reviews_written', 'id'], name='profile_reviews_written_id_idx'),
+            models.Index(fields=['up_votes_received', 'id'], name='profile_up_votes_id_idx'),
+            models.Index(fields=['last_activity', 'id'], name='profile_last_activity_id_idx'),
+        ]
 
 
 class Skill(TimeStampedModel):
@@ -97,3 +139,36 @@ class Skill(TimeStampedModel):
 
     def __str__(self):
         return self.name
+
+
+class SimilarProfile(models.Model):
+    """ A precomputed neighbour of a profile, ranked by the similarity of their skills """
+
+    profile = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name='similar_profiles',
+        help_text='The profile the neighbour is recommended for.'
+    )
+    similar = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text='The recommended profile.'
+    )
+    score = models.FloatField(
+        help_text='The TF-IDF weighted cosine similarity of the skills of both profiles.'
+    )
+    created = models.DateTimeField(
+        default=timezone.now,
+        help_text='When the neighbour was stored, the list of neighbours being replaced as a whole.'
+    )
+
+    class Meta:
+        ordering = ['profile', '-score']
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'similar'], name='unique_similar_profile'),
+        ]
+        indexes = [
+            models.Index(fields=['profile', '-score'], name='similar_profile_score_idx'),
+        ]
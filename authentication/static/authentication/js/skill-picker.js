@@ -0,0 +1,74 @@
+// Skill picker of the project and profile forms: suggests skills from the autocomplete endpoint as the user types and
+// keeps the hidden input in sync with the selected skills, a comma separated list of ids in their chosen order.
+(() => {
+  const syncValue = (picker) => {
+    const ids = [...picker.querySelectorAll('.skill-picker-selected [data-skill-id]')].map((item) => item.dataset.skillId);
+    picker.querySelector('.skill-picker-value').value = ids.join(',');
+  };
+
+  const selectedItem = (id, name) => {
+    const item = document.createElement('li');
+    item.className = 'list-group-item d-flex justify-content-between align-items-center';
+    item.dataset.skillId = id;
+    item.innerHTML = `
+      <span></span>
+      <span>
+        <button type="button" class="btn btn-sm btn-outline-secondary skill-picker-up" title="Move up">&uarr;</button>
+        <button type="button" class="btn btn-sm btn-outline-danger skill-picker-remove" title="Remove">&times;</button>
+      </span>`;
+    item.firstElementChild.textContent = name;
+    return item;
+  };
+
+  const suggest = async (picker, query) => {
+    const suggestions = picker.querySelector('.skill-picker-suggestions');
+    if (!query.trim()) {
+      suggestions.replaceChildren();
+      return;
+    }
+    const url = `${picker.dataset.autocompleteUrl}?${new URLSearchParams({ q: query })}`;
+    const response = await fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+    if (!response.ok) {
+      return;
+    }
+    const { results } = await response.json();
+    const selected = new Set(picker.querySelector('.skill-picker-value').value.split(','));
+    suggestions.replaceChildren(...results.filter((skill) => !selected.has(String(skill.id))).map((skill) => {
+      const option = document.createElement('button');
+      option.type = 'button';
+      option.className = 'list-group-item list-group-item-action skill-picker-option';
+      option.dataset.skillId = skill.id;
+      option.textContent = skill.name;
+      return option;
+    }));
+  };
+
+  let timer;
+  document.addEventListener('input', (event) => {
+    const picker = event.target.closest('.skill-picker');
+    if (picker && event.target.type === 'search') {
+      clearTimeout(timer);
+      timer = setTimeout(() => suggest(picker, event.target.value), 150);
+    }
+  });
+
+  document.addEventListener('click', (event) => {
+    const picker = event.target.closest('.skill-picker');
+    if (!picker) {
+      return;
+    }
+    const option = event.target.closest('.skill-picker-option');
+    const item = event.target.closest('[data-skill-id]');
+    if (option) {
+      picker.querySelector('.skill-picker-selected').append(selectedItem(option.dataset.skillId, option.textContent));
+      option.remove();
+    } else if (event.target.closest('.skill-picker-remove')) {
+      item.remove();
+    } else if (event.target.closest('.skill-picker-up') && item.previousElementSibling) {
+      item.previousElementSibling.before(item);
+    } else {
+      return;
+    }
+    syncValue(picker);
+  });
+})();
@@ -1,5 +1,143 @@
 """ Tests for the authentication app."""
 
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from authentication.models import Profile, Skill
+from core import skill_catalog
+from core.models import Project, Review
+from core.utils import recompute_profile_stats
+
+
+class UserProfileViewQueryCountTests(TestCase):
+    """ Tests that the profile page renders the user's project cards with a constant number of queries """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='developer', first_name='First', last_name='Last')
+        cls.profile = Profile.objects.create(user=cls.user, date_of_birth=date(1990, 1, 1))
+        cls.skills = [Skill.objects.create(name=f'Skill {index}') for index in range(3)]
+
+    def create_projects(self, count):
+        for index in range(count):
+            project = Project.objects.create(user=self.user, title=f'Project {index}')
+            project.skills.set(self.skills)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('authentication:user-profile', kwargs={'pk': self.profile.pk}))
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_projects(self):
+        self.create_projects(2)
+        queries = self.count_queries()
+
+        self.create_projects(10)
+        self.assertEqual(self.count_queries(), queries)
+
+
+class SkillAutocompleteTests(TestCase):
+    """ Tests the skill autocomplete and the skill picker of the forms """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='developer')
+        names = ('Django', 'Django REST framework', 'Go', 'Machine Learning', 'Deep Learning')
+        cls.skills = {name: Skill.objects.create(name=name) for name in names}
+
+    def setUp(self):
+        # The test transaction is never committed, so the catalog is not invalidated by the signal handlers.
+        skill_catalog.invalidate()
+
+    def test_prefix_lookups_are_answered_from_memory(self):
+        url = reverse('authentication:skill-autocomplete')
+        skill_catalog.catalog.load()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'q': 'dj'})
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual([result['name'] for result in response.json()['results']], ['Django', 'Django REST framework'])
+
+        names = [result['name'] for result in self.client.get(url, {'q': 'learn'}).json()['results']]
+        self.assertEqual(names, ['Deep Learning', 'Machine Learning'])
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, {'q': 'dj'}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        skill_catalog.invalidate()
+        self.assertEqual(self.client.get(url, {'q': 'dj'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_prefix_scans_are_bounded(self):
+        self.assertEqual(skill_catalog.catalog.search('dj', limit=1), [(self.skills['Django'].pk, 'Django')])
+        # Only the first word in key order is scanned, the "learning" of the skill created first.
+        with override_settings(SKILL_AUTOCOMPLETE_MAX_SCAN=1):
+            self.assertEqual([name for _, name in skill_catalog.catalog.search('learn')], ['Machine Learning'])
+
+    def test_picker_renders_only_the_selected_skills_and_keeps_their_order(self):
+        self.client.force_login(self.user)
+        project = Project.objects.create(user=self.user, title='Project')
+        project.skills.set([self.skills['Go'], self.skills['Django']])
+
+        url = reverse('core:edit-project', kwargs={'pk': project.pk})
+        content = self.client.get(url).content.decode()
+        self.assertIn(f'value="{self.skills["Go"].pk},{self.skills["Django"].pk}"', content)
+        self.assertNotIn('Machine Learning', content)
+
+        order = [self.skills['Deep Learning'], self.skills['Go'], self.skills['Django']]
+        self.client.post(url, {'title': 'Project', 'skills': ','.join(str(skill.pk) for skill in order)})
+        self.assertEqual(list(project.skills.all()), order)
+
+
+class ProfileStatsTests(TestCase):
+    """ Tests the activity stats of profiles and sorting the profile directory by them """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reviewer = User.objects.create_user(username='reviewer')
+        # The reviewer has a project before having a profile, it is counted when the profile is created.
+        Project.objects.create(user=cls.reviewer, title='Early')
+        cls.author_profile = Profile.objects.create(user=cls.author)
+        cls.reviewer_profile = Profile.objects.create(user=cls.reviewer)
+
+    def stats(self, profile):
+        profile.refresh_from_db()
+        return profile.project_count, profile.reviews_written, profile.up_votes_received, profile.down_votes_received
+
+    def test_stats_follow_projects_and_reviews(self):
+        self.assertEqual(self.stats(self.reviewer_profile), (1, 0, 0, 0))
+        first = Project.objects.create(user=self.author, title='First')
+        second = Project.objects.create(user=self.author, title='Second')
+        review = Review.objects.create(user=self.reviewer, project=first, vote='Up')
+        Review.objects.create(user=self.reviewer, project=second, vote='Down')
+        self.assertEqual(self.stats(self.author_profile), (2, 0, 1, 1))
+        self.assertEqual(self.stats(self.reviewer_profile), (1, 2, 0, 0))
+        self.assertEqual(self.reviewer_profile.last_activity, Review.objects.latest('created').created)
+
+        review.vote = 'Down'
+        review.save()
+        self.assertEqual(self.stats(self.author_profile), (2, 0, 0, 2))
+        second.delete()
+        self.assertEqual(self.stats(self.author_profile), (1, 0, 0, 1))
+        self.assertEqual(self.stats(self.reviewer_profile), (1, 1, 0, 0))
+        self.assertEqual(self.reviewer_profile.last_activity, review.created)
+
+        Profile.objects.update(project_count=0, reviews_written=0, up_votes_received=0, down_votes_received=0)
+        recompute_profile_stats()
+        self.assertEqual(self.stats(self.author_profile), (1, 0, 0, 1))
+        self.assertEqual(self.stats(self.reviewer_profile), (1, 1, 0, 0))
+
+    def test_directory_is_sorted_and_filtered_by_stats(self):
+        Project.objects.create(user=self.author, title='First')
+        Project.objects.create(user=self.author, title='Second')
+        Review.objects.create(user=self.author, project=Project.objects.get(title='Early'), vote='Up')
+
+        response = self.client.get(reverse('authentication:profiles'), {'sort': 'projects'})
+        self.assertEqual(list(response.context['profiles']), [self.author_profile, self.reviewer_profile])
+        response = self.client.get(reverse('authentication:profiles'), {'sort': 'projects', 'min_votes': 1})
+        self.assertEqual(list(response.context['profiles']), [self.reviewer_profile])
+        self.assertContains(response, '1 up vote')
@@ -4,6 +4,7 @@ URL configuration for the 'authentication' app.
 This file defines the URL patterns for the 'authentication' app, mapping URLs to corresponding views.
 """
 
+from django.conf import settings
 from django.urls import path
 
 from authentication import views
@@ -16,8 +17,13 @@ urlpatterns = [
     path('logout/', views.LogoutView.as_view(), name='logout'),
 
     path('edit-profile/', views.CreateOrEditProfileView.as_view(), name='edit-profile'),
-    path('profile/<str:pk>', views.UserProfileView.as_view(), name='user-profile'),
+    path(
+        'profile/<str:pk>',
+        (views.AsyncUserProfileView if settings.ASYNC_VIEWS else views.UserProfileView).as_view(),
+        name='user-profile'
+    ),
     path('', views.ProfilesView.as_view(), name='profiles'),
 
     path('add-skill/', views.CreateSkillView.as_view(), name='add-skill'),
+    path('skills/autocomplete/', views.SkillAutocompleteView.as_view(), name='skill-autocomplete'),
 ]
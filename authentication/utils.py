@@ -4,8 +4,10 @@ from datetime import date
 
 
 def calculate_age(birth_date):
-    """ Calculates and returns the age of a user """
+    """ Calculates and returns the age of a user, or None if the date of birth is unknown """
 
+    if birth_date is None:
+        return None
     today = date.today()
     age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
     return age
@@ -4,22 +4,40 @@ Views for user registration, login, and welcome in the 'authentication' app.
 This file contains view classes and functions for handling user registration, login, and logout functionalities.
 """
 
+from datetime import timedelta
+
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.views import LogoutView
+from django.http import Http404, JsonResponse
 from django.shortcuts import redirect, render, reverse
+from django.utils import timezone
 from django.views import View
 from django.views.generic import DetailView, ListView
 
+from core.concurrency import arender, gather_reads
+from core.conditional import (
+    ConditionalPageMixin, make_etag, not_modified, page_validator, profile_last_modified, set_validators,
+)
+from core.images import schedule_derivatives
 from core.models import Project
+from core.pagination import KeysetPaginationMixin, KeysetSortMixin
+from core.skill_catalog import catalog
+from core.skill_index import SkillFilterMixin
 
 from authentication.forms import ProfileForm, SkillForm
-from authentication.models import Profile
+from authentication.models import Profile, SimilarProfile
 from authentication.utils import calculate_age
 
 
+def _parse_count(value):
+    """ Returns the non-negative integer of a query parameter, or None if it is not one """
+
+    return int(value) if value.isdigit() and len(value) <= 9 else None
+
+
 class RegisterView(View):
     """
     View class for user registration.
@@ -48,10 +66,9 @@ class RegisterView(View):
             last_name = request.POST.get('last_name')
 
             if not User.objects.filter(username=username).exists():
-                user = User.objects.create_user(username=username, email=email, password=password)
-                user.first_name = first_name
-                user.last_name = last_name
-                user.save()
+                user = User.objects.create_user(
+                    username=username, email=email, password=password, first_name=first_name, last_name=last_name,
+                )
 
             else:
                 messages.warning(request, 'Username already exists. Sign in instead.')
@@ -133,8 +150,9 @@ class CreateOrEditProfileView(LoginRequiredMixin, View):
             profile = form.save(commit=False)
             profile.user = user
             profile.save()
-            skills_ids = request.POST.getlist('skills')
-            profile.skills.set(skills_ids)
+            profile.skills.set(form.cleaned_data['skills'])
+            if 'profile_picture' in form.changed_data:
+                schedule_derivatives(profile, 'profile_picture')
             messages.success(request, 'Success!')
             return redirect(reverse('authentication:user-profile', kwargs={'pk': profile.id}))
 
@@ -170,36 +188,134 @@ class CreateSkillView(LoginRequiredMixin, View):
         return redirect(reverse('authentication:profiles'))
 
 
-class ProfilesView(ListView):
+class ProfilesView(SkillFilterMixin, KeysetSortMixin, KeysetPaginationMixin, ListView):
+    """
+    A view that displays all the profiles.
+
+    ``?sort=projects``, ``?sort=reviews``, ``?sort=votes`` and ``?sort=active`` rank the profiles by their activity
+    stats, walked through an index on each of them. ``?min_projects=``, ``?min_reviews=`` and ``?min_votes=`` keep
+    the profiles with at least that many projects, reviews written or up votes received, and ``?active_within=``
+    those active in that many last days.
     """
-    A view that displays all the profiles """
 
     page = 'Profiles'
     model = Profile
     template_name = 'authentication/profiles.html'
     context_object_name = 'profiles'
-
-
-class UserProfileView(DetailView):
-    """ A view that displays a specific profile"""
-
-    model = Profile
+    skill_index_kind = 'profile'
+    queryset = Profile.objects.select_related('user').prefetch_related('skills')
+    sort_orderings = {
+        'projects': ('project_count', True),
+        'reviews': ('reviews_written', True),
+        'votes': ('up_votes_received', True),
+        'active': ('last_activity', True),
+    }
+    sort_labels = (
+        ('', 'Newest'), ('active', 'Recently active'), ('projects', 'Most projects'), ('reviews', 'Most reviews'),
+        ('votes', 'Most up votes'),
+    )
+    stats_filters = {
+        'min_projects': 'project_count__gte',
+        'min_reviews': 'reviews_written__gte',
+        'min_votes': 'up_votes_received__gte',
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.GET
+        for name, lookup in self.stats_filters.items():
+            value = _parse_count(params.get(name, ''))
+            if value is not None:
+                queryset = queryset.filter(**{lookup: value})
+        days = _parse_count(params.get('active_within', ''))
+        if days is not None:
+            queryset = queryset.filter(last_activity__gte=timezone.now() - timedelta(days=min(days, 36500)))
+        return queryset
+
+
+class UserProfileView(ConditionalPageMixin, DetailView):
+    """ A view that displays a specific profile, answering with a 304 when the client's copy is current """
+
+    queryset = Profile.objects.select_related('user')
     template_name = 'authentication/single-profile.html'
     context_object_name = 'profile'
 
+    def get_last_modified(self):
+        return profile_last_modified(self.kwargs['pk'])
+
     def get_context_data(self, **kwargs):
 
         context = super().get_context_data(**kwargs)
-        profile = self.get_object()
+        profile = self.object
         context['page'] = profile.user.get_full_name()
-        context['profile'] = profile
-        context['projects'] = Project.objects.filter(user=profile.user)
+        context['projects'] = Project.objects.filter(user=profile.user).order_by('created', 'pk').for_cards()
         context['skills'] = profile.skills.all()
         context['age'] = calculate_age(profile.date_of_birth)
+        context['similar_profiles'] = profile.similar_profiles.select_related('similar__user')
         return context
 
 
+class AsyncUserProfileView(View):
+    """
+    An async version of UserProfileView for ASGI deployments.
+
+    The profile, its skills and the projects of its user are independent reads, so they are issued concurrently once
+    the validator shows the client's copy is stale.
+    """
+
+    async def get(self, request, pk):
+        """ Handles the GET request for a profile page """
+
+        [validator] = await gather_reads(lambda: page_validator(request, profile_last_modified(pk)))
+        if validator is None:
+            raise Http404('No profile found matching the query')
+        response = validator.not_modified()
+        if response is not None:
+            return response
+
+        skills = Profile.skills.through.objects.filter(profile_id=pk).select_related('skill').order_by('sort_value')
+        similar = SimilarProfile.objects.filter(profile_id=pk).select_related('similar__user')
+        profile, skills, projects, similar_profiles = await gather_reads(
+            lambda: Profile.objects.select_related('user').filter(pk=pk).first(),
+            lambda: [row.skill for row in skills],
+            lambda: list(Project.objects.filter(user__profile__pk=pk).order_by('created', 'pk').for_cards()),
+            lambda: list(similar),
+        )
+        if profile is None:
+            raise Http404('No profile found matching the query')
+
+        context = {
+            'profile': profile,
+            'page': profile.user.get_full_name(),
+            'projects': projects,
+            'skills': skills,
+            'age': calculate_age(profile.date_of_birth),
+            'similar_profiles': similar_profiles,
+        }
+        return validator.finalize(await arender(request, 'authentication/single-profile.html', context))
+
+
 class LogoutView(LogoutView):
     """ View that handles the logout functionality """
 
     pass
+
+
+class SkillAutocompleteView(View):
+    """
+    View class returning the skills whose name starts with ``?q=`` as JSON.
+
+    Lookups are answered from the in-memory skill catalog without querying the database, and the ETag follows the
+    version of the catalog so repeated lookups are answered with a 304.
+    """
+
+    def get(self, request):
+        query = ' '.join(request.GET.get('q', '').split())
+        version = catalog.load()[0]
+        etag = make_etag(version, query)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        results = [{'id': pk, 'name': name} for pk, name in catalog.search(query)]
+        return set_validators(JsonResponse({'results': results}), etag)
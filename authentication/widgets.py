@@ -1,4 +1,7 @@
-from django.forms.widgets import SelectMultiple
+from django.forms.widgets import SelectMultiple, Widget
+from django.urls import reverse
+
+from core.skill_catalog import catalog
 
 
 class MultipleChoiceAddWidget(SelectMultiple):
@@ -9,3 +12,46 @@ class MultipleChoiceAddWidget(SelectMultiple):
         context = super().get_context(name, value, attrs)
         context['can_add_skills'] = self.can_add_skills
         return context
+
+
+class SkillAutocompleteWidget(Widget):
+    """
+    A picker for the skills of a sorted many-to-many field.
+
+    Only the selected skills are rendered, with their names read from the in-memory skill catalog, and others are
+    added through the skill autocomplete endpoint. The selection is submitted as a single comma separated list of ids
+    in the chosen order, as the sortedm2m widget does, so SortedMultipleChoiceField keeps the order.
+    """
+
+    template_name = 'authentication/widgets/skill_picker.html'
+    allow_multiple_selected = True
+
+    class Media:
+        js = ('authentication/js/skill-picker.js',)
+
+    def format_value(self, value):
+        if value is None:
+            return []
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        return [str(pk) for pk in value if pk not in (None, '')]
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        selected = catalog.resolve(context['widget']['value'])
+        context['widget'].update({
+            'selected': selected,
+            'ids': ','.join(str(pk) for pk, _ in selected),
+            'autocomplete_url': reverse('authentication:skill-autocomplete'),
+        })
+        return context
+
+    def value_from_datadict(self, data, files, name):
+        value = data.get(name)
+        if isinstance(value, str):
+            return [pk for pk in value.split(',') if pk]
+        return value
+
+    def value_omitted_from_data(self, data, files, name):
+        # An empty selection submits an empty list, not a missing value.
+        return False
@@ -2,7 +2,8 @@
 
 from django.contrib import admin
 
-from core.models import Project, Review
+from core.models import Project, Review, Task
 
 admin.site.register(Project)
 admin.site.register(Review)
+admin.site.register(Task)
@@ -3,8 +3,15 @@ This file defines the configuration for the 'core' app, including the default au
 the app name.
 """
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        """ Connects the signal handlers of the app and registers the background tasks of every app """
+
+        from core import signals  # noqa: F401
+        autodiscover_modules('tasks')
@@ -0,0 +1,310 @@
+"""
+A reproducible benchmark of every route of the core and authentication apps.
+
+Each route is requested through the Django test client (in process, no network) a fixed number of times after a
+warm-up, and the latency percentiles, the throughput and the queries per request are reported. The detail pages can
+also be compared under concurrent load between their sync views served by the WSGI application and their async views
+served by the ASGI application.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+from django.utils.module_loading import import_string
+
+from authentication import urls as authentication_urls
+from authentication.models import Profile
+from core import urls as core_urls
+from core.models import Project
+
+# Routes that change the state of the session when requested with GET, or only accept POST.
+SKIPPED_ROUTES = {'authentication:logout', 'core:add-review'}
+
+# Run by a fresh interpreter in the view mode given by its first argument: loads the paths through the application of
+# that mode and prints the report.
+VIEW_MODE_SCRIPT = '''
+import json, os, sys
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+os.environ['CODE_BOOK_ASYNC_VIEWS'] = sys.argv[1]
+import django
+django.setup()
+from core.benchmark import load_through_handler
+print(json.dumps(load_through_handler(json.loads(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]))))
+'''
+
+
+@dataclass
+class RouteResult:
+    """ The measurements of a single route """
+
+    route: str
+    path: str
+    status: int
+    requests: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    throughput_rps: float
+    queries_per_request: float
+
+
+def percentile(samples, fraction):
+    """ Returns the given percentile (0 < fraction < 1) of the samples using the nearest-rank method """
+
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))]
+
+
+def _sample_kwargs():
+    """ Returns URL keyword arguments pointing at representative objects, the most reviewed project first """
+
+    project = Project.objects.order_by('-review_count', 'pk').only('pk', 'user_id').first()
+    profile = Profile.objects.filter(user_id=project.user_id).first() if project else Profile.objects.first()
+    return {
+        'project': project.pk if project else None,
+        'profile': profile.pk if profile else None,
+        'user': profile.user_id if profile else None,
+    }
+
+
+def discover_routes():
+    """ Returns ``(name, path)`` pairs for every GET-able route of the core and authentication apps """
+
+    samples = _sample_kwargs()
+    routes = []
+    for module in (core_urls, authentication_urls):
+        for pattern in module.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            name = f'{module.app_name}:{pattern.name}'
+            if name in SKIPPED_ROUTES:
+                continue
+            kwargs = {}
+            if 'pk' in pattern.pattern.converters:
+                pk = samples['profile'] if module is authentication_urls else samples['project']
+                if pk is None:
+                    continue
+                kwargs['pk'] = pk
+            routes.append((name, reverse(name, kwargs=kwargs)))
+    return routes
+
+
+def benchmark_route(client, name, path, requests, warmup=3):
+    """ Requests a route ``warmup + requests`` times and measures the latter """
+
+    for _ in range(warmup):
+        client.get(path)
+
+    latencies = []
+    queries = 0
+    status = None
+    started = time.perf_counter()
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries += len(context.captured_queries)
+        status = response.status_code
+    elapsed = time.perf_counter() - started
+
+    return RouteResult(
+        route=name,
+        path=path,
+        status=status,
+        requests=requests,
+        p50_ms=round(percentile(latencies, 0.50), 2),
+        p95_ms=round(percentile(latencies, 0.95), 2),
+        p99_ms=round(percentile(latencies, 0.99), 2),
+        mean_ms=round(statistics.fmean(latencies), 2),
+        throughput_rps=round(requests / elapsed, 2),
+        queries_per_request=round(queries / requests, 2),
+    )
+
+
+def run_benchmark(requests=50, routes=None, authenticated=True):
+    """
+    Benchmarks the given routes (all routes by default) and returns the results as a list of dicts.
+
+    With ``authenticated`` the requests are made as the author of the sampled project, so the login protected
+    routes render their pages instead of redirecting.
+    """
+
+    client = Client(raise_request_exception=False)
+    if authenticated:
+        user_id = _sample_kwargs()['user']
+        if user_id is not None:
+            client.force_login(User.objects.get(pk=user_id))
+
+    instrumentation = logging.getLogger('core.instrumentation')
+    level = instrumentation.level
+    instrumentation.setLevel(logging.ERROR)
+    try:
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            return [
+                asdict(benchmark_route(client, name, path, requests))
+                for name, path in (routes or discover_routes())
+            ]
+    finally:
+        instrumentation.setLevel(level)
+
+
+def _summary(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'mean_ms': round(statistics.fmean(latencies), 2),
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+    }
+
+
+def _wsgi_get(application, path):
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path}
+    setup_testing_defaults(environ)
+    statuses = []
+    start = time.perf_counter()
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(int(status.split()[0])))
+    try:
+        b''.join(response)
+    finally:
+        # Sends request_finished, like a WSGI server does once the response is written.
+        response.close()
+    return (time.perf_counter() - start) * 1000, statuses[0]
+
+
+async def _asgi_get(application, path):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    statuses = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    start = time.perf_counter()
+    await application(scope, receive, send)
+    return (time.perf_counter() - start) * 1000, statuses[0]
+
+
+def _load_wsgi(application, path, requests, concurrency, executor):
+    started = time.perf_counter()
+    results = list(executor.map(lambda _: _wsgi_get(application, path), range(requests)))
+    return results, time.perf_counter() - started
+
+
+def _load_asgi(application, path, requests, concurrency, executor):
+    async def load():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call():
+            async with semaphore:
+                return await _asgi_get(application, path)
+
+        return await asyncio.gather(*(call() for _ in range(requests)))
+
+    started = time.perf_counter()
+    results = asyncio.run(load())
+    return results, time.perf_counter() - started
+
+
+def load_through_handler(paths, requests=200, concurrency=16):
+    """
+    Loads every path with ``concurrency`` simultaneous anonymous requests through the application this process
+    deploys, ASGI_APPLICATION when ASYNC_VIEWS is set and WSGI_APPLICATION otherwise, so the middleware and the
+    handler are measured along with the view. A first round of ``concurrency`` requests warms the process up.
+
+    Returns, per path, the latency summary, the number of non-200 responses and the number of database connections
+    opened during the measured requests.
+    """
+
+    application = import_string(settings.ASGI_APPLICATION if settings.ASYNC_VIEWS else settings.WSGI_APPLICATION)
+    load = _load_asgi if settings.ASYNC_VIEWS else _load_wsgi
+    opened = []
+
+    def count_connection(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    connection_created.connect(count_connection)
+    instrumentation = logging.getLogger('core.instrumentation')
+    level = instrumentation.level
+    instrumentation.setLevel(logging.ERROR)
+    try:
+        report = {}
+        # The threads of the WSGI server, kept across the requests like a real server does.
+        with override_settings(ALLOWED_HOSTS=['*']), ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for path in paths:
+                load(application, path, concurrency, concurrency, executor)
+                opened.clear()
+                results, elapsed = load(application, path, requests, concurrency, executor)
+                summary = _summary([latency for latency, _ in results], elapsed)
+                summary['errors'] = sum(status != 200 for _, status in results)
+                summary['connections_opened'] = len(opened)
+                report[path] = summary
+        return report
+    finally:
+        instrumentation.setLevel(level)
+        connection_created.disconnect(count_connection)
+
+
+def compare_view_modes(requests=200, concurrency=16):
+    """
+    Loads the project and profile pages with ``concurrency`` simultaneous anonymous requests through the WSGI
+    application with the sync views and through the ASGI application with the async views, and returns the latency
+    percentiles, the throughput and the connections opened of both modes.
+
+    The URLconf picks the views of a mode when it is imported, so every mode is measured in a new process (see
+    ``load_through_handler``).
+    """
+
+    samples = _sample_kwargs()
+    paths = {
+        name: reverse(name, kwargs={'pk': samples[sample]})
+        for name, sample in (('core:project', 'project'), ('authentication:user-profile', 'profile'))
+        if samples[sample] is not None
+    }
+    script = VIEW_MODE_SCRIPT.format(settings_module=os.environ.get('DJANGO_SETTINGS_MODULE', 'Code-Book.settings'))
+    modes = {}
+    for mode, flag in (('sync', '0'), ('async', '1')):
+        process = subprocess.run(
+            [sys.executable, '-c', script, flag, json.dumps(list(paths.values())), str(requests), str(concurrency)],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        modes[mode] = json.loads(process.stdout)
+    return [
+        {'route': name, 'path': path, 'concurrency': concurrency, **{mode: modes[mode][path] for mode in modes}}
+        for name, path in paths.items()
+    ]
@@ -0,0 +1,280 @@
+"""
+Streaming import and export of users, profiles, skills, projects and reviews.
+
+Records use the same shape as Django fixtures (``{"model": ..., "pk": ..., "fields": {...}}``) with one record per
+line (JSONL). Many-to-many fields are stored as lists of primary keys in relation order, so the ``sort_value`` of the
+sortedm2m relations survives a round trip. Both directions work in constant memory: the exporter reads the tables
+in chunks and the importer parses the input incrementally and inserts it with batched ``bulk_create`` calls.
+"""
+
+import json
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+
+from core import skill_catalog, skill_index
+from core.recommendations import profile_recommender, project_recommender
+from core.search import rebuild_index
+from core.utils import recompute_profile_stats, recompute_vote_counters
+
+# The supported models in dependency order.
+MODEL_LABELS = [
+    'auth.user',
+    'authentication.skill',
+    'authentication.profile',
+    'core.project',
+    'core.review',
+]
+
+
+def get_models():
+    return [apps.get_model(label) for label in MODEL_LABELS]
+
+
+def _m2m_fields(model):
+    """ Returns the many-to-many fields of a model that point at another supported model """
+
+    return [
+        field for field in model._meta.many_to_many
+        if field.remote_field.through._meta.auto_created and field.related_model._meta.label_lower in MODEL_LABELS
+    ]
+
+
+def _value(field, obj):
+    value = field.value_from_object(obj)
+    if isinstance(field, models.FileField):
+        return value.name or None
+    return value
+
+
+def _sort_field_name(field):
+    return getattr(field.remote_field.through, '_sort_field_name', None)
+
+
+def iter_fixture(file, chunk_size=64 * 1024):
+    """ Yields the records of a JSON array fixture one by one without loading the whole document """
+
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        chunk = file.read(chunk_size)
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started:
+                if position < len(buffer) and buffer[position] == '[':
+                    started = True
+                    position += 1
+                    continue
+                if position < len(buffer):
+                    raise ValueError('A fixture must contain a JSON array.')
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            yield record
+        buffer = buffer[position:]
+        if not chunk:
+            if buffer.strip():
+                raise ValueError('The fixture ended unexpectedly.')
+            return
+
+
+def iter_records(file):
+    """ Yields the records of a JSONL file, or of a JSON array fixture if the input starts with ``[`` """
+
+    first = file.read(1)
+    while first and first.isspace():
+        first = file.read(1)
+    if first == '[':
+        yield from iter_fixture(_Prepend(first, file))
+        return
+
+    for line in _lines(first, file):
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+class _Prepend:
+    """ A file wrapper handing out an already consumed prefix before the rest of the file """
+
+    def __init__(self, prefix, file):
+        self.prefix = prefix
+        self.file = file
+
+    def read(self, size=-1):
+        prefix, self.prefix = self.prefix, ''
+        return prefix + self.file.read(size)
+
+
+def _lines(first, file):
+    line = first + file.readline()
+    while line:
+        yield line
+        line = file.readline()
+
+
+def export_records(selected_models=None, chunk_size=2000):
+    """ Yields the records of every row of the given models (all supported models by default) in chunks """
+
+    for model in selected_models or get_models():
+        label = model._meta.label_lower
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        m2m_fields = _m2m_fields(model)
+
+        batch = []
+        for obj in model._default_manager.order_by('pk').iterator(chunk_size=chunk_size):
+            batch.append(obj)
+            if len(batch) == chunk_size:
+                yield from _serialize_batch(label, batch, fields, m2m_fields)
+                batch = []
+        if batch:
+            yield from _serialize_batch(label, batch, fields, m2m_fields)
+
+
+def _serialize_batch(label, batch, fields, m2m_fields):
+    related = {field.name: _related_ids(field, [obj.pk for obj in batch]) for field in m2m_fields}
+    for obj in batch:
+        values = {field.name: _value(field, obj) for field in fields}
+        for name, ids in related.items():
+            values[name] = ids.get(obj.pk, [])
+        yield {'model': label, 'pk': obj.pk, 'fields': values}
+
+
+def _related_ids(field, pks):
+    """ Returns ``{pk: [related ids]}`` for a chunk of objects with a single query on the through table """
+
+    through = field.remote_field.through
+    source = field.m2m_column_name()
+    target = field.m2m_reverse_name()
+    ordering = [source, _sort_field_name(field) or 'pk']
+    ids = {}
+    for source_id, target_id in (
+        through._default_manager.filter(**{f'{source}__in': pks}).order_by(*ordering).values_list(source, target)
+    ):
+        ids.setdefault(source_id, []).append(target_id)
+    return ids
+
+
+def write_jsonl(records, file):
+    """ Writes records to a file, one JSON document per line. Returns the number of records written. """
+
+    count = 0
+    for record in records:
+        file.write(json.dumps(record, cls=DjangoJSONEncoder))
+        file.write('\n')
+        count += 1
+    return count
+
+
+class Importer:
+    """
+    Inserts records with batched ``bulk_create`` calls.
+
+    Records of unsupported models are skipped and counted. Since bulk inserts send no signals, ``finish`` resets the
+    sequences of the imported tables; rebuilding the derived data (counters, indexes) is up to the caller.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.models = {model._meta.label_lower: model for model in get_models()}
+        self.pending = {label: [] for label in self.models}
+        self.pending_m2m = {}
+        self.counts = {label: 0 for label in self.models}
+        self.skipped = 0
+
+    def add(self, record):
+        label = record.get('model', '').lower()
+        model = self.models.get(label)
+        if model is None:
+            self.skipped += 1
+            return
+
+        values = dict(record.get('fields', {}))
+        for field in _m2m_fields(model):
+            related_ids = values.pop(field.name, None) or []
+            through = self.pending_m2m.setdefault((label, field.name), [])
+            through.extend(_through_row(field, record['pk'], related_id, position)
+                           for position, related_id in enumerate(related_ids, 1))
+
+        obj = model(pk=record.get('pk'))
+        for name, value in values.items():
+            field = model._meta.get_field(name)
+            if field.many_to_many:
+                continue
+            target = field.target_field if field.is_relation else field
+            setattr(obj, field.attname, target.to_python(value) if value is not None else None)
+        self.pending[label].append(obj)
+
+        if len(self.pending[label]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """ Inserts every pending row, parents before the rows referencing them """
+
+        for label, model in self.models.items():
+            objs, self.pending[label] = self.pending[label], []
+            if objs:
+                model._default_manager.bulk_create(objs, batch_size=self.batch_size)
+                self.counts[label] += len(objs)
+
+        for (label, name), rows in self.pending_m2m.items():
+            if rows:
+                through = self.models[label]._meta.get_field(name).remote_field.through
+                through._default_manager.bulk_create(rows, batch_size=self.batch_size)
+                rows.clear()
+
+    def finish(self):
+        self.flush()
+        statements = connection.ops.sequence_reset_sql(no_style(), list(self.models.values()))
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+        return self.counts
+
+
+def _through_row(field, source_id, target_id, position):
+    through = field.remote_field.through
+    values = {field.m2m_column_name(): source_id, field.m2m_reverse_name(): target_id}
+    sort_field_name = _sort_field_name(field)
+    if sort_field_name:
+        values[sort_field_name] = position
+    return through(**values)
+
+
+def import_records(records, batch_size=1000):
+    """ Imports an iterable of records in a single transaction. Returns ``(counts per model, skipped records)``. """
+
+    importer = Importer(batch_size=batch_size)
+    with transaction.atomic():
+        for record in records:
+            importer.add(record)
+        counts = importer.finish()
+    return counts, importer.skipped
+
+
+def refresh_derived_data(rebuild=True):
+    """
+    Brings up to date what the signal handlers maintain, after a bulk load that sent no signals.
+
+    The cached skill catalog and skill posting lists are dropped and, unless ``rebuild`` is False, the vote counters,
+    the profile stats, the search index and the similar projects and profiles are rebuilt.
+    """
+
+    skill_catalog.invalidate()
+    skill_index.invalidate_all()
+    if rebuild:
+        recompute_vote_counters()
+        recompute_profile_stats()
+        rebuild_index()
+        project_recommender().rebuild()
+        profile_recommender().rebuild()
@@ -0,0 +1,134 @@
+"""
+Per-object caching of the rendered project and profile cards.
+
+A card is cached under a key derived from the data it renders: the ``modified`` timestamp of the object and of its
+author's profile, the author's name, the vote counters and the ``(id, modified)`` pairs of its skills in their sorted
+order. Everything that goes into the key is already loaded for rendering the card (see ``Project.objects.for_cards``),
+so computing it costs no queries, and any save of the project, profile, skill or user yields a new key, leaving the
+stale fragment to expire.
+
+The hit and miss counters are kept in the shared cache, so they add up the cards served by every process. Each process
+counts in memory and adds its counts to them every ``CARD_CACHE_STATS_INTERVAL`` seconds, instead of writing to the
+cache for every card. The counts of another process may therefore lag by that interval. Redis increments the counters
+atomically, while the file based cache reads and rewrites them, so two processes adding their counts at the same
+moment may lose one of the additions.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+HITS_KEY = 'card-cache:hits'
+MISSES_KEY = 'card-cache:misses'
+
+
+def _skills_version(obj):
+    return [(skill.pk, skill.modified.timestamp()) for skill in obj.skills.all()]
+
+
+def _user_version(user):
+    return (user.pk, user.first_name, user.last_name, user.username) if user else None
+
+
+def _profile_version(profile):
+    return (profile.pk, profile.modified.timestamp()) if profile else None
+
+
+def project_card_key(project):
+    """ Returns the cache key of a project card """
+
+    user = project.user
+    version = (
+        project.pk,
+        project.modified.timestamp(),
+        project.up_votes,
+        project.review_count,
+        _user_version(user),
+        _profile_version(getattr(user, 'profile', None)),
+        _skills_version(project),
+    )
+    return 'card:project:' + hashlib.md5(repr(version).encode()).hexdigest()
+
+
+def profile_card_key(profile):
+    """ Returns the cache key of a profile card """
+
+    version = (
+        profile.pk,
+        profile.modified.timestamp(),
+        _user_version(profile.user),
+        _skills_version(profile),
+    )
+    return 'card:profile:' + hashlib.md5(repr(version).encode()).hexdigest()
+
+
+# The counts of this process not yet added to the shared counters, and when they were last added
+_pending = {HITS_KEY: 0, MISSES_KEY: 0}
+_pending_lock = threading.Lock()
+_flushed = time.monotonic()
+
+
+def _take_pending():
+    global _flushed
+    with _pending_lock:
+        counts = dict(_pending)
+        _pending.update(dict.fromkeys(_pending, 0))
+        _flushed = time.monotonic()
+    return counts
+
+
+def _count(key):
+    with _pending_lock:
+        _pending[key] += 1
+        due = time.monotonic() - _flushed >= settings.CARD_CACHE_STATS_INTERVAL
+    if due:
+        flush_stats()
+
+
+def flush_stats():
+    """ Adds the hits and misses counted by this process since the last call to the shared counters """
+
+    for key, count in _take_pending().items():
+        if not count:
+            continue
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            cache.add(key, 0, None)
+            cache.incr(key, count)
+        # Backends without their own increment store the new value with the default timeout.
+        cache.touch(key, None)
+
+
+def get_or_render(key, render):
+    """ Returns the cached fragment stored under the key, rendering and caching it on a miss """
+
+    fragment = cache.get(key)
+    if fragment is not None:
+        _count(HITS_KEY)
+        return fragment
+
+    _count(MISSES_KEY)
+    fragment = render()
+    cache.set(key, fragment, settings.CARD_CACHE_TIMEOUT)
+    return fragment
+
+
+def get_stats():
+    """ Returns the hit and miss counters of the card cache, with the latest counts of this process """
+
+    flush_stats()
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else 0.0}
+
+
+def reset_stats():
+    """ Resets the hit and miss counters of the card cache """
+
+    _take_pending()
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,75 @@
+"""
+Helpers for running independent ORM reads concurrently from async views.
+
+Django's async ORM methods all run in the single thread reserved for thread sensitive code, so awaiting several of
+them still executes the queries one after another. ``gather_reads`` instead runs every read in a worker thread of a
+small dedicated pool (``ASYNC_READ_WORKERS`` threads) and awaits them together. Each worker thread keeps its own
+database connection between requests, like the thread of a sync request does, so the connection setup (and its
+PRAGMAs) is only paid once per worker and CONN_MAX_AGE. The queries of the worker threads are recorded in the metrics
+of the request (see ``QueryInstrumentationMiddleware``).
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.shortcuts import render
+
+from core.middleware import instrument_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _read_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.ASYNC_READ_WORKERS, thread_name_prefix='async-read')
+        return _executor
+
+
+def _in_worker(func):
+    def wrapper():
+        try:
+            with instrument_connections():
+                return func()
+        finally:
+            # Only closes the connection of the worker once it is older than CONN_MAX_AGE or unusable, otherwise it
+            # is kept for the next read run by this worker.
+            close_old_connections()
+
+    return sync_to_async(wrapper, thread_sensitive=False, executor=_read_executor())
+
+
+def warm_read_workers():
+    """
+    Starts every worker thread of the pool and opens its database connections, so the first requests served by the
+    async views do not pay for them. Called by asgi.py when the application is loaded.
+    """
+
+    barrier = threading.Barrier(settings.ASYNC_READ_WORKERS)
+
+    def connect():
+        # Holding every worker at the barrier makes the pool start a new thread for each of these calls.
+        barrier.wait()
+        for alias in connections:
+            connections[alias].ensure_connection()
+
+    for future in [_read_executor().submit(connect) for _ in range(settings.ASYNC_READ_WORKERS)]:
+        future.result()
+
+
+async def gather_reads(*funcs):
+    """ Runs the given zero-argument callables concurrently in worker threads and returns their results in order """
+
+    return await asyncio.gather(*(_in_worker(func)() for func in funcs))
+
+
+async def arender(request, template_name, context):
+    """ Renders a template off the event loop; the context must not contain unevaluated querysets """
+
+    return await _in_worker(lambda: render(request, template_name, context))()
@@ -0,0 +1,171 @@
+"""
+Helpers for answering conditional GET requests.
+
+A response is validated by an ETag hashed from whatever identifies the version of its content, typically the
+``modified`` timestamps of the objects it shows, and by the latest of those timestamps as Last-Modified. When the
+client already has that version, a 304 is returned before the response is built.
+
+The HTML detail pages are validated by the latest ``modified`` of everything they show, including the time their
+recommendations were stored and the ``modified`` of the recommended objects, read by a single query
+(``project_last_modified`` and ``profile_last_modified``), and by who is looking at them (see ``PageValidator``).
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import DateTimeField, Max, OuterRef, Subquery
+from django.db.models.functions import Greatest
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from authentication.models import Profile, SimilarProfile
+from core.models import Project, Review, SimilarProject
+
+
+def make_etag(*parts):
+    """ Returns a quoted ETag hashed from the given parts """
+
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def not_modified(request, etag, last_modified=None):
+    """ Returns a 304 response if the client's copy matches the validators, None if the response must be built """
+
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified=None):
+    """ Adds the ETag and Last-Modified headers to a response """
+
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def _latest(values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def _latest_skill(through, column):
+    """ Returns a subquery of the latest ``modified`` of the skills of an object, aggregated instead of sorted """
+
+    return through.order_by().values(column).annotate(latest=Max('skill__modified')).values('latest')
+
+
+def _latest_neighbour(neighbours, column):
+    """ Returns a subquery of the latest time the neighbours of an object were stored or modified """
+
+    return (
+        neighbours.order_by().values(column)
+        .annotate(latest=Greatest(Max('created'), Max('similar__modified'), output_field=DateTimeField()))
+        .values('latest')
+    )
+
+
+def project_last_modified(pk):
+    """
+    Returns the latest ``modified`` of a project, its reviews, the profiles of its reviewers, its skills, its author's
+    profile and its similar projects, or None if the project does not exist.
+
+    Renaming a user bumps the ``modified`` of their reviews (see core.signals), so the names shown in the review
+    thread are covered by the reviews.
+    """
+
+    reviews = Review.objects.filter(project=OuterRef('pk')).order_by('-modified').values('modified')[:1]
+    reviewers = (
+        Review.objects.filter(project=OuterRef('pk')).order_by()
+        .values('project').annotate(latest=Max('user__profile__modified')).values('latest')
+    )
+    skills = _latest_skill(Project.skills.through.objects.filter(project=OuterRef('pk')), 'project')
+    profile = Profile.objects.filter(user=OuterRef('user')).order_by().values('modified')[:1]
+    similar = _latest_neighbour(SimilarProject.objects.filter(project=OuterRef('pk')), 'project')
+    row = Project.objects.filter(pk=pk).order_by('pk').values_list(
+        'modified', Subquery(reviews), Subquery(reviewers), Subquery(skills), Subquery(profile), Subquery(similar),
+    ).first()
+    return _latest(row) if row else None
+
+
+def profile_last_modified(pk):
+    """
+    Returns the latest ``modified`` of a profile, its skills, the projects of its user and its similar profiles, or
+    None if the profile does not exist.
+    """
+
+    skills = _latest_skill(Profile.skills.through.objects.filter(profile=OuterRef('pk')), 'profile')
+    projects = (
+        Project.objects.filter(user=OuterRef('user')).order_by()
+        .values('user').annotate(latest=Max('modified')).values('latest')
+    )
+    similar = _latest_neighbour(SimilarProfile.objects.filter(profile=OuterRef('pk')), 'profile')
+    row = Profile.objects.filter(pk=pk).order_by('pk').values_list(
+        'modified', Subquery(skills), Subquery(projects), Subquery(similar),
+    ).first()
+    return _latest(row) if row else None
+
+
+class PageValidator:
+    """
+    Validates an HTML page showing data last modified at ``last_modified``.
+
+    The page differs per user (and embeds the user's CSRF token), so the ETag covers both. Anonymous pages are
+    marked public for ``DETAIL_PAGE_MAX_AGE`` seconds so a reverse proxy can cache them, authenticated ones private
+    and always revalidated. A page with pending messages to show is neither answered with a 304 nor made public.
+    Reading the user and the messages may query the database, so async views create validators in a worker thread.
+    """
+
+    def __init__(self, request, last_modified):
+        self.request = request
+        self.last_modified = last_modified
+        self.etag = make_etag(
+            request.get_full_path(),
+            request.user.pk,
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+            last_modified.timestamp(),
+        )
+        self.has_messages = bool(len(get_messages(request)))
+        self.public = not request.user.is_authenticated and not self.has_messages
+
+    def not_modified(self):
+        """ Returns a 304 response if the client's copy is current, None if the page must be built """
+
+        if self.has_messages:
+            return None
+        response = not_modified(self.request, self.etag, self.last_modified)
+        return self.finalize(response) if response is not None else None
+
+    def finalize(self, response):
+        """ Adds the validators and the cache headers to the response """
+
+        set_validators(response, self.etag, self.last_modified)
+        if self.public:
+            patch_cache_control(response, public=True, max_age=settings.DETAIL_PAGE_MAX_AGE)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Cookie'])
+        return response
+
+
+def page_validator(request, last_modified):
+    """ Returns the validator of a page, or None if there is no data to show (``last_modified`` is None) """
+
+    return PageValidator(request, last_modified) if last_modified is not None else None
+
+
+class ConditionalPageMixin:
+    """ A DetailView mixin answering conditional GETs from ``get_last_modified()`` before the object is loaded """
+
+    def get_last_modified(self):
+        raise NotImplementedError('ConditionalPageMixin requires a get_last_modified() method')
+
+    def get(self, request, *args, **kwargs):
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            raise Http404(f'No {self.get_queryset().model._meta.verbose_name} found matching the query')
+        validator = PageValidator(request, last_modified)
+        return validator.not_modified() or validator.finalize(super().get(request, *args, **kwargs))
@@ -2,20 +2,22 @@
 
 from django import forms
 from django.forms import ModelForm
-from sortedm2m.forms import SortedCheckboxSelectMultiple
 
+from authentication.widgets import SkillAutocompleteWidget
 from core.models import Project, Review
 
 
 class ProjectForm(ModelForm):
     """ A form for creating and updating project instances """
 
-    skills = SortedCheckboxSelectMultiple()
-
     class Meta:
         model = Project
         exclude = ['user']
 
+        widgets = {
+            'skills': SkillAutocompleteWidget(),
+        }
+
     def __init__(self, *args, **kwargs):
         super(ProjectForm, self).__init__(*args, **kwargs)
         for visible in self.visible_fields():
@@ -0,0 +1,140 @@
+"""
+Resized derivatives of uploaded images.
+
+Every featured image and profile picture gets a WebP and a JPEG copy at each of the widths in ``DERIVATIVE_WIDTHS``,
+stored next to the media under ``derivatives/``. Derivatives are generated by a background task (see
+core.task_queue) queued with the upload, and the templates reference them through ``srcset``.
+"""
+
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from core.task_queue import enqueue
+
+# The named sizes used by the templates, and the widths generated for every image.
+SIZES = {
+    'avatar': 96,
+    'card': 400,
+    'detail': 800,
+}
+DERIVATIVE_WIDTHS = sorted(set(SIZES.values()) | {192, 1600})
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def derivatives_directory(name):
+    """ Returns the storage directory of the derivatives of an image """
+
+    root, _ = os.path.splitext(name)
+    return f'derivatives/{root}'
+
+
+def derivative_name(name, width, extension):
+    """ Returns the storage name of the derivative of an image at the given width and format """
+
+    return f'{derivatives_directory(name)}/{width}.{extension}'
+
+
+def delete_derivatives(name):
+    """ Deletes the derivatives of an image """
+
+    directory = derivatives_directory(name)
+    if default_storage.exists(directory):
+        for file_name in default_storage.listdir(directory)[1]:
+            default_storage.delete(f'{directory}/{file_name}')
+
+
+def _encode(image, width, image_format, options):
+    from PIL import Image
+
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_derivatives(name, force=False):
+    """
+    Generates the missing derivatives of the stored image with the given name.
+
+    Images are never upscaled, smaller originals are only re-encoded. Returns the number of files written.
+    """
+
+    if not name or not default_storage.exists(name):
+        return 0
+
+    targets = [
+        (width, extension)
+        for width in DERIVATIVE_WIDTHS
+        for extension in FORMATS
+        if force or not default_storage.exists(derivative_name(name, width, extension))
+    ]
+    if not targets:
+        return 0
+
+    # Pillow is imported here rather than with the module, which every process loads through the views and the
+    # signal handlers, since only the task workers encode images.
+    from PIL import Image, ImageOps
+
+    with default_storage.open(name, 'rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    for width, extension in targets:
+        image_format, options = FORMATS[extension]
+        target = derivative_name(name, width, extension)
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        default_storage.save(target, ContentFile(_encode(image, width, image_format, options)))
+    return len(targets)
+
+
+def generate_derivatives_for(model, pk, field_name):
+    """ Generates the derivatives of the image stored in a field of an object """
+
+    name = model.objects.filter(pk=pk).values_list(field_name, flat=True).first()
+    if generate_derivatives(name):
+        # Touching the row changes the cache keys and validators of every page showing the image.
+        model.objects.filter(pk=pk).update(modified=timezone.now())
+
+
+def schedule_derivatives(instance, field_name):
+    """ Queues the generation of the derivatives of an image field of an instance """
+
+    label = instance._meta.label_lower
+    enqueue(
+        'generate_image_derivatives',
+        {'model': label, 'pk': instance.pk, 'field_name': field_name},
+        dedupe_key=f'derivatives:{label}:{instance.pk}:{field_name}',
+    )
+
+
+def image_sources(image, size):
+    """
+    Returns the sources of a responsive image as a dict with ``src``, ``webp_srcset`` and ``jpeg_srcset``.
+
+    Falls back to the original image when its derivatives have not been generated yet.
+    """
+
+    url = image.url if image else ''
+    sources = {'src': url, 'webp_srcset': '', 'jpeg_srcset': ''}
+    if not image or not default_storage.exists(derivative_name(image.name, SIZES[size], 'jpg')):
+        return sources
+
+    widths = [width for width in DERIVATIVE_WIDTHS if width <= SIZES[size] * 2]
+    for extension, key in (('webp', 'webp_srcset'), ('jpg', 'jpeg_srcset')):
+        sources[key] = ', '.join(
+            f'{default_storage.url(derivative_name(image.name, width, extension))} {width}w' for width in widths
+        )
+    sources['src'] = default_storage.url(derivative_name(image.name, SIZES[size], 'jpg'))
+    return sources
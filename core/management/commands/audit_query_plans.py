@@ -0,0 +1,50 @@
+""" Management command that reports the full table scans, temporary sorts and deep page index scans of the routes """
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.query_audit import audit_routes
+
+
+class Command(BaseCommand):
+    """ Replays the queries of every route with EXPLAIN QUERY PLAN and reports the plans that do not scale """
+
+    help = (
+        'Requests every route of the core and authentication apps against the current database, replays their '
+        'SELECT statements with EXPLAIN QUERY PLAN and reports full table scans and temporary B-tree sorts, and the '
+        'index scans of the next page of the keyset paginated routes. '
+        'Known bounded statements are listed in the QUERY_PLAN_AUDIT_EXPECTED setting.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--anonymous',
+            action='store_true',
+            help='Make the requests without logging in.'
+        )
+        parser.add_argument(
+            '--fail',
+            action='store_true',
+            help='Exit with an error if any problem is found, for use in CI.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The query plan audit only supports SQLite.')
+
+        audits = audit_routes(authenticated=not options['anonymous'])
+        problems = 0
+        for audit in audits:
+            if not audit.problems:
+                self.stdout.write(f'{audit.route} ({audit.path}): {audit.queries} queries, OK')
+                continue
+            problems += len(audit.problems)
+            self.stdout.write(self.style.WARNING(
+                f'{audit.route} ({audit.path}): {audit.queries} queries, {len(audit.problems)} problem(s)'
+            ))
+            for problem in audit.problems:
+                self.stdout.write(f'  {problem.kind}: {problem.detail}\n    {problem.sql}')
+
+        if problems and options['fail']:
+            raise CommandError(f'Found {problems} query plan problem(s).')
+        self.stdout.write(self.style.SUCCESS(f'Audited {len(audits)} pages, found {problems} problem(s).'))
@@ -0,0 +1,69 @@
+""" Management command that benchmarks every route and reports the results as JSON """
+
+import json
+import platform
+import sys
+
+import django
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.benchmark import compare_view_modes, run_benchmark
+
+
+class Command(BaseCommand):
+    """ Reports p50/p95/p99 latency, throughput and queries per request of every route as JSON """
+
+    help = (
+        'Benchmarks every route of the core and authentication apps through the test client against the current '
+        'database (see generate_data) and prints the results as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='The number of measured requests per route.'
+        )
+        parser.add_argument(
+            '--anonymous',
+            action='store_true',
+            help='Make the requests without logging in.'
+        )
+        parser.add_argument(
+            '--compare-async',
+            action='store_true',
+            help='Compare the sync and async detail views under concurrent load instead of benchmarking every route.'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='The number of simultaneous requests of --compare-async.'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            help='The file to write the JSON report to. Defaults to the standard output.'
+        )
+
+    def handle(self, *args, **options):
+        report = {
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'requests_per_route': options['requests'],
+            'authenticated': not options['anonymous'],
+        }
+        if options['compare_async']:
+            report['view_modes'] = compare_view_modes(requests=options['requests'], concurrency=options['concurrency'])
+        else:
+            report['routes'] = run_benchmark(requests=options['requests'], authenticated=not options['anonymous'])
+        output = json.dumps(report, indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+            self.stderr.write(self.style.SUCCESS(f'Wrote the report to {options["output"]}.'))
+        else:
+            sys.stdout.write(output + '\n')
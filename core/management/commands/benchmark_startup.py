@@ -0,0 +1,68 @@
+""" Management command that benchmarks process startup and reports the results as JSON """
+
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from django.utils import timezone
+
+from core.startup import first_request, manage_py, profile_imports, time_command
+
+
+class Command(BaseCommand):
+    """ Reports the import time per module, the duration of a management command and the first request latency """
+
+    help = (
+        'Starts fresh processes to measure the import time of every module and package during a management command, '
+        'the duration of that command, and the latency of the first request served by a new process, and prints the '
+        'medians as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='The number of processes started per measurement.'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=25,
+            help='The number of modules and packages to list.'
+        )
+        parser.add_argument(
+            '--command',
+            default='check',
+            help='The management command whose startup is measured (default: check).'
+        )
+        parser.add_argument(
+            '--path',
+            help='The path requested by the first request (default: the projects page).'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            help='The file to write the JSON report to. Defaults to the standard output.'
+        )
+
+    def handle(self, *args, **options):
+        command = manage_py(*options['command'].split())
+        report = {
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'runs': options['runs'],
+            'command': {'args': command[1:], **time_command(command, options['runs'])},
+            'imports': profile_imports(command, options['runs'], options['top']),
+            'first_request': first_request(options['path'] or reverse('core:projects'), options['runs']),
+        }
+        output = json.dumps(report, indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+            self.stderr.write(self.style.SUCCESS(f'Wrote the report to {options["output"]}.'))
+        else:
+            self.stdout.write(output)
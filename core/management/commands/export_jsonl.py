@@ -0,0 +1,49 @@
+""" Management command that streams users, profiles, skills, projects and reviews out as JSONL """
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bulk_io import export_records, iter_fixture, write_jsonl
+
+
+class Command(BaseCommand):
+    """ Exports the database (or converts a JSON fixture) to JSONL in constant memory """
+
+    help = (
+        'Exports users, profiles, skills, projects and reviews as JSONL, one fixture-style record per line. '
+        'With --from-fixture a dumpdata style JSON fixture is converted to JSONL instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-o', '--output',
+            help='The file to write to. Defaults to the standard output.'
+        )
+        parser.add_argument(
+            '--from-fixture',
+            help='Convert the given JSON fixture (e.g. data.json) instead of reading the database.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='The number of rows fetched from the database at a time.'
+        )
+
+    def handle(self, *args, **options):
+        output = open(options['output'], 'w', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            if options['from_fixture']:
+                try:
+                    with open(options['from_fixture'], encoding='utf-8') as fixture:
+                        count = write_jsonl(iter_fixture(fixture), output)
+                except (OSError, ValueError) as error:
+                    raise CommandError(f'Could not convert {options["from_fixture"]}: {error}')
+            else:
+                count = write_jsonl(export_records(chunk_size=options['chunk_size']), output)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        self.stderr.write(self.style.SUCCESS(f'Wrote {count} record(s).'))
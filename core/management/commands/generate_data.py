@@ -0,0 +1,150 @@
+""" Management command that fills the database with synthetic users, profiles, skills, projects and reviews """
+
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from authentication.models import Profile, Skill
+from core.bulk_io import refresh_derived_data
+from core.models import Project, Review
+
+WORDS = (
+    'api async cache cloud cli dashboard data engine fast graph http lab lite micro mobile net open pipeline '
+    'platform portal realtime service smart stack stream studio sync tool tracker vision web'
+).split()
+FIRST_NAMES = 'Ada Alan Barbara Dennis Edsger Grace Guido John Ken Linus Margaret Niklaus Radia Tim Yukihiro'.split()
+LAST_NAMES = 'Backus Hopper Kay Knuth Lamport Liskov Lovelace Perlman Ritchie Stroustrup Thompson Torvalds'.split()
+
+
+def zipf_weights(count, exponent=1.1):
+    """ Returns power-law weights so that a few items are very popular and most are rare """
+
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def power_law_count(rng, minimum, maximum, alpha=1.5):
+    """ Draws an integer in [minimum, maximum] from a Pareto distribution """
+
+    return min(maximum, int(minimum * rng.paretovariate(alpha)))
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+class Command(BaseCommand):
+    """ Generates a reproducible synthetic dataset with realistic, skewed distributions """
+
+    help = (
+        'Creates synthetic users (with profiles), skills, projects and reviews. Skill popularity follows a Zipf '
+        'distribution and both the skills per project and the reviews per project follow a power law.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='The number of users (and profiles) to create.')
+        parser.add_argument('--skills', type=int, default=200, help='The number of skills to create.')
+        parser.add_argument('--projects', type=int, default=5000, help='The number of projects to create.')
+        parser.add_argument(
+            '--max-reviews',
+            type=int,
+            default=500,
+            help='The maximum number of reviews of a single project.'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='The seed making the dataset reproducible.')
+        parser.add_argument('--batch-size', type=int, default=2000, help='The number of rows per bulk insert.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+
+        with transaction.atomic():
+            skills = self.create_skills(options['skills'], batch_size)
+            users = self.create_users(rng, options['users'], skills, batch_size)
+            projects = self.create_projects(rng, options['projects'], users, skills, batch_size)
+            reviews = self.create_reviews(rng, projects, users, options['max_reviews'], batch_size)
+
+        # Bulk inserts send no signals, so the data normally maintained by the signal handlers is rebuilt here.
+        refresh_derived_data()
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(users)} users, {len(skills)} skills, {len(projects)} projects and {reviews} reviews.'
+        ))
+
+    def create_skills(self, count, batch_size):
+        start = Skill.objects.count()
+        skills = [Skill(name=f'Skill {start + index}', description='A synthetic skill.') for index in range(count)]
+        return Skill.objects.bulk_create(skills, batch_size=batch_size)
+
+    def create_users(self, rng, count, skills, batch_size):
+        start = User.objects.count()
+        # Hashing is deliberately slow, every synthetic user shares a single hash of the same password.
+        password = make_password('password')
+        users = User.objects.bulk_create([
+            User(
+                username=f'user{start + index}',
+                email=f'user{start + index}@example.com',
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                password=password,
+            )
+            for index in range(count)
+        ], batch_size=batch_size)
+
+        profiles = Profile.objects.bulk_create([
+            Profile(
+                user=user,
+                short_intro=sentence(rng, 4),
+                bio=sentence(rng, 40),
+                gender=rng.choice(Profile.GenderChoices.values),
+            )
+            for user in users
+        ], batch_size=batch_size)
+        self.assign_skills(rng, Profile.skills.through, 'profile_id', profiles, skills, batch_size)
+        return users
+
+    def create_projects(self, rng, count, users, skills, batch_size):
+        # Authorship is skewed as well: a few users own many projects.
+        authors = rng.choices(users, weights=zipf_weights(len(users), 0.8), k=count)
+        projects = Project.objects.bulk_create([
+            Project(user=author, title=sentence(rng, 3), description=sentence(rng, 60)) for author in authors
+        ], batch_size=batch_size)
+        self.assign_skills(rng, Project.skills.through, 'project_id', projects, skills, batch_size)
+        return projects
+
+    def assign_skills(self, rng, through, column, objs, skills, batch_size):
+        weights = zipf_weights(len(skills))
+        rows = []
+        for obj in objs:
+            picked = []
+            for skill in rng.choices(skills, weights=weights, k=power_law_count(rng, 1, min(15, len(skills)))):
+                if skill not in picked:
+                    picked.append(skill)
+            rows.extend(
+                through(**{column: obj.pk, 'skill_id': skill.pk, 'sort_value': position})
+                for position, skill in enumerate(picked, 1)
+            )
+        through.objects.bulk_create(rows, batch_size=batch_size)
+
+    def create_reviews(self, rng, projects, users, max_reviews, batch_size):
+        total = 0
+        batch = []
+        for project in projects:
+            count = power_law_count(rng, 1, min(max_reviews, len(users) - 1) + 1, alpha=1.2) - 1
+            reviewers = [user for user in rng.sample(users, count + 1) if user.pk != project.user_id][:count]
+            batch.extend(
+                Review(
+                    user=reviewer,
+                    project=project,
+                    vote='Up' if rng.random() < 0.75 else 'Down',
+                    body=sentence(rng, 12),
+                )
+                for reviewer in reviewers
+            )
+            if len(batch) >= batch_size:
+                Review.objects.bulk_create(batch, batch_size=batch_size)
+                total += len(batch)
+                batch = []
+        Review.objects.bulk_create(batch, batch_size=batch_size)
+        return total + len(batch)
@@ -0,0 +1,35 @@
+""" Management command that backfills the resized derivatives of existing images """
+
+from django.core.management.base import BaseCommand
+
+from authentication.models import Profile
+from core.images import generate_derivatives
+from core.models import Project
+
+
+class Command(BaseCommand):
+    """ Generates the WebP and JPEG derivatives of every featured image and profile picture """
+
+    help = 'Generates the missing resized derivatives of all project featured images and profile pictures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate the derivatives even if they already exist.'
+        )
+
+    def handle(self, *args, **options):
+        names = set()
+        for model, field_name in ((Project, 'featured_image'), (Profile, 'profile_picture')):
+            names.update(model.objects.exclude(**{field_name: ''}).values_list(field_name, flat=True).distinct())
+        names.discard(None)
+
+        written = 0
+        for name in sorted(names):
+            try:
+                written += generate_derivatives(name, force=options['force'])
+            except OSError as error:
+                self.stderr.write(f'Skipping {name}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} derivative(s) for {len(names)} image(s).'))
@@ -0,0 +1,47 @@
+""" Management command that streams users, profiles, skills, projects and reviews in from JSONL """
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bulk_io import import_records, iter_records, refresh_derived_data
+
+
+class Command(BaseCommand):
+    """ Imports a JSONL export (or a JSON fixture such as data.json) with batched bulk inserts """
+
+    help = (
+        'Imports users, profiles, skills, projects and reviews from a JSONL file or a JSON fixture. '
+        'Records of other models are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The JSONL file or JSON fixture to import.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of rows inserted per bulk insert.'
+        )
+        parser.add_argument(
+            '--skip-derived',
+            action='store_true',
+            help=(
+                'Do not recompute the vote counters, the profile stats, the search index and the recommendations '
+                'after the import.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8') as file:
+                counts, skipped = import_records(iter_records(file), batch_size=options['batch_size'])
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Could not import {options["path"]}: {error}')
+
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        if skipped:
+            self.stdout.write(f'Skipped {skipped} record(s) of unsupported models.')
+
+        # Bulk inserts send no signals, so the data normally maintained by the signal handlers is rebuilt here.
+        refresh_derived_data(rebuild=not options['skip_derived'])
+        self.stdout.write(self.style.SUCCESS('Import finished.'))
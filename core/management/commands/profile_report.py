@@ -0,0 +1,57 @@
+""" Management command that summarizes the request profiles recorded by RequestProfilerMiddleware """
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import aggregate, load_profiles
+
+
+class Command(BaseCommand):
+    """ Prints the mean timings and the hottest functions of every profiled view """
+
+    help = (
+        'Aggregates the request profiles of REQUEST_PROFILE_DIR by view and prints, for every view, the number of '
+        'profiled requests, their mean wall, CPU and DB time, and the functions with the most time summed across them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Number of functions to list per view (default: 20).'
+        )
+        parser.add_argument(
+            '--view',
+            help='Only report this URL name, e.g. core:project.'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=['cumulative', 'self'],
+            default='cumulative',
+            help='Rank the functions by cumulative time (default) or by time spent in their own code.'
+        )
+        parser.add_argument(
+            '--directory',
+            help='Directory of the profiles (default: REQUEST_PROFILE_DIR).'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory'] or settings.REQUEST_PROFILE_DIR
+        summaries = aggregate(load_profiles(directory, options['view']), options['top'], options['sort'])
+        if not summaries:
+            self.stdout.write(self.style.WARNING(f'No profiles found in {directory}.'))
+            return
+
+        for summary in summaries:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{summary["view"] or "(unresolved)"}: {summary["requests"]} request(s), '
+                f'wall {summary["wall_time_ms"]} ms, CPU {summary["cpu_time_ms"]} ms, '
+                f'DB {summary["db_time_ms"]} ms, {summary["queries"]} queries (means)'
+            ))
+            self.stdout.write(f'  {"self ms":>10} {"cumul. ms":>10} {"calls":>8}  function')
+            for function in summary['functions']:
+                self.stdout.write(
+                    f'  {function["self_ms"]:>10.2f} {function["cumulative_ms"]:>10.2f} '
+                    f'{function["calls"] or "":>8}  {function["function"]}'
+                )
@@ -0,0 +1,67 @@
+""" Management command that creates user accounts and their profiles in bulk from CSV or JSONL """
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.provisioning import iter_rows, provision_users
+
+
+class Command(BaseCommand):
+    """ Provisions users from a CSV file (with a header line) or a JSONL file, reporting the rejected rows """
+
+    help = (
+        'Creates users and their profiles from a CSV or JSONL file with the columns username, email, password, '
+        'first_name, last_name, short_intro and bio. Passwords are hashed in a pool of processes and rows are '
+        'inserted in batches. Invalid rows and taken usernames are reported instead of aborting the run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The CSV or JSONL file to read.')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='The format of the file, guessed from its extension by default.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of rows validated, hashed and inserted together.'
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=None,
+            help='The number of processes hashing passwords, the number of CPUs by default.'
+        )
+        parser.add_argument(
+            '--report',
+            help='A CSV file receiving the line, the username and the reason of every rejected row.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        try:
+            with open(path, encoding='utf-8', newline='') as file:
+                report = provision_users(
+                    iter_rows(file, file_format),
+                    batch_size=options['batch_size'],
+                    processes=options['processes'],
+                )
+        except OSError as error:
+            raise CommandError(f'Could not read {path}: {error}')
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(['line', 'username', 'error'])
+                writer.writerows(report.errors)
+        else:
+            for line, username, message in report.errors:
+                self.stderr.write(f'Line {line} ({username}): {message}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {report.created} user(s), rejected {len(report.errors)} row(s).'
+        ))
@@ -0,0 +1,29 @@
+""" Management command that recomputes the similar projects and profiles """
+
+from django.core.management.base import BaseCommand
+
+from core.recommendations import profile_recommender, project_recommender
+
+
+class Command(BaseCommand):
+    """ Recomputes the top-k neighbours of every project and profile from their skills """
+
+    help = (
+        'Recomputes the similar projects and the similar profiles from scratch. The signal handlers only refresh the '
+        'neighbours incrementally, a rebuild also brings the skill weights up to date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of objects whose neighbours are stored per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        projects = project_recommender().rebuild(batch_size=options['batch_size'])
+        profiles = profile_recommender().rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the recommendations of {projects} projects and {profiles} profiles.'
+        ))
@@ -0,0 +1,23 @@
+""" Management command that rebuilds the full-text search index """
+
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    """ Reindexes every project and profile into the FTS5 search index """
+
+    help = 'Rebuilds the full-text search index of projects and profiles from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='The number of objects indexed per batch.'
+        )
+
+    def handle(self, *args, **options):
+        rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS('Rebuilt the search index.'))
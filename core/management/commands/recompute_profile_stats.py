@@ -0,0 +1,28 @@
+""" Management command that repairs the denormalized activity stats of profiles """
+
+from django.core.management.base import BaseCommand
+
+from authentication.models import Profile
+from core.utils import recompute_profile_stats
+
+
+class Command(BaseCommand):
+    """ Recomputes the project, review and vote counts and the last activity of profiles """
+
+    help = 'Recomputes the activity stats of all (or the given) profiles from the projects and reviews of their users.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'profile_ids',
+            nargs='*',
+            type=int,
+            help='The ids of the profiles to recompute. All the profiles are recomputed if omitted.'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Profile.objects.all()
+        if options['profile_ids']:
+            queryset = queryset.filter(pk__in=options['profile_ids'])
+
+        updated = recompute_profile_stats(queryset)
+        self.stdout.write(self.style.SUCCESS(f'Recomputed the stats of {updated} profile(s).'))
@@ -0,0 +1,35 @@
+""" Management command that repairs the denormalized vote counters of projects """
+
+from django.core.management.base import BaseCommand
+
+from core.models import Project
+from core.ranking import rebase_trending_scores
+from core.utils import recompute_vote_counters
+
+
+class Command(BaseCommand):
+    """
+    Recomputes up_votes, down_votes, review_count and the ranking scores of projects from their reviews, after moving
+    the epoch of the trending scores forward (see core.ranking), which should happen at least every few years.
+    """
+
+    help = 'Recomputes the vote counters of all (or the given) projects from their reviews.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'project_ids',
+            nargs='*',
+            type=int,
+            help='The ids of the projects to recompute. All the projects are recomputed if omitted.'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Project.objects.all()
+        if options['project_ids']:
+            queryset = queryset.filter(pk__in=options['project_ids'])
+
+        moved = rebase_trending_scores()
+        if moved:
+            self.stdout.write(f'Moved the trending epoch forward by {moved} half life(s).')
+        updated = recompute_vote_counters(queryset)
+        self.stdout.write(self.style.SUCCESS(f'Recomputed the vote counters of {updated} project(s).'))
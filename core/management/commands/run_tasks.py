@@ -0,0 +1,66 @@
+""" Management command that works off the background task queue """
+
+import multiprocessing
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import task_worker
+from core.task_queue import run_pending, work
+
+
+class Command(BaseCommand):
+    """ Runs the queued background tasks in a pool of worker processes """
+
+    help = (
+        'Runs the jobs of the background task queue as they become due, in one or more worker processes. '
+        'With --burst the workers exit once no job is due.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='The number of worker processes. With 1 the jobs run in this process.'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no job is due instead of polling for new ones.'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help='Seconds an idle worker waits before polling again, TASK_POLL_INTERVAL by default.'
+        )
+
+    def handle(self, *args, **options):
+        processes, burst, poll_interval = options['processes'], options['burst'], options['poll_interval']
+        if processes < 1:
+            raise CommandError('--processes must be at least 1.')
+
+        if processes == 1:
+            if burst:
+                self.stdout.write(self.style.SUCCESS(f'Ran {run_pending()} job(s).'))
+            else:
+                work(poll_interval=poll_interval)
+            return
+
+        context = multiprocessing.get_context('spawn')
+        workers = [
+            context.Process(target=task_worker.main, args=(burst, poll_interval), name=f'task-worker-{index}')
+            for index in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            # The jobs leased by the workers are run again once their lease ends.
+            for worker in workers:
+                worker.terminate()
+        if any(worker.exitcode for worker in workers):
+            raise CommandError('A worker process failed.')
+        self.stdout.write(self.style.SUCCESS(f'{processes} worker(s) finished.'))
@@ -0,0 +1,37 @@
+""" Management command that refreshes the SQLite read replicas from the primary database """
+
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    """ Copies the primary SQLite database into every replica file with SQLite's online backup API """
+
+    help = (
+        'Refreshes the SQLite files of DATABASE_REPLICAS from the primary database. SQLite has no replication, so '
+        'running this periodically stands in for it when trying the read/write routing locally.'
+    )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Only SQLite databases can be synced by this command.')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replicas are configured, see CODE_BOOK_DB_REPLICAS.')
+
+        for alias in settings.DATABASE_REPLICAS:
+            # Drop the persistent connection of the replica so it does not keep reading the replaced pages.
+            connections[alias].close()
+            source = sqlite3.connect(primary['NAME'])
+            target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+            try:
+                with target:
+                    source.backup(target)
+                target.execute('PRAGMA journal_mode = WAL')
+            finally:
+                source.close()
+                target.close()
+            self.stdout.write(self.style.SUCCESS(f'Synced {alias} from the primary.'))
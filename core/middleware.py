@@ -0,0 +1,249 @@
+""" Middleware measuring what every request spends on SQL queries and template rendering, profiling some, and routing
+their reads """
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from core import profiling
+from core.routers import replica_reads, track_writes
+
+logger = logging.getLogger('core.instrumentation')
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class BudgetExceeded(AssertionError):
+    """ Raised when a request exceeds its budget and ``REQUEST_BUDGET_ACTION`` is ``'raise'`` """
+
+
+class RequestMetrics:
+    """
+    The queries and the timings collected for a single request.
+
+    The queries of the worker threads of an async view (see ``core.concurrency``) are recorded as well, so the
+    figures are updated under a lock.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.db_time = 0.0
+        self.statement_times = Counter()
+        self.template_time = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        """ Acts as a database execute wrapper, timing and recording every query """
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.db_time += elapsed
+                self.statement_times[sql] += elapsed
+                self.queries.append((sql, repr(params)))
+
+    def add_template_time(self, elapsed):
+        with self.lock:
+            self.template_time += elapsed
+
+    def duplicates(self):
+        """ Returns the number of queries repeated with the very same parameters """
+
+        return sum(count - 1 for count in Counter(self.queries).values() if count > 1)
+
+    def similar(self):
+        """ Returns the number of queries repeating an earlier statement with other parameters, the mark of N+1 """
+
+        return sum(count - 1 for count in Counter(sql for sql, _ in self.queries).values() if count > 1)
+
+    def slowest_statements(self, limit):
+        """ Returns the statements that took the most time in total, with their count and time in milliseconds """
+
+        counts = Counter(sql for sql, _ in self.queries)
+        return [
+            {'sql': sql, 'count': counts[sql], 'time_ms': round(elapsed * 1000, 2)}
+            for sql, elapsed in self.statement_times.most_common(limit)
+        ]
+
+
+def current_metrics():
+    """ Returns the RequestMetrics of the request being served by the current context, None outside of requests """
+
+    return _current_metrics.get()
+
+
+def instrument_connections():
+    """
+    Returns a context manager recording the queries of the current thread's connections in the metrics of the
+    current request, if any.
+    """
+
+    stack = ExitStack()
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+    return stack
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records the query count, DB time, template render time and total time of every request.
+
+    The figures are logged as one JSON line per request on the ``core.instrumentation`` logger, added as response
+    headers when ``DEBUG`` is on and checked against the budgets in ``REQUEST_BUDGETS``, keyed by URL name, e.g.
+    ``{'core:project': {'queries': 10, 'db_time_ms': 50}}``. A request over budget is logged as a warning, or raises
+    ``BudgetExceeded`` when ``REQUEST_BUDGET_ACTION`` is ``'raise'`` (meant for the test suite).
+
+    The metrics of the request are kept in a context variable, which worker threads inherit: ``core.concurrency``
+    instruments their connections and the ``core.template_backends.TimedDjangoTemplates`` backend adds the render
+    times.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with instrument_connections():
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        total_time = time.perf_counter() - start
+
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        report = {
+            'view': view_name,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': len(metrics.queries),
+            'duplicate_queries': metrics.duplicates(),
+            'similar_queries': metrics.similar(),
+            'db_time_ms': round(metrics.db_time * 1000, 2),
+            'template_time_ms': round(metrics.template_time * 1000, 2),
+            'total_time_ms': round(total_time * 1000, 2),
+        }
+        logger.info(json.dumps(report))
+
+        if settings.DEBUG:
+            response['X-Query-Count'] = report['queries']
+            response['X-Duplicate-Queries'] = report['duplicate_queries']
+            response['X-Similar-Queries'] = report['similar_queries']
+            response['Server-Timing'] = (
+                f'db;dur={report["db_time_ms"]}, template;dur={report["template_time_ms"]}, '
+                f'total;dur={report["total_time_ms"]}'
+            )
+
+        self.check_budget(report)
+        return response
+
+    def check_budget(self, report):
+        """ Compares the report with the budget of its view """
+
+        budget = getattr(settings, 'REQUEST_BUDGETS', {}).get(report['view'])
+        if not budget:
+            return
+
+        exceeded = {name: (report[name], limit) for name, limit in budget.items() if report[name] > limit}
+        if not exceeded:
+            return
+
+        message = f'{report["view"]} exceeded its budget: ' + ', '.join(
+            f'{name}={value} (limit {limit})' for name, (value, limit) in exceeded.items()
+        )
+        if getattr(settings, 'REQUEST_BUDGET_ACTION', 'log') == 'raise':
+            raise BudgetExceeded(message)
+        logger.warning(message)
+
+
+class RequestProfilerMiddleware:
+    """
+    Profiles a sample of the requests and writes their profiles to ``REQUEST_PROFILE_DIR`` (see ``core.profiling``).
+
+    Each profile holds the view name, the wall and CPU time of the request, its query count, DB time and slowest
+    statements, and its hottest functions. Must come right after ``QueryInstrumentationMiddleware``, whose metrics
+    provide the SQL summary. The middleware removes itself when no request can be profiled.
+    """
+
+    def __init__(self, get_response):
+        if not (settings.REQUEST_PROFILE_SAMPLE_RATE or settings.REQUEST_PROFILE_VIEWS
+                or settings.REQUEST_PROFILE_TOKEN):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        view_name = None
+        if settings.REQUEST_PROFILE_VIEWS:
+            try:
+                view_name = resolve(request.path_info).view_name
+            except Resolver404:
+                pass
+        trigger = profiling.profile_trigger(request, view_name)
+        if trigger is None:
+            return self.get_response(request)
+
+        profiler = profiling.make_profiler()
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        wall_time, cpu_time = time.perf_counter() - start, time.thread_time() - cpu_start
+
+        match = request.resolver_match
+        record = profiling.build_record(
+            request, response, match.view_name if match else view_name, trigger, profiler, _current_metrics.get(),
+            wall_time, cpu_time,
+        )
+        try:
+            profiling.write_profile(record, profiler)
+        except OSError:
+            logger.exception('Could not write the profile of %s', request.path)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the reads of safe requests to the read replicas (see ``core.routers``).
+
+    An unsafe request of a signed in user that wrote to the database and succeeded pins the reads of the session to
+    the primary for ``REPLICA_PIN_SECONDS``, so a user who just posted a review or edited a project sees the change
+    even if the replicas lag behind. Anonymous posts, rejected forms and signing out do not pin. Must come after the
+    session and authentication middleware.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+    SESSION_KEY = '_primary_pinned_until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in self.SAFE_METHODS:
+            with track_writes() as writes:
+                response = self.get_response(request)
+            if writes.written and response.status_code < 400 and request.user.is_authenticated:
+                request.session[self.SESSION_KEY] = time.time() + settings.REPLICA_PIN_SECONDS
+            return response
+
+        if request.session.get(self.SESSION_KEY, 0) > time.time():
+            return self.get_response(request)
+        with replica_reads():
+            return self.get_response(request)
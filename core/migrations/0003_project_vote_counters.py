@@ -0,0 +1,41 @@
+# Generated by Django 4.2.2 on 2026-10-17 20:28
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_vote_counters(apps, schema_editor):
+    Project = apps.get_model('core', 'Project')
+    for project in Project.objects.annotate(
+        up=Count('review', filter=Q(review__vote='Up')),
+        down=Count('review', filter=Q(review__vote='Down')),
+        total=Count('review'),
+    ).iterator():
+        Project.objects.filter(pk=project.pk).update(up_votes=project.up, down_votes=project.down,
+                                                     review_count=project.total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_drop_vote_tabel_add_vote_field_in_review'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='down_votes',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of down votes the project has received.'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of reviews the project has received.'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='up_votes',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of up votes the project has received.'),
+        ),
+        migrations.RunPython(populate_vote_counters, migrations.RunPython.noop),
+    ]
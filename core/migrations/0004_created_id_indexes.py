@@ -0,0 +1,21 @@
+# Generated by Django 4.2.2 on 2026-10-17 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_project_vote_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created', 'id'], name='project_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['project', 'created', 'id'], name='review_project_created_id_idx'),
+        ),
+    ]
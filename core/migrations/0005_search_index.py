@@ -0,0 +1,72 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "title, body, people, skills, prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+)
+DROP_SQL = 'DROP TABLE IF EXISTS search_index'
+INSERT_SQL = 'INSERT INTO search_index (rowid, title, body, people, skills) VALUES (%s, %s, %s, %s, %s)'
+CLEAR_SQL = 'DELETE FROM search_index'
+BATCH_SIZE = 1000
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_SQL)
+
+
+def _join(*values):
+    return ' '.join(value for value in values if value)
+
+
+def _people(user):
+    return _join(user.first_name, user.last_name, user.username) if user else ''
+
+
+def populate_search_index(apps, schema_editor):
+    """ Indexes the existing projects and profiles like core.search.rebuild_index(), with the historical models """
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    Project = apps.get_model('core', 'Project')
+    Profile = apps.get_model('authentication', 'Profile')
+    # Row ids are pk * 2 for projects and pk * 2 + 1 for profiles (see core.search).
+    sources = (
+        (Project, 0, lambda project: (project.title or '', project.description or '')),
+        (Profile, 1, lambda profile: (profile.short_intro or '', profile.bio or '')),
+    )
+    with schema_editor.connection.cursor() as cursor:
+        for model, kind, text in sources:
+            objects = model.objects.order_by('pk').select_related('user').prefetch_related('skills')
+            documents = []
+            for obj in objects.iterator(chunk_size=BATCH_SIZE):
+                skills = _join(*(skill.name for skill in obj.skills.all()))
+                documents.append((obj.pk * 2 + kind, *text(obj), _people(obj.user), skills))
+                if len(documents) == BATCH_SIZE:
+                    cursor.executemany(INSERT_SQL, documents)
+                    documents = []
+            cursor.executemany(INSERT_SQL, documents)
+
+
+def clear_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CLEAR_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_profile_created_id_index'),
+        ('core', '0004_created_id_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate_search_index, clear_search_index),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.2 on 2026-10-17 20:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='The TF-IDF weighted cosine similarity of the skills of both projects.')),
+                ('project', models.ForeignKey(help_text='The project the neighbour is recommended for.', on_delete=django.db.models.deletion.CASCADE, related_name='similar_projects', to='core.project')),
+                ('similar', models.ForeignKey(help_text='The recommended project.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.project')),
+            ],
+            options={
+                'ordering': ['project', '-score'],
+                'indexes': [models.Index(fields=['project', '-score'], name='similar_project_score_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similarproject',
+            constraint=models.UniqueConstraint(fields=('project', 'similar'), name='unique_similar_project'),
+        ),
+    ]
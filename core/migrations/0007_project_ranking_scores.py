@@ -0,0 +1,47 @@
+# Generated by Django 4.2.2 on 2026-10-17 20:43
+
+from django.db import migrations, models
+
+from core.ranking import trending_weight, wilson_lower_bound
+
+
+def populate_ranking_scores(apps, schema_editor):
+    Project = apps.get_model('core', 'Project')
+    Review = apps.get_model('core', 'Review')
+    trending = {}
+    for project_id, vote, created in Review.objects.values_list('project_id', 'vote', 'created').iterator():
+        trending[project_id] = trending.get(project_id, 0.0) + trending_weight(vote, created)
+    for project in Project.objects.only('pk', 'up_votes', 'down_votes').iterator():
+        Project.objects.filter(pk=project.pk).update(
+            wilson_score=wilson_lower_bound(project.up_votes, project.down_votes),
+            trending_score=trending.get(project.pk, 0.0),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_similar_project'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, help_text='The votes of the project weighted by their recency, only comparable with other trending scores.'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='wilson_score',
+            field=models.FloatField(default=0, editable=False, help_text='The lower bound of the Wilson score interval of the share of up votes, used to rank projects.'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['wilson_score', 'id'], name='project_wilson_score_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['trending_score', 'id'], name='project_trending_score_id_idx'),
+        ),
+        migrations.RunPython(populate_ranking_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-17 20:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_project_ranking_scores'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['project', 'modified'], name='review_project_modified_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.2 on 2026-10-17 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_review_project_modified_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['user', 'created', 'id'], name='project_user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['project', 'user'], name='review_project_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['project', 'vote'], name='review_project_vote_idx'),
+        ),
+        # The through table of the sorted skills is created by the field, so its index is added with plain SQL. It
+        # serves the skills of a project in their sorted order without a temporary sort.
+        migrations.RunSQL(
+            'CREATE INDEX "core_project_skills_sort_idx" ON "core_project_skills" ("project_id", "sort_value")',
+            'DROP INDEX "core_project_skills_sort_idx"',
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.2 on 2026-10-17 20:59
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('name', models.CharField(help_text='The registered name of the task to run.', max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='The keyword arguments of the task.')),
+                ('dedupe_key', models.CharField(blank=True, help_text='A key shared by equivalent jobs, only one of which may be pending at a time.', max_length=200, null=True)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Running', 'Running'), ('Failed', 'Failed')], default='Pending', help_text='Pending jobs are run once due, running ones are leased to a worker, failed ones gave up.', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='The number of times the job was started.')),
+                ('run_after', models.DateTimeField(help_text='The moment the job becomes due, pushed back after each failed attempt.')),
+                ('claimed_by', models.CharField(blank=True, help_text='The token of the worker batch running the job.', max_length=32, null=True)),
+                ('locked_until', models.DateTimeField(blank=True, help_text='The end of the lease of a running job, after which it is run again.', null=True)),
+                ('last_error', models.TextField(blank=True, help_text='The traceback of the last failed attempt.')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after', 'id'], name='task_status_run_after_idx'), models.Index(fields=['name', 'status', 'run_after', 'id'], name='task_name_status_run_after_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'Pending')), fields=('dedupe_key',), name='unique_pending_task_dedupe_key'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.2 on 2026-10-17 21:05
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_task_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='featured_image',
+            field=models.ImageField(blank=True, db_index=True, default='projects/default.jpg', help_text='The featured image of the project, stored once per distinct content (see core.storage).', null=True, storage=core.storage.ContentAddressedStorage(), upload_to='projects/'),
+        ),
+    ]
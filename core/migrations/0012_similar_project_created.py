@@ -0,0 +1,19 @@
+# Generated by Django 4.2.2 on 2026-10-17 21:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_blob_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='similarproject',
+            name='created',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the neighbour was stored, the list of neighbours being replaced as a whole.'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.2 on 2026-10-17 21:15
+
+from django.db import migrations
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def populate_profile_stats(apps, schema_editor):
+    Profile = apps.get_model('authentication', 'Profile')
+    Project = apps.get_model('core', 'Project')
+    Review = apps.get_model('core', 'Review')
+
+    def per_user(queryset, user_field, aggregate):
+        return Subquery(
+            queryset.filter(**{user_field: OuterRef('user')}).order_by()
+            .values(user_field).annotate(value=aggregate).values('value')
+        )
+
+    def count(queryset, user_field):
+        return Coalesce(per_user(queryset, user_field, Count('pk')), Value(0))
+
+    Profile.objects.update(
+        project_count=count(Project.objects.all(), 'user'),
+        reviews_written=count(Review.objects.all(), 'user'),
+        up_votes_received=count(Review.objects.filter(vote='Up'), 'project__user'),
+        down_votes_received=count(Review.objects.filter(vote='Down'), 'project__user'),
+        last_activity=Greatest(
+            'created',
+            Coalesce(per_user(Project.objects.all(), 'user', Max('created')), 'created'),
+            Coalesce(per_user(Review.objects.all(), 'user', Max('created')), 'created'),
+        ),
+    )
+
+
+# Computes the activity stats added to profiles by authentication 0007. The backfill reads projects and reviews, so it
+# lives in the core app: an authentication migration depending on core would have core 0001, which refers to the
+# skills of authentication 0001, planned before it.
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_profile_stats'),
+        ('core', '0012_similar_project_created'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_profile_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.2 on 2026-10-17 22:27
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_populate_profile_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingEpoch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('half_lives', models.IntegerField(default=0, help_text='The number of half lives between TRENDING_EPOCH and the moment a vote currently weighs 1.')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
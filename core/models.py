@@ -1,11 +1,28 @@
 """ This module contains models for the core app. """
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+from model_utils import FieldTracker
 from model_utils.models import TimeStampedModel
 from sortedm2m.fields import SortedManyToManyField
 
 from authentication.models import Skill
+from core.storage import ContentAddressedStorage
+
+
+class ProjectQuerySet(models.QuerySet):
+    """ A queryset with shortcuts for loading projects together with their related objects """
+
+    def for_cards(self):
+        """
+        Returns the projects with everything the project card template needs.
+
+        The author and the author's profile are joined in and the skills are prefetched (keeping their sorted order),
+        so rendering any number of cards costs a fixed number of queries.
+        """
+
+        return self.select_related('user__profile').prefetch_related('skills')
 
 
 class Project(TimeStampedModel):
@@ -31,10 +48,12 @@ class Project(TimeStampedModel):
     )
     featured_image = models.ImageField(
         upload_to='projects/',
+        storage=ContentAddressedStorage(),
         default='projects/default.jpg',
         blank=True,
         null=True,
-        help_text='The featured image of the project.'
+        db_index=True,
+        help_text='The featured image of the project, stored once per distinct content (see core.storage).'
     )
     youtube_link = models.CharField(
         max_length=200,
@@ -60,10 +79,54 @@ class Project(TimeStampedModel):
         related_name='Project',
         help_text='The relevant skills in the project.'
     )
+    up_votes = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='The number of up votes the project has received.'
+    )
+    down_votes = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='The number of down votes the project has received.'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='The number of reviews the project has received.'
+    )
+    wilson_score = models.FloatField(
+        default=0,
+        editable=False,
+        help_text='The lower bound of the Wilson score interval of the share of up votes, used to rank projects.'
+    )
+    trending_score = models.FloatField(
+        default=0,
+        editable=False,
+        help_text='The votes of the project weighted by their recency, only comparable with other trending scores.'
+    )
+
+    objects = ProjectQuerySet.as_manager()
+    tracker = FieldTracker(fields=['featured_image'])
 
     def __str__(self):
         return self.title
 
+    @property
+    def votes_ratio(self):
+        """ Returns the percentage of up votes out of all the reviews of the project """
+
+        if not self.review_count:
+            return 0
+        return (self.up_votes * 100) // self.review_count
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created', 'id'], name='project_created_id_idx'),
+            models.Index(fields=['wilson_score', 'id'], name='project_wilson_score_id_idx'),
+            models.Index(fields=['trending_score', 'id'], name='project_trending_score_id_idx'),
+            models.Index(fields=['user', 'created', 'id'], name='project_user_created_id_idx'),
+        ]
+
 
 class Review(TimeStampedModel):
     """ A model representing a review for a project """
@@ -96,5 +159,131 @@ class Review(TimeStampedModel):
         help_text='The content of the review.'
     )
 
+    tracker = FieldTracker(fields=['vote', 'project'])
+
     def __str__(self):
         return self.vote
+
+    def save(self, *args, **kwargs):
+        """ Saves the review and, through the post_save handlers, the counters it changes in a single transaction """
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'created', 'id'], name='review_project_created_id_idx'),
+            models.Index(fields=['project', 'modified'], name='review_project_modified_idx'),
+            models.Index(fields=['project', 'user'], name='review_project_user_idx'),
+            models.Index(fields=['project', 'vote'], name='review_project_vote_idx'),
+        ]
+
+
+class SimilarProject(models.Model):
+    """ A precomputed neighbour of a project, ranked by the similarity of their skills """
+
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='similar_projects',
+        help_text='The project the neighbour is recommended for.'
+    )
+    similar = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text='The recommended project.'
+    )
+    score = models.FloatField(
+        help_text='The TF-IDF weighted cosine similarity of the skills of both projects.'
+    )
+    created = models.DateTimeField(
+        default=timezone.now,
+        help_text='When the neighbour was stored, the list of neighbours being replaced as a whole.'
+    )
+
+    class Meta:
+        ordering = ['project', '-score']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'similar'], name='unique_similar_project'),
+        ]
+        indexes = [
+            models.Index(fields=['project', '-score'], name='similar_project_score_idx'),
+        ]
+
+
+class Task(TimeStampedModel):
+    """ A job of the background task queue (see core.task_queue) """
+
+    StatusChoices = models.TextChoices('Status', 'Pending, Running, Failed')
+    name = models.CharField(
+        max_length=100,
+        help_text='The registered name of the task to run.'
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='The keyword arguments of the task.'
+    )
+    dedupe_key = models.CharField(
+        max_length=200,
+        blank=True,
+        null=True,
+        help_text='A key shared by equivalent jobs, only one of which may be pending at a time.'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices.choices,
+        default='Pending',
+        help_text='Pending jobs are run once due, running ones are leased to a worker, failed ones gave up.'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text='The number of times the job was started.'
+    )
+    run_after = models.DateTimeField(
+        help_text='The moment the job becomes due, pushed back after each failed attempt.'
+    )
+    claimed_by = models.CharField(
+        max_length=32,
+        blank=True,
+        null=True,
+        help_text='The token of the worker batch running the job.'
+    )
+    locked_until = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text='The end of the lease of a running job, after which it is run again.'
+    )
+    last_error = models.TextField(
+        blank=True,
+        help_text='The traceback of the last failed attempt.'
+    )
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status='Pending'),
+                name='unique_pending_task_dedupe_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_after', 'id'], name='task_status_run_after_idx'),
+            models.Index(fields=['name', 'status', 'run_after', 'id'], name='task_name_status_run_after_idx'),
+        ]
+
+
+class TrendingEpoch(TimeStampedModel):
+    """ How far the epoch of the trending scores was moved forward (see core.ranking), kept in a single row """
+
+    half_lives = models.IntegerField(
+        default=0,
+        help_text='The number of half lives between TRENDING_EPOCH and the moment a vote currently weighs 1.'
+    )
+
+    def __str__(self):
+        return f'TRENDING_EPOCH + {self.half_lives} half lives'
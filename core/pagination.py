@@ -0,0 +1,206 @@
+"""
+Keyset (cursor) pagination over TimeStampedModel querysets.
+
+Pages are selected with a ``(created, id)`` range condition instead of an OFFSET, so fetching a deep page costs the
+same as fetching the first one as long as ``(created, id)`` is indexed. Any other indexed ``(key, id)`` pair, such as
+the ranking scores of projects, can be paginated the same way, in ascending or descending order.
+"""
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(obj, key='created'):
+    """ Encodes the position of the given object into an opaque, URL safe cursor """
+
+    value = getattr(obj, key)
+    raw = f'{value.isoformat() if isinstance(value, datetime) else repr(value)}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, field=None):
+    """
+    Decodes a cursor into a ``(value, id)`` tuple, returns None if the cursor is malformed.
+
+    The value is parsed by the model ``field`` it was read from, a ``created`` timestamp by default.
+    """
+
+    try:
+        value, pk = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+        value = field.to_python(value) if field is not None else datetime.fromisoformat(value)
+        return value, int(pk)
+    except (ValueError, UnicodeError, ValidationError):
+        return None
+
+
+@dataclass
+class KeysetPage:
+    """ A single page of objects along with the cursors of the neighbouring pages """
+
+    object_list: list
+    has_next: bool
+    has_previous: bool
+    next_query: str = ''
+    previous_query: str = ''
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by ``(key, id)``, ``(created, id)`` by default, in ascending or ``descending`` order.
+
+    The cursors are read from the ``<prefix>after`` and ``<prefix>before`` query parameters and the page size can be
+    overridden with ``<prefix>page_size`` up to ``KEYSET_MAX_PAGE_SIZE``.
+
+    An optional ``match`` (any container of ids, such as a ``SkillMatch``) keeps only the objects whose id it contains:
+    the ids are walked in page order and the rows are loaded once the page is full.
+    """
+
+    def __init__(self, queryset, page_size=None, prefix='', key='created', descending=False, match=None):
+        self.queryset = queryset
+        self.match = match
+        self.page_size = page_size or settings.KEYSET_PAGE_SIZE
+        self.prefix = prefix
+        self.key = key
+        self.descending = descending
+
+    def _page_size(self, params):
+        try:
+            page_size = int(params.get(f'{self.prefix}page_size', self.page_size))
+        except ValueError:
+            page_size = self.page_size
+        return max(1, min(page_size, settings.KEYSET_MAX_PAGE_SIZE))
+
+    def _query(self, params, **cursors):
+        """ Returns the query string for a neighbouring page, keeping every unrelated parameter """
+
+        query = params.copy()
+        for name in ('after', 'before'):
+            query.pop(f'{self.prefix}{name}', None)
+        for name, cursor in cursors.items():
+            query[f'{self.prefix}{name}'] = cursor
+        return query.urlencode()
+
+    def _decode(self, params, name):
+        field = None if self.key == 'created' else self.queryset.model._meta.get_field(self.key)
+        return decode_cursor(params.get(f'{self.prefix}{name}', ''), field)
+
+    def _seek(self, queryset, cursor, forward):
+        """ Returns the objects past the cursor, ordered in the walking direction (the reverse one if not forward) """
+
+        ascending = forward != self.descending
+        lookup = 'gt' if ascending else 'lt'
+        if cursor is not None:
+            value, pk = cursor
+            # The leading range on the key alone lets SQLite seek the (key, id) index to the cursor, the OR then only
+            # filters out the rows sharing the cursor's key that come before it.
+            queryset = queryset.filter(
+                Q(**{f'{self.key}__{lookup}e': value}),
+                Q(**{f'{self.key}__{lookup}': value}) | Q(**{f'pk__{lookup}': pk}),
+            )
+        prefix = '' if ascending else '-'
+        return queryset.order_by(f'{prefix}{self.key}', f'{prefix}pk')
+
+    def _fetch(self, queryset, limit):
+        """ Returns the first ``limit`` objects of an ordered queryset that are in the match """
+
+        if self.match is None:
+            return list(queryset[:limit])
+
+        pks = []
+        for pk in queryset.prefetch_related(None).values_list('pk', flat=True).iterator():
+            if pk in self.match:
+                pks.append(pk)
+                if len(pks) == limit:
+                    break
+        objects = queryset.in_bulk(pks)
+        return [objects[pk] for pk in pks]
+
+    def get_page(self, params):
+        """ Returns the page selected by the given query parameters, an invalid cursor yields the first page """
+
+        page_size = self._page_size(params)
+        after = self._decode(params, 'after')
+        before = self._decode(params, 'before') if after is None else None
+
+        if before is not None:
+            rows = self._fetch(self._seek(self.queryset, before, forward=False), page_size + 1)
+            has_more = len(rows) > page_size
+            object_list = rows[:page_size][::-1]
+            has_next, has_previous = True, has_more
+        else:
+            rows = self._fetch(self._seek(self.queryset, after, forward=True), page_size + 1)
+            has_more = len(rows) > page_size
+            object_list = rows[:page_size]
+            has_next, has_previous = has_more, after is not None
+
+        page = KeysetPage(object_list, has_next=has_next and bool(object_list), has_previous=has_previous)
+        if page.has_next:
+            page.next_query = self._query(params, after=encode_cursor(object_list[-1], self.key))
+        if page.has_previous and object_list:
+            page.previous_query = self._query(params, before=encode_cursor(object_list[0], self.key))
+        elif page.has_previous:
+            page.previous_query = self._query(params)
+        return page
+
+
+class KeysetPaginationMixin:
+    """
+    A ListView mixin that replaces the object list with a keyset paginated page.
+
+    The page is exposed as ``cursor_page`` in the template context. The order of the pages is given by
+    ``get_keyset_ordering()`` as a ``(key, descending)`` pair and the rows are narrowed by the view's
+    ``skill_match``, if any (see ``SkillFilterMixin``).
+    """
+
+    keyset_page_size = None
+
+    def get_keyset_ordering(self):
+        return 'created', False
+
+    def get_context_data(self, **kwargs):
+        key, descending = self.get_keyset_ordering()
+        paginator = KeysetPaginator(self.object_list, self.keyset_page_size, key=key, descending=descending,
+                                    match=getattr(self, 'skill_match', None))
+        page = paginator.get_page(self.request.GET)
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context['cursor_page'] = page
+        return context
+
+
+class KeysetSortMixin:
+    """
+    A KeysetPaginationMixin companion ordering the pages by the ``?sort=`` option.
+
+    ``sort_orderings`` maps the options to ``(key, descending)`` orderings over indexed columns and ``sort_labels``
+    lists the ``(option, label)`` pairs exposed as ``sort_links`` in the template context, ``''`` being the default.
+    """
+
+    sort_orderings = {}
+    sort_labels = ()
+
+    def get_keyset_ordering(self):
+        return self.sort_orderings.get(self.request.GET.get('sort'), super().get_keyset_ordering())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        current = self.request.GET.get('sort', '')
+        context['sort_links'] = []
+        for sort, label in self.sort_labels:
+            query = self.request.GET.copy()
+            for name in ('sort', 'after', 'before'):
+                query.pop(name, None)
+            if sort:
+                query['sort'] = sort
+            context['sort_links'].append({'label': label, 'query': query.urlencode(), 'active': sort == current})
+        return context
@@ -0,0 +1,264 @@
+"""
+Profiling of a sample of requests (see ``RequestProfilerMiddleware``) and aggregation of the recorded profiles.
+
+A request is profiled when its URL name is listed in ``REQUEST_PROFILE_VIEWS``, when it carries the
+``X-Profile-Token`` header with the value of ``REQUEST_PROFILE_TOKEN``, or at random with the probability
+``REQUEST_PROFILE_SAMPLE_RATE``. Two profilers are available through ``REQUEST_PROFILER``:
+
+* ``'cprofile'`` traces every call with cProfile, exact but slowing down call heavy code;
+* ``'sampling'`` records the stack of the request's thread every ``REQUEST_PROFILE_SAMPLING_INTERVAL`` seconds from
+  another thread, cheap enough to leave on in production, with times estimated from the sample counts.
+
+Every profile is written as a JSON file to ``REQUEST_PROFILE_DIR``, along with the raw ``.prof`` stats for cProfile
+(readable with ``pstats`` or snakeviz), and only the last ``REQUEST_PROFILE_MAX_FILES`` profiles are kept. The
+``profile_report`` command aggregates them into the hottest functions of every view.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+PROFILE_HEADER = 'HTTP_X_PROFILE_TOKEN'
+
+
+def function_key(filename, line, name):
+    return f'{filename}:{line}({name})'
+
+
+def profile_trigger(request, view_name):
+    """ Returns why a request should be profiled, 'view', 'header' or 'sample', or None if it should not """
+
+    token = settings.REQUEST_PROFILE_TOKEN
+    if token and request.META.get(PROFILE_HEADER) == token:
+        return 'header'
+    if view_name in settings.REQUEST_PROFILE_VIEWS:
+        return 'view'
+    if random.random() < settings.REQUEST_PROFILE_SAMPLE_RATE:
+        return 'sample'
+    return None
+
+
+class CProfileProfiler:
+    """ Traces every call of the current thread with cProfile """
+
+    name = 'cprofile'
+
+    def __init__(self):
+        # Imported on use, like pstats below, to keep them out of the processes that never profile a request.
+        import cProfile
+
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def functions(self):
+        """ Returns the profiled functions as dicts of their call count, self time and cumulative time """
+
+        import pstats
+
+        stats = pstats.Stats(self.profile).stats
+        return [
+            {
+                'function': function_key(*key),
+                'calls': calls,
+                'self_ms': round(self_time * 1000, 3),
+                'cumulative_ms': round(cumulative_time * 1000, 3),
+            }
+            for key, (_, calls, self_time, cumulative_time, _) in stats.items()
+        ]
+
+    def dump(self, path):
+        self.profile.dump_stats(path)
+
+
+class SamplingProfiler:
+    """ Samples the stack of the current thread from a background thread at a fixed interval """
+
+    name = 'sampling'
+
+    def __init__(self, interval=None):
+        self.interval = interval or settings.REQUEST_PROFILE_SAMPLING_INTERVAL
+        self.thread_id = threading.get_ident()
+        self.samples = 0
+        self.self_counts = Counter()
+        self.cumulative_counts = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.sample(frame)
+
+    def sample(self, frame):
+        self.samples += 1
+        code = frame.f_code
+        self.self_counts[function_key(code.co_filename, code.co_firstlineno, code.co_name)] += 1
+        # A recursive function is counted once per sample in its cumulative time.
+        stack = set()
+        while frame is not None:
+            code = frame.f_code
+            stack.add(function_key(code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        self.cumulative_counts.update(stack)
+
+    def functions(self):
+        """ Returns the sampled functions as dicts of their estimated self time and cumulative time """
+
+        return [
+            {
+                'function': key,
+                'calls': None,
+                'self_ms': round(self.self_counts[key] * self.interval * 1000, 3),
+                'cumulative_ms': round(count * self.interval * 1000, 3),
+            }
+            for key, count in self.cumulative_counts.items()
+        ]
+
+    def dump(self, path):
+        pass
+
+
+PROFILERS = {profiler.name: profiler for profiler in (CProfileProfiler, SamplingProfiler)}
+
+
+def make_profiler():
+    name = settings.REQUEST_PROFILER
+    if name not in PROFILERS:
+        raise ValueError(f'Unknown REQUEST_PROFILER: {name}, expected one of {", ".join(PROFILERS)}')
+    return PROFILERS[name]()
+
+
+def top_functions(functions, limit, sort='cumulative'):
+    return sorted(functions, key=lambda function: function[f'{sort}_ms'], reverse=True)[:limit]
+
+
+def _rotate(directory, keep):
+    """ Deletes the oldest profiles of the directory so that at most ``keep`` are left """
+
+    names = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    for name in names[:max(0, len(names) - keep)]:
+        base = os.path.join(directory, name[:-len('.json')])
+        for path in (f'{base}.json', f'{base}.prof'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def write_profile(record, profiler):
+    """ Writes a profile record, and the raw stats of the profiler, to ``REQUEST_PROFILE_DIR`` and rotates it """
+
+    directory = settings.REQUEST_PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    view = re.sub(r'[^\w.-]', '_', record['view'] or 'unresolved')
+    # Names start with a timestamp, so sorting them sorts the profiles by age.
+    base = os.path.join(directory, f'{time.time_ns()}-{view}-{uuid.uuid4().hex[:8]}')
+
+    profiler.dump(f'{base}.prof')
+    temp_path = f'{base}.json.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump(record, file)
+    os.replace(temp_path, f'{base}.json')
+    _rotate(directory, settings.REQUEST_PROFILE_MAX_FILES)
+    return f'{base}.json'
+
+
+def build_record(request, response, view_name, trigger, profiler, metrics, wall_time, cpu_time):
+    """ Returns the JSON serializable profile of a request """
+
+    return {
+        'view': view_name,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'trigger': trigger,
+        'profiler': profiler.name,
+        'samples': getattr(profiler, 'samples', None),
+        'recorded_at': timezone.now().isoformat(),
+        'wall_time_ms': round(wall_time * 1000, 2),
+        'cpu_time_ms': round(cpu_time * 1000, 2),
+        'queries': len(metrics.queries) if metrics else None,
+        'db_time_ms': round(metrics.db_time * 1000, 2) if metrics else None,
+        'statements': metrics.slowest_statements(10) if metrics else [],
+        'functions': top_functions(profiler.functions(), settings.REQUEST_PROFILE_TOP_FUNCTIONS),
+    }
+
+
+def load_profiles(directory=None, view=None):
+    """ Yields the profile records of the directory, ``REQUEST_PROFILE_DIR`` by default, optionally of one view """
+
+    directory = directory or settings.REQUEST_PROFILE_DIR
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                record = json.load(file)
+        except (OSError, ValueError):
+            # Rotated away or being written by another process.
+            continue
+        if view is None or record['view'] == view:
+            yield record
+
+
+def aggregate(records, top=20, sort='cumulative'):
+    """
+    Returns a summary per view of the profile records: the request count, the mean wall, CPU and DB times and query
+    count, and the ``top`` functions with their self and cumulative times summed across the requests.
+    """
+
+    by_view = defaultdict(list)
+    for record in records:
+        by_view[record['view']].append(record)
+
+    def mean(records, name):
+        values = [record[name] for record in records if record[name] is not None]
+        return round(sum(values) / len(values), 2) if values else None
+
+    summaries = []
+    for view, view_records in sorted(by_view.items(), key=lambda item: str(item[0])):
+        functions = {}
+        for record in view_records:
+            for function in record['functions']:
+                total = functions.setdefault(
+                    function['function'],
+                    {'function': function['function'], 'calls': 0, 'self_ms': 0.0, 'cumulative_ms': 0.0},
+                )
+                total['calls'] += function['calls'] or 0
+                total['self_ms'] += function['self_ms']
+                total['cumulative_ms'] += function['cumulative_ms']
+        summaries.append({
+            'view': view,
+            'requests': len(view_records),
+            'wall_time_ms': mean(view_records, 'wall_time_ms'),
+            'cpu_time_ms': mean(view_records, 'cpu_time_ms'),
+            'db_time_ms': mean(view_records, 'db_time_ms'),
+            'queries': mean(view_records, 'queries'),
+            'functions': top_functions(functions.values(), top, sort),
+        })
+    return summaries
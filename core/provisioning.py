@@ -0,0 +1,189 @@
+"""
+Bulk provisioning of user accounts from CSV or JSONL.
+
+Every row describes a user (``username``, ``email``, ``password``, ``first_name``, ``last_name``) and optionally
+the ``short_intro`` and ``bio`` of the profile created along with it. Rows are processed in batches:
+
+* the rows are validated with the model field validators, and usernames already taken, in the database (one query
+  per batch) or by an earlier row, are rejected;
+* the passwords are hashed in a pool of processes, since hashing is deliberately slow and dominates the run;
+* the users and their profiles are inserted with ``bulk_create`` in one transaction per batch, and the profiles are
+  indexed for search.
+
+A rejected row never aborts the run, it is reported with its line number and the reason.
+"""
+
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from authentication.models import Profile
+from core import search
+
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name')
+PROFILE_FIELDS = ('short_intro', 'bio')
+TAKEN = 'username: A user with that username already exists.'
+
+
+@dataclass
+class ProvisioningReport:
+    """ The outcome of a provisioning run """
+
+    created: int = 0
+    errors: list = field(default_factory=list)
+
+    def reject(self, line, username, message):
+        self.errors.append((line, username, message))
+
+
+def iter_rows(file, file_format):
+    """ Yields ``(line number, row)`` pairs from a CSV file with a header line or from a JSONL file """
+
+    if file_format == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line, text in enumerate(file, 1):
+        if text.strip():
+            try:
+                row = json.loads(text)
+            except ValueError as error:
+                row = {'_error': f'Invalid JSON: {error}'}
+            yield line, row if isinstance(row, dict) else {'_error': 'A row must be a JSON object.'}
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _messages(error):
+    return '; '.join(f'{name}: {" ".join(messages)}' for name, messages in error.message_dict.items())
+
+
+def _build(row):
+    """ Returns the validated, unsaved user and profile of a row, raising ValidationError for an invalid row """
+
+    if '_error' in row:
+        raise ValidationError(row['_error'])
+    values = {name: (row.get(name) or '').strip() for name in (*USER_FIELDS, *PROFILE_FIELDS)}
+    user = User(**{name: values[name] for name in USER_FIELDS})
+    user.clean_fields(exclude=['password'])
+    user.clean()
+    profile = Profile(**{name: values[name] or None for name in PROFILE_FIELDS})
+    profile.clean_fields(exclude=['user', 'profile_picture'])
+    return user, profile
+
+
+class Provisioner:
+    """ Validates, hashes and inserts batches of rows, collecting the rejected ones in a report """
+
+    def __init__(self, batch_size=1000, processes=None):
+        self.batch_size = batch_size
+        self.processes = processes or os.cpu_count() or 1
+        self.report = ProvisioningReport()
+        self.seen = set()
+        self.executor = None
+
+    def run(self, rows):
+        """ Provisions the users of the ``(line number, row)`` pairs and returns the report """
+
+        if self.processes == 1:
+            for batch in _batches(rows, self.batch_size):
+                self.provision(batch)
+            return self.report
+
+        # Workers are spawned rather than forked so they do not share the database connection.
+        with ProcessPoolExecutor(self.processes, mp_context=get_context('spawn')) as executor:
+            self.executor = executor
+            for batch in _batches(rows, self.batch_size):
+                self.provision(batch)
+        self.executor = None
+        return self.report
+
+    def validate(self, batch):
+        """ Returns the ``(line, user, profile, password)`` entries of the valid rows of a batch """
+
+        entries = []
+        for line, row in batch:
+            try:
+                user, profile = _build(row)
+            except ValidationError as error:
+                message = _messages(error) if hasattr(error, 'error_dict') else ' '.join(error.messages)
+                self.report.reject(line, row.get('username'), message)
+                continue
+            if user.username in self.seen:
+                self.report.reject(line, user.username, 'username: Appears on an earlier row.')
+                continue
+            self.seen.add(user.username)
+            entries.append((line, user, profile, row.get('password') or None))
+
+        taken = set(User.objects.filter(username__in=[user.username for _, user, _, _ in entries])
+                    .values_list('username', flat=True))
+        for line, user, _, _ in entries:
+            if user.username in taken:
+                self.report.reject(line, user.username, TAKEN)
+        return [entry for entry in entries if entry[1].username not in taken]
+
+    def hash_passwords(self, passwords):
+        """ Hashes the passwords across the process pool, rows without a password get an unusable one """
+
+        to_hash = [password for password in passwords if password]
+        if self.executor is None:
+            hashes = iter([make_password(password) for password in to_hash])
+        else:
+            chunksize = max(1, len(to_hash) // (self.processes * 4))
+            hashes = self.executor.map(make_password, to_hash, chunksize=chunksize)
+        return [next(hashes) if password else make_password(None) for password in passwords]
+
+    def provision(self, batch):
+        entries = self.validate(batch)
+        if not entries:
+            return
+        for (_, user, _, _), hashed in zip(entries, self.hash_passwords([entry[3] for entry in entries])):
+            user.password = hashed
+
+        try:
+            with transaction.atomic():
+                self.insert(entries)
+            self.report.created += len(entries)
+        except IntegrityError:
+            # A username was taken by someone else since the check, insert the rows one by one to find it.
+            for entry in entries:
+                try:
+                    with transaction.atomic():
+                        self.insert([entry])
+                    self.report.created += 1
+                except IntegrityError:
+                    self.report.reject(entry[0], entry[1].username, TAKEN)
+
+    def insert(self, entries):
+        users = User.objects.bulk_create([user for _, user, _, _ in entries])
+        profiles = []
+        for (_, _, profile, _), user in zip(entries, users):
+            profile.user = user
+            profiles.append(profile)
+        Profile.objects.bulk_create(profiles)
+        search.index_profiles([profile.pk for profile in profiles])
+
+
+def provision_users(rows, batch_size=1000, processes=None):
+    """ Provisions the users of an iterable of ``(line number, row)`` pairs and returns a ProvisioningReport """
+
+    return Provisioner(batch_size=batch_size, processes=processes).run(rows)
@@ -0,0 +1,152 @@
+"""
+An audit of the query plans of every route.
+
+Each route is requested once through the test client while its queries are captured, and every distinct SELECT is
+replayed, with the parameters it ran with, with SQLite's ``EXPLAIN QUERY PLAN``. Steps scanning a whole table
+(``SCAN <table>`` without an index) or sorting rows in a temporary B-tree (``USE TEMP B-TREE FOR ORDER BY``) are
+reported, since both grow with the table and are what a missing or unusable index looks like. Statements matching one
+of the ``QUERY_PLAN_AUDIT_EXPECTED`` patterns are known to be bounded and are left out of the report.
+
+The next page of a keyset paginated route is audited as well. There an index scan (``SCAN <table> USING INDEX``) is
+also reported: the first page may scan its index from the start since it stops after a page of rows, but a page past
+a cursor must seek the index to the cursor, or every later page reads all the rows before it.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.template import Template
+from django.test import Client
+from django.test.utils import instrumented_test_render, override_settings
+
+from core.benchmark import _sample_kwargs, discover_routes
+
+FULL_SCAN = re.compile(r'^SCAN (?P<table>\w+)$')
+INDEX_SCAN = re.compile(r'^SCAN (?P<table>\w+) USING (?:COVERING )?INDEX (?P<index>\w+)$')
+TEMP_B_TREE = re.compile(r'USE TEMP B-TREE FOR (?P<purpose>.+)$')
+
+
+@dataclass
+class PlanProblem:
+    """ A step of a query plan that does not scale """
+
+    kind: str
+    detail: str
+    sql: str
+
+
+@dataclass
+class RouteAudit:
+    """ The audited queries of a single route """
+
+    route: str
+    path: str
+    queries: int
+    problems: list = field(default_factory=list)
+    # The path of the next page when the route is keyset paginated and has one
+    next_path: str = ''
+
+
+def explain(sql, params=()):
+    """
+    Returns the steps of the query plan of a SELECT statement.
+
+    Pass the parameters separately when there are any: SQLite plans some conditions on literal values, such as an OR of
+    ranges, better than the same conditions on bound parameters, which is what the application runs.
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def is_expected(sql):
+    """ Returns whether the statement matches one of the ``QUERY_PLAN_AUDIT_EXPECTED`` patterns """
+
+    return any(re.search(pattern, sql) for pattern in settings.QUERY_PLAN_AUDIT_EXPECTED)
+
+
+def plan_problems(sql, params=(), index_scans=False):
+    """
+    Returns the full table scans and the temporary sorts in the query plan of a statement, and its index scans as
+    well with ``index_scans``.
+    """
+
+    problems = []
+    for step in explain(sql, params):
+        scan = FULL_SCAN.match(step)
+        if scan:
+            problems.append(PlanProblem('full scan', scan['table'], sql))
+        index_scan = INDEX_SCAN.match(step) if index_scans else None
+        if index_scan:
+            problems.append(PlanProblem('index scan', f'{index_scan["table"]} ({index_scan["index"]})', sql))
+        sort = TEMP_B_TREE.search(step)
+        if sort:
+            problems.append(PlanProblem('temp b-tree', sort['purpose'], sql))
+    return problems
+
+
+def audit_route(client, name, path, index_scans=False):
+    """ Requests a route and audits the plan of every distinct SELECT it runs, see ``plan_problems()`` """
+
+    queries = []
+
+    def capture(execute, sql, params, many, context):
+        queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        response = client.get(path)
+
+    # The first parameters of every statement, they only change the plan when they are literals of the statement.
+    statements = {}
+    for sql, params in queries:
+        if sql.lstrip().upper().startswith('SELECT') and not is_expected(sql):
+            statements.setdefault(sql, params or ())
+    audit = RouteAudit(route=name, path=path, queries=len(queries))
+    for sql, params in statements.items():
+        audit.problems.extend(plan_problems(sql, params, index_scans))
+
+    page = response.context.get('cursor_page') if response.context else None
+    if page is not None and page.has_next:
+        audit.next_path = f'{path.partition("?")[0]}?{page.next_query}'
+    return audit
+
+
+def audit_routes(routes=None, authenticated=True):
+    """
+    Audits the given ``(name, path)`` routes, every route by default, and returns a RouteAudit per route, followed by
+    one for its next page when it is keyset paginated.
+    """
+
+    client = Client(raise_request_exception=False)
+    if authenticated:
+        user_id = _sample_kwargs()['user']
+        if user_id is not None:
+            client.force_login(User.objects.get(pk=user_id))
+
+    # The expected 403s and 404s of the sampled routes would be logged with their tracebacks.
+    loggers = [logging.getLogger(name) for name in ('core.instrumentation', 'django.request')]
+    levels = [logger.level for logger in loggers]
+    for logger in loggers:
+        logger.setLevel(logging.CRITICAL)
+    # The test client only collects the template contexts, where the cursor of the next page is found, when the
+    # rendering is instrumented like in the test suite.
+    render = Template._render
+    Template._render = instrumented_test_render
+    try:
+        audits = []
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, path in (routes or discover_routes()):
+                audits.append(audit_route(client, name, path))
+                if audits[-1].next_path:
+                    audits.append(audit_route(client, name, audits[-1].next_path, index_scans=True))
+        return audits
+    finally:
+        Template._render = render
+        for logger, level in zip(loggers, levels):
+            logger.setLevel(level)
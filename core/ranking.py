@@ -0,0 +1,121 @@
+"""
+Ranking scores of projects.
+
+Two scores are kept on every project next to its vote counters:
+
+* ``wilson_score``, the lower bound of the Wilson score interval of the share of up votes. Unlike the plain ratio it
+  ranks 95 up votes out of 100 above 1 out of 1, because the confidence grows with the number of votes.
+* ``trending_score``, the votes of a project decayed by their age with a half life of ``TRENDING_HALF_LIFE`` seconds.
+  Decaying every score as time passes would mean rewriting every row, so the weights grow instead: a vote cast at time
+  ``t`` weighs ``2 ** ((t - TRENDING_EPOCH) / TRENDING_HALF_LIFE - shift)``. Dividing all the scores by the same
+  factor keeps their order, so sorting the stored values is sorting by the decayed ones, and a review write only adds
+  or subtracts its own weight.
+
+The weights double every half life and would overflow a float after 1024 of them, so ``rebase_trending_scores`` moves
+the epoch forward by the whole half lives elapsed (the ``shift`` stored in ``TrendingEpoch``) and scales every score
+down by the same factor, in one transaction. ``recompute_project_counters`` does it first, so running the command
+every few months keeps the weights of new votes close to 1. Review writes read the shift in the UPDATE adding their
+weight, so they stay consistent with a concurrent rebase.
+"""
+
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Power, Sqrt
+from django.db.models.lookups import Exact
+from django.utils import timezone
+
+from core.models import Project, TrendingEpoch
+
+# The 95% confidence quantile of the standard normal distribution.
+Z = 1.96
+
+VOTE_WEIGHTS = {'Up': 1, 'Down': -1}
+
+# The ``?sort=`` options of project lists as ``(key, descending)`` keyset orderings over the indexed scores.
+SORT_ORDERINGS = {
+    'top': ('wilson_score', True),
+    'trending': ('trending_score', True),
+}
+
+
+def wilson_lower_bound(up_votes, down_votes):
+    """ Returns the lower bound of the Wilson score interval of the share of up votes """
+
+    total = up_votes + down_votes
+    if not total:
+        return 0.0
+    spread = Z * math.sqrt(up_votes * down_votes / total + Z * Z / 4)
+    return (up_votes + Z * Z / 2 - spread) / (total + Z * Z)
+
+
+def wilson_expression(up_votes=F('up_votes'), down_votes=F('down_votes')):
+    """
+    Returns ``wilson_lower_bound`` as a database expression, so it can be written by an UPDATE.
+
+    The counters may be expressions themselves, e.g. ``F('up_votes') + 1`` to score the counters an UPDATE is about to
+    write, since the columns of the row keep their old values within the statement.
+    """
+
+    up_votes = Cast(up_votes, FloatField())
+    down_votes = Cast(down_votes, FloatField())
+    total = up_votes + down_votes
+    spread = Value(Z) * Sqrt(up_votes * down_votes / total + Value(Z * Z / 4))
+    return Case(
+        When(Exact(total, Value(0.0)), then=Value(0.0)),
+        default=(up_votes + Value(Z * Z / 2) - spread) / (total + Value(Z * Z)),
+        output_field=FloatField(),
+    )
+
+
+def _half_lives(moment):
+    return (moment - settings.TRENDING_EPOCH).total_seconds() / settings.TRENDING_HALF_LIFE
+
+
+def trending_shift():
+    """ Returns the number of half lives the epoch of the trending scores was moved forward by """
+
+    return TrendingEpoch.objects.values_list('half_lives', flat=True).first() or 0
+
+
+def trending_weight(vote, created=None, shift=0):
+    """
+    Returns what a review with the given vote written at ``created`` (now by default) adds to the trending score, with
+    the epoch moved forward by ``shift`` half lives.
+    """
+
+    created = created or timezone.now()
+    return VOTE_WEIGHTS.get(vote, 0) * 2 ** (_half_lives(created) - shift)
+
+
+def trending_weight_expression(vote, created=None):
+    """ Returns ``trending_weight`` as a database expression reading the current shift, 0 for a review without vote """
+
+    weight = VOTE_WEIGHTS.get(vote, 0)
+    if not weight:
+        return 0.0
+    created = created or timezone.now()
+    shift = Coalesce(Subquery(TrendingEpoch.objects.values('half_lives')[:1]), Value(0), output_field=FloatField())
+    exponent = Value(_half_lives(created)) - shift
+    return Value(float(weight)) * Power(Value(2.0), exponent, output_field=FloatField())
+
+
+def rebase_trending_scores(now=None):
+    """
+    Moves the epoch of the trending scores forward to the start of the current half life and scales every score down
+    to match. Returns the number of half lives it moved by.
+    """
+
+    target = math.floor(_half_lives(now or timezone.now()))
+    with transaction.atomic():
+        epoch, _ = TrendingEpoch.objects.select_for_update().get_or_create(pk=1)
+        moved = target - epoch.half_lives
+        if moved <= 0:
+            return 0
+        # Scores too small to survive the scaling belong to long decayed votes and become 0.
+        Project.objects.update(trending_score=F('trending_score') * Value(2.0 ** -moved))
+        epoch.half_lives = target
+        epoch.save(update_fields=['half_lives', 'modified'])
+    return moved
@@ -0,0 +1,191 @@
+"""
+"Similar projects" and "similar profiles" recommendations.
+
+Projects (and profiles) are rows of a sparse object x skill matrix where every skill is weighted by its inverse
+document frequency, and two objects are as similar as the cosine of their rows. The matrix is never materialised
+densely: the similarities of a row with every other row are accumulated by walking the posting lists of the row's
+skills. The top-k neighbours of every object are persisted, so a page needs a single query to show them.
+
+Walking every posting list once per object in it costs the sum of the squared posting lengths, which is quadratic
+in the number of objects when a skill is shared by a large part of them. The posting lists longer than
+``RECOMMENDATIONS_MAX_SKILL_FREQUENCY`` are therefore cut to the objects with the smallest norms: sharing that skill,
+these are the ones it makes the most similar. The cosines of the objects found stay exact, an object is only missed
+when all the skills it shares with the row are frequent ones and it is not among the smallest norms of their lists.
+"""
+
+import heapq
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from authentication.models import Profile, SimilarProfile
+from core.models import Project, SimilarProject
+
+
+class Recommender:
+    """ Computes and stores the top-k neighbours of one kind of object (projects or profiles) """
+
+    def __init__(self, model, result_model, column, top_k=None, max_frequency=None):
+        self.model = model
+        self.through = model.skills.through
+        self.result_model = result_model
+        # The through table and the result table name the column of the object alike, e.g. ``project_id``.
+        self.column = column
+        self.top_k = top_k or settings.RECOMMENDATIONS_TOP_K
+        self.max_frequency = max_frequency or settings.RECOMMENDATIONS_MAX_SKILL_FREQUENCY
+
+    def load_matrix(self, object_ids=None):
+        """
+        Returns ``(rows, postings)``: the skills of every object and the objects of every skill.
+
+        With ``object_ids`` only the rows needed to score these objects are loaded: their own rows, the postings of
+        their skills and the rows of every object found in those postings (for the norms).
+        """
+
+        through = self.through.objects
+        if object_ids is not None:
+            skill_ids = through.filter(**{f'{self.column}__in': object_ids}).values_list('skill_id', flat=True)
+            candidates = through.filter(skill_id__in=skill_ids).values_list(self.column, flat=True)
+            through = through.filter(**{f'{self.column}__in': candidates})
+
+        rows, postings = defaultdict(list), defaultdict(list)
+        for object_id, skill_id in through.values_list(self.column, 'skill_id').iterator(chunk_size=10000):
+            rows[object_id].append(skill_id)
+            postings[skill_id].append(object_id)
+        return rows, postings
+
+    def idf(self, skill_ids=None):
+        """ Returns the inverse document frequency of the given skills (all skills by default) """
+
+        through = self.through.objects
+        if skill_ids is not None:
+            through = through.filter(skill_id__in=skill_ids)
+        frequencies = through.order_by().values_list('skill_id').annotate(frequency=Count('pk'))
+        total = self.model.objects.count()
+        return {skill_id: math.log((1 + total) / (1 + frequency)) + 1 for skill_id, frequency in frequencies}
+
+    def neighbours(self, object_id, rows, postings, idf, norms, pruned=frozenset()):
+        """
+        Returns the top-k ``(score, neighbour id)`` pairs of an object, best first.
+
+        The skills in ``pruned`` have their posting lists cut by ``prune``: they only bring candidates, and their
+        weights are added to the scores of every candidate that has them once all the candidates are known.
+        """
+
+        scores = defaultdict(float)
+        pruned_weights = []
+        for skill_id in rows.get(object_id, ()):
+            weight = idf.get(skill_id, 1.0) ** 2
+            if skill_id in pruned:
+                pruned_weights.append((skill_id, weight))
+                for other_id in postings[skill_id]:
+                    scores.setdefault(other_id, 0.0)
+            else:
+                for other_id in postings[skill_id]:
+                    scores[other_id] += weight
+        scores.pop(object_id, None)
+        for skill_id, weight in pruned_weights:
+            for other_id in scores:
+                if skill_id in rows[other_id]:
+                    scores[other_id] += weight
+
+        norm = norms.get(object_id)
+        if not norm:
+            return []
+        return heapq.nlargest(
+            self.top_k,
+            ((score / (norm * norms[other_id]), other_id) for other_id, score in scores.items()),
+        )
+
+    @staticmethod
+    def norms(rows, idf):
+        return {
+            object_id: math.sqrt(sum(idf.get(skill_id, 1.0) ** 2 for skill_id in skills))
+            for object_id, skills in rows.items()
+        }
+
+    def prune(self, postings, norms):
+        """
+        Cuts the posting lists longer than ``max_frequency`` to their ``max_frequency`` objects of smallest norm, the
+        highest ids first among equal norms like ``neighbours`` ranks equal scores. Returns ``(postings, pruned
+        skill ids)``.
+        """
+
+        pruned = {skill_id for skill_id, object_ids in postings.items() if len(object_ids) > self.max_frequency}
+        postings = dict(postings)
+        for skill_id in pruned:
+            postings[skill_id] = heapq.nsmallest(
+                self.max_frequency, postings[skill_id], key=lambda object_id: (norms[object_id], -object_id),
+            )
+        return postings, pruned
+
+    def store(self, object_ids, results):
+        """ Replaces the stored neighbours of the given objects, stamped with the time they were stored """
+
+        now = timezone.now()
+        with transaction.atomic():
+            self.result_model.objects.filter(**{f'{self.column}__in': object_ids}).delete()
+            self.result_model.objects.bulk_create([
+                self.result_model(**{self.column: object_id, 'similar_id': other_id, 'score': score, 'created': now})
+                for object_id in object_ids
+                for score, other_id in results.get(object_id, ())
+            ], batch_size=1000)
+
+    def rebuild(self, batch_size=1000):
+        """ Recomputes the neighbours of every object from scratch. Returns the number of objects processed. """
+
+        rows, postings = self.load_matrix()
+        idf = self.idf()
+        norms = self.norms(rows, idf)
+        postings, pruned = self.prune(postings, norms)
+
+        object_ids = list(self.model.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(object_ids), batch_size):
+            batch = object_ids[start:start + batch_size]
+            self.store(batch, {
+                object_id: self.neighbours(object_id, rows, postings, idf, norms, pruned) for object_id in batch
+            })
+        return len(object_ids)
+
+    def refresh(self, object_ids):
+        """
+        Incrementally refreshes the neighbours after the skills of the given objects changed.
+
+        Besides the changed objects, the objects that listed them and the objects they list now are rescored, since
+        their rankings may have changed as well. Skill weights drift slowly and are brought up to date by a rebuild.
+        """
+
+        object_ids = set(object_ids)
+        listed_by = self.result_model.objects.filter(similar_id__in=object_ids).values_list(self.column, flat=True)
+        affected = object_ids | set(listed_by)
+
+        rows, postings = self.load_matrix(affected)
+        idf = self.idf(postings.keys())
+        norms = self.norms(rows, idf)
+        postings, pruned = self.prune(postings, norms)
+        results = {
+            object_id: self.neighbours(object_id, rows, postings, idf, norms, pruned) for object_id in object_ids
+        }
+
+        # The new neighbours of the changed objects may now rank them higher as well.
+        affected |= {other_id for pairs in results.values() for _, other_id in pairs}
+        rows, postings = self.load_matrix(affected)
+        idf.update(self.idf(postings.keys() - idf.keys()))
+        norms = self.norms(rows, idf)
+        postings, pruned = self.prune(postings, norms)
+        for object_id in affected - object_ids:
+            results[object_id] = self.neighbours(object_id, rows, postings, idf, norms, pruned)
+
+        self.store(list(affected), results)
+
+
+def project_recommender():
+    return Recommender(Project, SimilarProject, 'project_id')
+
+
+def profile_recommender():
+    return Recommender(Profile, SimilarProfile, 'profile_id')
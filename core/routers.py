@@ -0,0 +1,89 @@
+"""
+Read/write splitting between the primary database and its read replicas.
+
+Writes always go to ``default``. Reads go to one of the ``DATABASE_REPLICAS`` aliases only while replica reads are
+enabled, which ``ReplicaRoutingMiddleware`` does for safe (GET, HEAD) requests, so forms, management commands and
+signal handlers keep reading from the primary. A request reads from a single replica, chosen when it starts, so all
+its reads see the same snapshot. Replicas lag behind the primary, so reads are pinned to it:
+
+* for the rest of a request as soon as it writes anything;
+* for ``REPLICA_PIN_SECONDS`` after a signed in user wrote through an unsafe request (posted a review, edited a
+  project...), so the user reads their own writes.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_read_alias = ContextVar('read_alias', default=None)
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+@dataclass
+class Writes:
+    """ A primary connection execute wrapper recording whether a statement changing data succeeded """
+
+    written: bool = False
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            self.written = True
+        return result
+
+
+def choose_replica():
+    """ Returns the alias of a random replica, None if there is none """
+
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def replica_reads(alias=None):
+    """ Routes the reads of the current context to the given replica, or to one chosen at random """
+
+    token = _read_alias.set(alias or choose_replica())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def track_writes():
+    """ Yields a Writes flagged once the current thread changed data on the primary """
+
+    writes = Writes()
+    with connections[DEFAULT_DB_ALIAS].execute_wrapper(writes):
+        yield writes
+
+
+def pin_to_primary():
+    """ Sends the remaining reads of the current context to the primary """
+
+    _read_alias.set(None)
+
+
+class PrimaryReplicaRouter:
+    """ Routes writes to the primary and, when enabled, reads to the replica of the current context """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data, so objects read from any of them may be related.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary (see the sync_sqlite_replicas command).
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,169 @@
+"""
+Full-text search over projects and profiles backed by an SQLite FTS5 index.
+
+Every project and profile is stored as one row of the ``search_index`` virtual table. The row id encodes both the kind
+and the primary key of the object (``pk * 2`` for projects, ``pk * 2 + 1`` for profiles), so single documents can be
+replaced or removed through a rowid lookup instead of a scan.
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+
+from authentication.models import Profile
+from core.models import Project
+
+TABLE_NAME = 'search_index'
+PROJECT, PROFILE = 0, 1
+
+# Column weights for bm25(): title, body, people, skills.
+RANK_WEIGHTS = (10.0, 1.0, 3.0, 5.0)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    """ A single ranked search result """
+
+    kind: str
+    object: object
+    rank: float
+
+
+def _rowid(kind, pk):
+    return pk * 2 + kind
+
+
+def _join(*values):
+    return ' '.join(value for value in values if value)
+
+
+def _project_document(project):
+    user = project.user
+    return (
+        _rowid(PROJECT, project.pk),
+        project.title or '',
+        project.description or '',
+        _join(user.first_name, user.last_name, user.username),
+        _join(*(skill.name for skill in project.skills.all())),
+    )
+
+
+def _profile_document(profile):
+    user = profile.user
+    return (
+        _rowid(PROFILE, profile.pk),
+        profile.short_intro or '',
+        profile.bio or '',
+        _join(user.first_name, user.last_name, user.username) if user else '',
+        _join(*(skill.name for skill in profile.skills.all())),
+    )
+
+
+def _replace_documents(rowids, documents):
+    """ Removes the given rows from the index and inserts the new documents in their place """
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {TABLE_NAME} WHERE rowid = %s', [(rowid,) for rowid in rowids])
+        cursor.executemany(
+            f'INSERT INTO {TABLE_NAME} (rowid, title, body, people, skills) VALUES (%s, %s, %s, %s, %s)',
+            documents,
+        )
+
+
+def index_projects(project_ids):
+    """ (Re)indexes the projects with the given ids, ids that no longer exist are removed from the index """
+
+    project_ids = list(project_ids)
+    projects = Project.objects.filter(pk__in=project_ids).select_related('user').prefetch_related('skills')
+    _replace_documents(
+        [_rowid(PROJECT, pk) for pk in project_ids],
+        [_project_document(project) for project in projects],
+    )
+
+
+def index_profiles(profile_ids):
+    """ (Re)indexes the profiles with the given ids, ids that no longer exist are removed from the index """
+
+    profile_ids = list(profile_ids)
+    profiles = Profile.objects.filter(pk__in=profile_ids).select_related('user').prefetch_related('skills')
+    _replace_documents(
+        [_rowid(PROFILE, pk) for pk in profile_ids],
+        [_profile_document(profile) for profile in profiles],
+    )
+
+
+def remove_project(project_id):
+    """ Removes a project from the index """
+
+    _replace_documents([_rowid(PROJECT, project_id)], [])
+
+
+def remove_profile(profile_id):
+    """ Removes a profile from the index """
+
+    _replace_documents([_rowid(PROFILE, profile_id)], [])
+
+
+def rebuild_index(batch_size=1000):
+    """ Drops every document from the index and indexes all the projects and profiles again in batches """
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE_NAME}')
+
+    for model, index in ((Project, index_projects), (Profile, index_profiles)):
+        ids = model.objects.order_by('pk').values_list('pk', flat=True)
+        batch = []
+        for pk in ids.iterator(chunk_size=batch_size):
+            batch.append(pk)
+            if len(batch) == batch_size:
+                index(batch)
+                batch = []
+        if batch:
+            index(batch)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE_NAME} ({TABLE_NAME}) VALUES ('optimize')")
+
+
+def build_match_expression(query):
+    """
+    Turns free text typed by a user into an FTS5 match expression.
+
+    Every word is quoted (so FTS5 operators in the input are treated as text) and matched as a prefix, all the words
+    have to be present in a document. Returns an empty string if the query contains no words.
+    """
+
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(query))
+
+
+def search(query, limit=20):
+    """ Returns up to ``limit`` projects and profiles matching the query, best matches first """
+
+    expression = build_match_expression(query)
+    if not expression:
+        return []
+
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, bm25({TABLE_NAME}, {weights}) AS score FROM {TABLE_NAME} '
+            f'WHERE {TABLE_NAME} MATCH %s ORDER BY score LIMIT %s',
+            [expression, limit],
+        )
+        rows = cursor.fetchall()
+
+    project_ids = [rowid // 2 for rowid, _ in rows if rowid % 2 == PROJECT]
+    profile_ids = [rowid // 2 for rowid, _ in rows if rowid % 2 == PROFILE]
+    projects = Project.objects.for_cards().in_bulk(project_ids)
+    profiles = Profile.objects.select_related('user').prefetch_related('skills').in_bulk(profile_ids)
+
+    hits = []
+    for rowid, score in rows:
+        if rowid % 2 == PROJECT and rowid // 2 in projects:
+            hits.append(SearchHit('project', projects[rowid // 2], score))
+        elif rowid % 2 == PROFILE and rowid // 2 in profiles:
+            hits.append(SearchHit('profile', profiles[rowid // 2], score))
+    return hits
@@ -0,0 +1,407 @@
+"""
+Signal handlers of the core app.
+
+They keep the denormalized vote counters and ranking scores of projects consistent with their reviews and the
+activity stats of profiles consistent with the projects and reviews of their users, keep the
+full-text search index and the skill index in sync with projects, profiles, users and skills, and have every
+process reload its skill catalog when a skill is saved or deleted. Reindexing documents (of a saved project or
+profile, or of a renamed user or skill), refreshing the similar projects and profiles when skills change and
+deleting the stored images no longer referenced are queued as background tasks (see core.tasks). Projects, profiles
+and reviews also have their ``modified`` timestamp bumped when what they show changes without them being saved
+(their skills, the name of their author or of one of their skills), since it validates the conditional responses of
+the API. New SQLite connections are tuned here as well.
+"""
+
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from authentication.models import Profile, Skill
+from core import search, skill_catalog, skill_index
+from core.models import Project, Review
+from core.task_queue import enqueue
+from core.tasks import schedule_blob_collection, schedule_profile_reindex, schedule_project_reindex
+from core.utils import (
+    apply_profile_deltas, apply_received_vote_deltas, apply_vote_deltas, received_vote_deltas, recompute_profile_stats,
+    vote_deltas,
+)
+
+
+@receiver(post_save, sender=Review)
+def update_counters_on_review_save(sender, instance, created, raw=False, **kwargs):
+    """ Updates the project counters when a review is created, has its vote changed or is moved to another project """
+
+    if raw:
+        return
+
+    # Review.save() runs the handlers in the transaction of the INSERT or UPDATE of the review.
+    tracker = instance.tracker
+    written = instance.created
+    if created:
+        apply_vote_deltas(instance.project_id, vote_deltas(instance.vote, created=written))
+    elif tracker.has_changed('project'):
+        apply_vote_deltas(tracker.previous('project'), vote_deltas(tracker.previous('vote'), -1, written))
+        apply_vote_deltas(instance.project_id, vote_deltas(instance.vote, created=written))
+    elif tracker.has_changed('vote'):
+        removed = vote_deltas(tracker.previous('vote'), -1, written)
+        added = vote_deltas(instance.vote, created=written)
+        apply_vote_deltas(instance.project_id, {field: removed[field] + added[field] for field in added})
+
+
+@receiver(post_delete, sender=Review)
+def update_counters_on_review_delete(sender, instance, **kwargs):
+    """ Updates the project counters when a review is deleted """
+
+    apply_vote_deltas(instance.project_id, vote_deltas(instance.vote, sign=-1, created=instance.created))
+
+
+@receiver(post_save, sender=Review)
+def update_profile_stats_on_review_save(sender, instance, created, raw=False, **kwargs):
+    """ Updates the stats of the reviewer and of the project author when a review is written, revoted or moved """
+
+    if raw:
+        return
+
+    tracker = instance.tracker
+    if created:
+        apply_profile_deltas(instance.user_id, {'reviews_written': 1}, activity=instance.created)
+        apply_received_vote_deltas(instance.project_id, received_vote_deltas(instance.vote))
+    elif tracker.has_changed('project'):
+        apply_received_vote_deltas(tracker.previous('project'), received_vote_deltas(tracker.previous('vote'), -1))
+        apply_received_vote_deltas(instance.project_id, received_vote_deltas(instance.vote))
+    elif tracker.has_changed('vote'):
+        removed = received_vote_deltas(tracker.previous('vote'), -1)
+        added = received_vote_deltas(instance.vote)
+        apply_received_vote_deltas(instance.project_id, {field: removed[field] + added[field] for field in added})
+
+
+@receiver(post_delete, sender=Review)
+def update_profile_stats_on_review_delete(sender, instance, **kwargs):
+    """ Updates the stats of the reviewer and of the author of the project when a review is deleted """
+
+    apply_profile_deltas(instance.user_id, {'reviews_written': -1}, recompute_activity=True)
+    apply_received_vote_deltas(instance.project_id, received_vote_deltas(instance.vote, -1))
+
+
+@receiver(post_save, sender=Project)
+def update_profile_stats_on_project_save(sender, instance, created, raw=False, **kwargs):
+    """ Counts a new project in the stats of its author """
+
+    if created and not raw:
+        apply_profile_deltas(instance.user_id, {'project_count': 1}, activity=instance.created)
+
+
+@receiver(post_delete, sender=Project)
+def update_profile_stats_on_project_delete(sender, instance, **kwargs):
+    """
+    Recomputes the stats of the author of a deleted project.
+
+    The reviews of the project are deleted along with it, before or after it since they may have no project, so the
+    votes they take away can not be counted down one review at a time.
+    """
+
+    profiles = Profile.objects.filter(user_id=instance.user_id)
+    recompute_profile_stats(profiles)
+    profiles.update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Profile)
+def compute_profile_stats_on_create(sender, instance, created, raw=False, **kwargs):
+    """ Computes the stats of a new profile, whose user may already have projects and reviews """
+
+    if created and not raw and instance.user_id is not None:
+        recompute_profile_stats(Profile.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Project)
+def index_project_on_save(sender, instance, raw=False, **kwargs):
+    """ Queues reindexing a project for full-text search whenever it is saved """
+
+    if not raw:
+        schedule_project_reindex([instance.pk])
+
+
+@receiver(post_delete, sender=Project)
+def remove_project_from_index(sender, instance, **kwargs):
+    """ Removes a deleted project from the full-text search index """
+
+    search.remove_project(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+def index_profile_on_save(sender, instance, raw=False, **kwargs):
+    """ Queues reindexing a profile for full-text search whenever it is saved """
+
+    if not raw:
+        schedule_profile_reindex([instance.pk])
+
+
+@receiver(post_delete, sender=Profile)
+def remove_profile_from_index(sender, instance, **kwargs):
+    """ Removes a deleted profile from the full-text search index """
+
+    search.remove_profile(instance.pk)
+
+
+USER_NAME_FIELDS = ('first_name', 'last_name', 'username')
+
+
+@receiver(pre_save, sender=User)
+def detect_user_name_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Flags a user being saved with another name than the stored one, since the name is shown (and indexed) with the
+    profile, the projects and the reviews of the user. Saves of other fields, like ``last_login``, skip the lookup.
+    """
+
+    instance._name_changed = False
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(USER_NAME_FIELDS):
+        return
+    stored = User.objects.filter(pk=instance.pk).values_list(*USER_NAME_FIELDS).first()
+    names = tuple(getattr(instance, field) for field in USER_NAME_FIELDS)
+    instance._name_changed = stored is not None and stored != names
+
+
+@receiver(post_save, sender=User)
+def index_user_documents_on_save(sender, instance, created, raw=False, **kwargs):
+    """ Queues reindexing the profile and the projects of a user whose name changed, since they contain it """
+
+    if raw or created or not getattr(instance, '_name_changed', False):
+        return
+    enqueue('reindex_user_documents', {'pk': instance.pk}, dedupe_key=f'reindex-user-documents:{instance.pk}')
+
+
+@receiver(post_save, sender=Skill)
+def index_skill_documents_on_save(sender, instance, created, raw=False, **kwargs):
+    """ Queues reindexing the profiles and the projects that use a skill when it is renamed """
+
+    if raw or created:
+        return
+    enqueue('reindex_skill_documents', {'pk': instance.pk}, dedupe_key=f'reindex-skill-documents:{instance.pk}')
+
+
+@receiver(pre_delete, sender=Skill)
+def collect_skill_documents_on_delete(sender, instance, **kwargs):
+    """ Remembers the profiles and the projects of a skill before its relations are removed by the deletion """
+
+    instance._search_profile_ids = list(instance.profile.values_list('pk', flat=True))
+    instance._search_project_ids = list(instance.Project.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def index_skill_documents_on_delete(sender, instance, **kwargs):
+    """ Queues reindexing the profiles and the projects that used a deleted skill """
+
+    schedule_profile_reindex(getattr(instance, '_search_profile_ids', []))
+    schedule_project_reindex(getattr(instance, '_search_project_ids', []))
+    for kind in skill_index.RELATIONS:
+        skill_index.invalidate(kind, [instance.pk])
+
+
+def _reindex_on_skills_changed(index, related_name, instance, action, reverse, pk_set):
+    """
+    Queues reindexing the objects whose skills changed through a sorted many-to-many relation.
+
+    When the relation is cleared from the skill side the affected objects are only known before the clear, so they
+    are remembered on the skill in ``pre_clear``.
+    """
+
+    if reverse and action == 'pre_clear':
+        instance._search_reindex_ids = list(getattr(instance, related_name).values_list('pk', flat=True))
+    elif action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    elif not reverse:
+        index([instance.pk])
+    elif action == 'post_clear':
+        index(instance.__dict__.pop('_search_reindex_ids', []))
+    else:
+        index(pk_set)
+
+
+@receiver(m2m_changed, sender=Project.skills.through)
+def index_project_on_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Queues reindexing a project when its skills are changed """
+
+    _reindex_on_skills_changed(schedule_project_reindex, 'Project', instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+def index_profile_on_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Queues reindexing a profile when its skills are changed """
+
+    _reindex_on_skills_changed(schedule_profile_reindex, 'profile', instance, action, reverse, pk_set)
+
+
+def _invalidate_skill_postings(kind, instance, action, reverse, pk_set):
+    """
+    Drops the cached posting lists of the skills whose projects or profiles changed.
+
+    Clearing the skills of an object does not report which skills were removed, so they are remembered in
+    ``pre_clear``.
+    """
+
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            skill_index.invalidate(kind, [instance.pk])
+    elif action == 'pre_clear':
+        instance._skill_index_cleared_ids = list(instance.skills.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        skill_index.invalidate(kind, instance.__dict__.pop('_skill_index_cleared_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        skill_index.invalidate(kind, pk_set)
+
+
+@receiver(m2m_changed, sender=Project.skills.through)
+def invalidate_project_skill_postings(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Keeps the project posting lists of the skill index current """
+
+    _invalidate_skill_postings('project', instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+def invalidate_profile_skill_postings(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Keeps the profile posting lists of the skill index current """
+
+    _invalidate_skill_postings('profile', instance, action, reverse, pk_set)
+
+
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Profile)
+def invalidate_skill_postings_on_delete(sender, instance, **kwargs):
+    """ Drops the posting lists of the skills of a project or a profile that is about to be deleted """
+
+    kind = 'project' if sender is Project else 'profile'
+    skill_index.invalidate(kind, instance.skills.values_list('pk', flat=True))
+
+
+def _refresh_recommendations(task_name, related_name, instance, action, reverse, pk_set):
+    """
+    Queues refreshing the similar objects of the objects whose skills changed.
+
+    When the relation is cleared from the skill side the affected objects are remembered in ``pre_clear``.
+    """
+
+    if reverse and action == 'pre_clear':
+        instance._recommendations_ids = list(getattr(instance, related_name).values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        object_ids = [instance.pk]
+    elif action == 'post_clear':
+        object_ids = instance.__dict__.pop('_recommendations_ids', [])
+    else:
+        object_ids = list(pk_set)
+    for object_id in object_ids:
+        enqueue(task_name, {'pk': object_id}, dedupe_key=f'{task_name}:{object_id}')
+
+
+@receiver(m2m_changed, sender=Project.skills.through)
+def refresh_similar_projects(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Refreshes the similar projects when the skills of a project change """
+
+    _refresh_recommendations('refresh_similar_projects', 'Project', instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+def refresh_similar_profiles(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Refreshes the similar profiles when the skills of a profile change """
+
+    _refresh_recommendations('refresh_similar_profiles', 'profile', instance, action, reverse, pk_set)
+
+
+def touch(model, ids):
+    """ Bumps the ``modified`` timestamp of the given objects without saving them """
+
+    model.objects.filter(pk__in=list(ids)).update(modified=timezone.now())
+
+
+@receiver(m2m_changed, sender=Project.skills.through)
+@receiver(m2m_changed, sender=Profile.skills.through)
+def touch_on_skills_changed(sender, instance, action, reverse, pk_set, model, **kwargs):
+    """ Bumps the projects or profiles whose skills changed, remembering them in ``pre_clear`` from the skill side """
+
+    owner = Project if sender is Project.skills.through else Profile
+    if reverse and action == 'pre_clear':
+        instance._touch_ids = list(owner.objects.filter(skills=instance).values_list('pk', flat=True))
+    elif action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    elif not reverse:
+        touch(owner, [instance.pk])
+    elif action == 'post_clear':
+        touch(owner, instance.__dict__.pop('_touch_ids', []))
+    else:
+        touch(owner, pk_set)
+
+
+@receiver(post_save, sender=User)
+def touch_user_documents_on_save(sender, instance, created, raw=False, **kwargs):
+    """ Bumps the profile, the projects and the reviews of a user whose name changed """
+
+    if raw or created or not getattr(instance, '_name_changed', False):
+        return
+    Profile.objects.filter(user=instance).update(modified=timezone.now())
+    Project.objects.filter(user=instance).update(modified=timezone.now())
+    Review.objects.filter(user=instance).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Skill)
+def touch_skill_documents_on_save(sender, instance, created, raw=False, **kwargs):
+    """ Bumps the profiles and the projects showing a skill that was saved, e.g. renamed """
+
+    if raw or created:
+        return
+    instance.profile.update(modified=timezone.now())
+    instance.Project.update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def invalidate_skill_catalog(sender, instance, raw=False, **kwargs):
+    """ Makes every process reload its skill catalog once the change is committed """
+
+    if not raw:
+        transaction.on_commit(skill_catalog.invalidate)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Profile)
+def collect_replaced_blob(sender, instance, created, raw=False, **kwargs):
+    """ Queues deleting the stored image replaced by a save once nothing references it """
+
+    field_name = 'featured_image' if sender is Project else 'profile_picture'
+    if not (raw or created) and instance.tracker.has_changed(field_name):
+        previous = instance.tracker.previous(field_name)
+        if previous:
+            schedule_blob_collection(previous.name)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Profile)
+def collect_deleted_blob(sender, instance, **kwargs):
+    """ Queues deleting the stored image of a deleted project or profile once nothing references it """
+
+    image = instance.featured_image if sender is Project else instance.profile_picture
+    if image:
+        schedule_blob_collection(image.name)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    Applies ``SQLITE_PRAGMAS`` to every new SQLite connection.
+
+    In WAL mode readers no longer block behind a writer (and the other way around), and with ``synchronous=NORMAL``
+    a commit only waits for the WAL to be written, not for a checkpoint.
+    """
+
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,116 @@
+"""
+An in-memory, versioned copy of the skill catalog answering prefix lookups.
+
+Every process keeps the catalog as two lists of ``(key, id)`` pairs sorted by key: one keyed by the casefolded name
+of every skill and one by each of its later words, so a prefix lookup is a binary search in each list followed by a
+scan bounded by the lookup limit and ``SKILL_AUTOCOMPLETE_MAX_SCAN``. The catalog is tagged with a version token kept
+in the cache shared by every process (see ``CACHES``): saving or deleting a skill replaces the token (see the signal
+handlers) and every process rebuilds its copy, with a single query, the next time it is used. Checking the version
+costs one cache read per lookup and no queries.
+"""
+
+import threading
+import uuid
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from authentication.models import Skill
+
+VERSION_KEY = 'skill-catalog:version'
+
+
+def invalidate():
+    """ Replaces the version token so that every process rebuilds its catalog on next use """
+
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def current_version():
+    """ Returns the version token of the catalog, creating one if the cache lost it """
+
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _keys(name):
+    """ Returns the lookup keys of a skill name: the whole name and every suffix starting at a word """
+
+    words = name.casefold().split()
+    return [' '.join(words[index:]) for index in range(len(words))]
+
+
+class SkillCatalog:
+    """ The skills of the database, by id and by lookup key """
+
+    def __init__(self):
+        # (version, {id: name}, sorted [(name key, id)], sorted [(word key, id)]), replaced as a whole so readers never
+        # see a half built catalog
+        self.state = (None, {}, [], [])
+        self.lock = threading.Lock()
+
+    def load(self):
+        """ Reloads the catalog from the database if its version is stale and returns the current state """
+
+        version = current_version()
+        if version != self.state[0]:
+            with self.lock:
+                if version != self.state[0]:
+                    names = {pk: name for pk, name in Skill.objects.values_list('pk', 'name') if name}
+                    keys = {pk: _keys(name) for pk, name in names.items()}
+                    name_index = sorted((skill_keys[0], pk) for pk, skill_keys in keys.items() if skill_keys)
+                    word_index = sorted((key, pk) for pk, skill_keys in keys.items() for key in skill_keys[1:])
+                    self.state = (version, names, name_index, word_index)
+        return self.state
+
+    def search(self, prefix, limit=None):
+        """
+        Returns up to ``limit`` ``(id, name)`` pairs of the skills whose name, or one of its words, starts with the
+        prefix. Skills whose name itself starts with the prefix come first, then both groups are sorted by name.
+
+        The skills matched by a later word are picked among the first ``SKILL_AUTOCOMPLETE_MAX_SCAN`` words starting
+        with the prefix, so a short prefix shared by many words costs no more than a long one.
+        """
+
+        _, names, name_index, word_index = self.load()
+        prefix = ' '.join(prefix.casefold().split())
+        limit = limit or settings.SKILL_AUTOCOMPLETE_LIMIT
+        if not prefix:
+            return []
+
+        # The name index is sorted by name, so its first matches are the ones to suggest.
+        results = []
+        position = bisect_left(name_index, (prefix,))
+        while len(results) < limit and position < len(name_index) and name_index[position][0].startswith(prefix):
+            results.append(name_index[position][1])
+            position += 1
+
+        if len(results) < limit:
+            matches = set()
+            position = bisect_left(word_index, (prefix,))
+            end = min(len(word_index), position + settings.SKILL_AUTOCOMPLETE_MAX_SCAN)
+            while position < end and word_index[position][0].startswith(prefix):
+                matches.add(word_index[position][1])
+                position += 1
+            matches.difference_update(results)
+            results.extend(sorted(matches, key=lambda pk: (names[pk].casefold(), pk))[:limit - len(results)])
+
+        return [(pk, names[pk]) for pk in results]
+
+    def resolve(self, ids):
+        """ Returns the ``(id, name)`` pairs of the given skill ids in their order, skipping unknown ids """
+
+        names = self.load()[1]
+        pairs = []
+        for pk in ids:
+            pk = int(pk) if str(pk).isdigit() else None
+            if pk in names:
+                pairs.append((pk, names[pk]))
+        return pairs
+
+
+catalog = SkillCatalog()
@@ -0,0 +1,176 @@
+"""
+An inverted index from skills to the projects and profiles that use them.
+
+The posting list of every skill is kept as a bitmap (a Python int with bit ``n`` set for object id ``n``) in the
+cache, so AND, OR and NOT queries over any number of skills are answered with integer bit operations instead of one
+join per skill. Posting lists are built from the sortedm2m through tables on first use and are invalidated by the
+m2m signal handlers whenever the skills of a project or a profile change. The cache is shared by every process (see
+``CACHES``), so an invalidation is seen by all of them.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from authentication.models import Profile, Skill
+from core.models import Project
+
+# kind -> (through model, column of the object, column of the skill)
+RELATIONS = {
+    'project': (Project.skills.through, 'project_id', 'skill_id'),
+    'profile': (Profile.skills.through, 'profile_id', 'skill_id'),
+}
+
+
+def ids_to_bitmap(ids):
+    """ Packs the given non-negative ids into a bitmap """
+
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for pk in ids:
+        buffer[pk >> 3] |= 1 << (pk & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def bitmap_to_ids(bitmap):
+    """ Unpacks a bitmap into the sorted list of ids it contains """
+
+    ids = []
+    for index, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+        if byte:
+            base = index << 3
+            ids.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return ids
+
+
+def _cache_key(kind, skill_id):
+    return f'skill-index:{kind}:{skill_id}'
+
+
+def get_postings(kind, skill_ids):
+    """ Returns a ``{skill_id: bitmap}`` dict, building the posting lists missing from the cache in one query """
+
+    skill_ids = {int(skill_id) for skill_id in skill_ids}
+    keys = {_cache_key(kind, skill_id): skill_id for skill_id in skill_ids}
+    postings = {keys[key]: bitmap for key, bitmap in cache.get_many(keys).items()}
+
+    missing = skill_ids - postings.keys()
+    if missing:
+        through, object_column, skill_column = RELATIONS[kind]
+        ids = {skill_id: [] for skill_id in missing}
+        rows = through.objects.filter(**{f'{skill_column}__in': missing}).values_list(skill_column, object_column)
+        for skill_id, object_id in rows.iterator():
+            ids[skill_id].append(object_id)
+        built = {skill_id: ids_to_bitmap(object_ids) for skill_id, object_ids in ids.items()}
+        cache.set_many({_cache_key(kind, skill_id): bitmap for skill_id, bitmap in built.items()},
+                       settings.SKILL_INDEX_TIMEOUT)
+        postings.update(built)
+    return postings
+
+
+def invalidate(kind, skill_ids):
+    """ Drops the posting lists of the given skills so they are rebuilt on next use """
+
+    cache.delete_many([_cache_key(kind, skill_id) for skill_id in skill_ids])
+
+
+def invalidate_all():
+    """ Drops the posting lists of every skill, e.g. after a bulk load that sent no m2m signals """
+
+    skill_ids = list(Skill.objects.values_list('pk', flat=True))
+    for kind in RELATIONS:
+        invalidate(kind, skill_ids)
+
+
+class SkillMatch:
+    """
+    The objects matched by a skill query, as an ``include`` bitmap (None for every object) minus an ``exclude`` one.
+
+    Supports ``pk in match`` so that a paginator can walk a keyset ordered queryset and keep the matching rows, which
+    avoids sending the whole match to the database as an ``IN`` list.
+    """
+
+    def __init__(self, include, exclude):
+        self.include = include if include is None else include & ~exclude
+        self.exclude = exclude
+
+    def __contains__(self, pk):
+        if self.include is not None:
+            return bool(self.include >> pk & 1)
+        return not self.exclude >> pk & 1
+
+    def count(self):
+        """ Returns the number of matched objects, None when the match is a negation """
+
+        return None if self.include is None else self.include.bit_count()
+
+
+def match_skills(kind, all_of=(), any_of=(), none_of=()):
+    """
+    Returns the SkillMatch of projects or profiles by their skills, None when no skill is given.
+
+    ``all_of`` keeps objects having every given skill, ``any_of`` keeps objects having at least one of them and
+    ``none_of`` drops objects having any of them. Empty arguments are ignored.
+    """
+
+    if not (all_of or any_of or none_of):
+        return None
+
+    postings = get_postings(kind, [*all_of, *any_of, *none_of])
+    include = None
+    for skill_id in all_of:
+        include = postings[int(skill_id)] if include is None else include & postings[int(skill_id)]
+    if any_of:
+        union = 0
+        for skill_id in any_of:
+            union |= postings[int(skill_id)]
+        include = union if include is None else include & union
+
+    exclude = 0
+    for skill_id in none_of:
+        exclude |= postings[int(skill_id)]
+    return SkillMatch(include, exclude)
+
+
+def filter_by_skills(queryset, kind, all_of=(), any_of=(), none_of=()):
+    """
+    Narrows a queryset of projects or profiles down by their skills, see ``match_skills()``.
+
+    Returns a ``(queryset, match)`` pair. A match of at most ``SKILL_FILTER_MAX_IDS`` objects is applied to the
+    queryset as an ``id IN (...)`` condition and the returned match is None. A larger or negated match is returned
+    as is, to be tested against the rows while walking the queryset (see ``KeysetPaginator``).
+    """
+
+    match = match_skills(kind, all_of, any_of, none_of)
+    if match is not None and match.count() is not None and match.count() <= settings.SKILL_FILTER_MAX_IDS:
+        return queryset.filter(pk__in=bitmap_to_ids(match.include)), None
+    return queryset, match
+
+
+def _parse_ids(value):
+    return [int(part) for part in value.split(',') if part.strip().isdigit()]
+
+
+class SkillFilterMixin:
+    """
+    A list view mixin filtering the list by skills from the query string.
+
+    ``?skills=1,2`` keeps objects having skills 1 and 2, ``?any_skills=3,4`` objects having skill 3 or 4 and
+    ``?exclude_skills=5`` drops objects having skill 5. A match too large for the queryset is left in ``skill_match``
+    for the keyset paginator to apply.
+    """
+
+    skill_index_kind = None
+    skill_match = None
+
+    def get_queryset(self):
+        params = self.request.GET
+        queryset, self.skill_match = filter_by_skills(
+            super().get_queryset(),
+            self.skill_index_kind,
+            all_of=_parse_ids(params.get('skills', '')),
+            any_of=_parse_ids(params.get('any_skills', '')),
+            none_of=_parse_ids(params.get('exclude_skills', '')),
+        )
+        return queryset
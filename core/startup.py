@@ -0,0 +1,156 @@
+"""
+A benchmark of process startup: the import time of every module, the duration of a short management command and the
+latency of the first request served by a fresh process.
+
+Every measurement starts a new interpreter, ``runs`` times, and the medians are reported. Module import times come
+from ``python -X importtime``, which reports for every module the time spent executing it (self) and the time
+including the modules it imported (cumulative).
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+
+IMPORT_TIME_LINE = re.compile(
+    r'^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent> *)(?P<module>\S+)$'
+)
+
+# Run by a fresh interpreter: sets Django up, then serves the same path twice through the test client.
+FIRST_REQUEST_SCRIPT = '''
+import json, os, sys, time
+start = time.perf_counter()
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+django.setup()
+setup = time.perf_counter()
+from django.test import Client
+from django.test.utils import override_settings
+client = Client()
+with override_settings(ALLOWED_HOSTS=['*']):
+    status = client.get(sys.argv[1]).status_code
+    first = time.perf_counter()
+    client.get(sys.argv[1])
+    second = time.perf_counter()
+print(json.dumps({{
+    'status': status,
+    'setup_ms': (setup - start) * 1000,
+    'first_request_ms': (first - setup) * 1000,
+    'second_request_ms': (second - first) * 1000,
+}}))
+'''
+
+
+@dataclass
+class ModuleImport:
+    """ The import time of a module, in milliseconds """
+
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+def parse_import_times(output):
+    """ Returns the ModuleImport of every line of the ``-X importtime`` output """
+
+    imports = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            imports.append(ModuleImport(
+                module=match['module'],
+                self_ms=int(match['self']) / 1000,
+                cumulative_ms=int(match['cumulative']) / 1000,
+                depth=(len(match['indent']) - 1) // 2,
+            ))
+    return imports
+
+
+def _run(args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    )
+
+
+def import_times(args):
+    """ Runs ``python -X importtime <args>`` in a new process and returns its module imports """
+
+    return parse_import_times(_run(['-X', 'importtime', *args]).stderr)
+
+
+def manage_py(*args):
+    return [os.path.join(settings.BASE_DIR, 'manage.py'), *args]
+
+
+def _summary(samples):
+    return {'median_ms': round(statistics.median(samples), 2), 'min_ms': round(min(samples), 2)}
+
+
+def time_command(args, runs=5):
+    """ Returns the median and the minimum wall time of ``python <args>``, each run in a new process """
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run(args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return _summary(samples)
+
+
+def first_request(path, runs=5):
+    """
+    Returns the median and minimum durations of fresh processes serving a path twice: the whole process, its
+    ``django.setup()``, its first request (which loads the middleware, the URLconf, the views and the template engine)
+    and its second request, for comparison.
+    """
+
+    script = FIRST_REQUEST_SCRIPT.format(settings_module=os.environ.get('DJANGO_SETTINGS_MODULE', 'Code-Book.settings'))
+    samples = defaultdict(list)
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = json.loads(_run(['-c', script, path]).stdout)
+        samples['process_ms'].append((time.perf_counter() - start) * 1000)
+        for name in ('setup_ms', 'first_request_ms', 'second_request_ms'):
+            samples[name].append(result[name])
+    report = {'path': path, 'status': result['status']}
+    report.update({name[:-len('_ms')]: _summary(values) for name, values in samples.items()})
+    return report
+
+
+def profile_imports(args, runs=5, top=25):
+    """
+    Returns the median total import time of ``python <args>`` with the ``top`` modules by cumulative time and the
+    ``top`` top-level packages by the time spent in their own modules.
+    """
+
+    totals, modules, packages = [], defaultdict(list), defaultdict(list)
+    for _ in range(runs):
+        imports = import_times(args)
+        totals.append(sum(module.self_ms for module in imports))
+        package_times = defaultdict(float)
+        for module in imports:
+            modules[module.module].append(module.cumulative_ms)
+            package_times[module.module.split('.')[0]] += module.self_ms
+        for package, self_ms in package_times.items():
+            packages[package].append(self_ms)
+
+    def ranked(samples):
+        medians = {name: statistics.median(values) for name, values in samples.items()}
+        return [
+            {'name': name, 'ms': round(value, 2)}
+            for name, value in sorted(medians.items(), key=lambda item: item[1], reverse=True)[:top]
+        ]
+
+    return {
+        'total_ms': round(statistics.median(totals), 2),
+        'modules_by_cumulative_time': ranked(modules),
+        'packages_by_self_time': ranked(packages),
+    }
@@ -0,0 +1,18 @@
+// Replaces the "More reviews" link of the review thread with the next page of reviews, fetched as an HTML fragment.
+// Without JavaScript the link simply opens the next page.
+document.addEventListener('click', async (event) => {
+  const link = event.target.closest('.load-more-reviews');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  link.classList.add('disabled');
+
+  const response = await fetch(link.dataset.fragmentUrl, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+  if (!response.ok) {
+    window.location.href = link.href;
+    return;
+  }
+  link.insertAdjacentHTML('beforebegin', await response.text());
+  link.remove();
+});
@@ -0,0 +1,88 @@
+"""
+Content-addressed storage of the uploaded images.
+
+An upload is hashed while it is streamed to a temporary file and stored once under its SHA-256 digest, as
+``blobs/<d0d1>/<d2d3>/<digest><extension>``, so uploading the same image again reuses the existing blob. Since a
+blob's content never changes under its name, its URL can be cached forever.
+
+Blobs are shared by every project and profile that uploaded the same content and are reference counted by querying
+the fields storing them (``BLOB_FIELDS``). When a project or a profile is deleted or its image replaced, a background
+task deletes the blob and its derivatives if nothing references it anymore. A blob reused by an upload within the
+last ``BLOB_GRACE_SECONDS`` is kept, since the object referencing it may not be saved yet.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs/'
+
+# The fields storing blobs, as (model label, field name).
+BLOB_FIELDS = [
+    ('core.project', 'featured_image'),
+    ('authentication.profile', 'profile_picture'),
+]
+
+
+def blob_name(digest, extension):
+    return f'{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """ A file system storage keeping a single copy of every distinct content under its digest """
+
+    def get_available_name(self, name, max_length=None):
+        # The name is chosen by _save from the content, an existing file with that name has the same content.
+        return name
+
+    def _save(self, name, content):
+        temp_dir = os.path.join(self.location, BLOB_PREFIX, 'tmp')
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        descriptor, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    file.write(chunk)
+
+            name = blob_name(digest.hexdigest(), os.path.splitext(name)[1].lower())
+            path = self.path(name)
+            if os.path.exists(path):
+                # Marks the blob as reused, so it is not collected before the new reference is saved.
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+
+def references(name):
+    """ Returns the number of objects referencing a blob """
+
+    return sum(
+        apps.get_model(label)._default_manager.filter(**{field_name: name}).count()
+        for label, field_name in BLOB_FIELDS
+    )
+
+
+def recently_reused(name):
+    """ Returns whether a blob was stored or reused by an upload within the last ``BLOB_GRACE_SECONDS`` """
+
+    return time.time() - os.path.getmtime(default_storage.path(name)) < settings.BLOB_GRACE_SECONDS
+
@@ -0,0 +1,215 @@
+"""
+A background task queue stored in the database.
+
+Request and signal handlers ``enqueue`` jobs, rows of ``Task`` inserted in the same transaction as the data they are
+derived from (so a job never runs for a rolled back change), and the ``run_tasks`` command works them off in a pool
+of worker processes. No broker is needed.
+
+* Tasks are registered with the ``task`` decorator in the ``tasks`` module of an app, under the name of the function.
+* A job enqueued with a ``dedupe_key`` is dropped while an equivalent job is still pending.
+* A task declared with a ``batch_size`` is called once with the payloads of up to that many due jobs.
+* A failed job is retried with exponential backoff, up to ``TASK_MAX_ATTEMPTS`` times, and is then kept as failed
+  with its traceback.
+* Claimed jobs are leased for ``TASK_LEASE_SECONDS``; the jobs of a worker that died are run again once the lease
+  ends, so tasks must be idempotent. A job whose lease ends after its last attempt is kept as failed instead, so that
+  a job crashing its worker is not run forever.
+"""
+
+import logging
+import random
+import time
+import traceback
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import Task
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, FAILED = Task.StatusChoices.values
+
+
+@dataclass
+class TaskSpec:
+    """ A registered task """
+
+    name: str
+    func: Callable
+    batch_size: int = 1
+    max_attempts: Optional[int] = None
+
+
+registry = {}
+
+
+def task(func=None, *, name=None, batch_size=1, max_attempts=None):
+    """
+    Registers a function as a task.
+
+    The function is called with the payload of a job as keyword arguments or, for a task with a ``batch_size``
+    greater than 1, with the list of the payloads of a batch of jobs.
+    """
+
+    def register(func):
+        spec = TaskSpec(name or func.__name__, func, batch_size, max_attempts)
+        registry[spec.name] = spec
+        return func
+
+    return register(func) if func else register
+
+
+def enqueue(name, payload=None, dedupe_key=None, delay=0):
+    """
+    Adds a job to the queue, due in ``delay`` seconds, in the current transaction.
+
+    Returns the job, or None when a pending job with the same ``dedupe_key`` already exists.
+    """
+
+    if name not in registry:
+        raise ValueError(f'Unknown task: {name}')
+    try:
+        with transaction.atomic():
+            return Task.objects.create(
+                name=name,
+                payload=payload or {},
+                dedupe_key=dedupe_key,
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        if dedupe_key is None:
+            raise
+        return None
+
+
+def retry_delay(attempts):
+    """ Returns the seconds to wait before the next attempt, doubling with every attempt, with jitter """
+
+    delay = min(settings.TASK_MAX_RETRY_DELAY, settings.TASK_RETRY_DELAY * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1)
+
+
+def _due(now):
+    return Q(status=PENDING, run_after__lte=now) | Q(status=RUNNING, locked_until__lt=now)
+
+
+def _max_attempts(spec):
+    return (spec and spec.max_attempts) or settings.TASK_MAX_ATTEMPTS
+
+
+def _fail_abandoned(spec, name, now):
+    """ Keeps as failed the running jobs of a task whose lease ended after their last attempt """
+
+    abandoned = Task.objects.filter(
+        name=name, status=RUNNING, locked_until__lt=now, attempts__gte=_max_attempts(spec)
+    )
+    count = abandoned.update(
+        status=FAILED,
+        last_error='The lease of the last attempt ended before the job finished.',
+        claimed_by=None,
+        locked_until=None,
+        modified=now,
+    )
+    if count:
+        logger.error('Task %s: %d job(s) abandoned on their last attempt', name, count)
+
+
+def claim():
+    """
+    Leases the next batch of due jobs: the oldest one and, if its task is batched, other due jobs of the same task.
+
+    Returns the spec of the task (None for an unknown task) and the claimed jobs.
+    """
+
+    now = timezone.now()
+    ids = []
+    while not ids:
+        name = Task.objects.filter(_due(now)).order_by('run_after', 'id').values_list('name', flat=True).first()
+        if name is None:
+            return None, []
+
+        spec = registry.get(name)
+        _fail_abandoned(spec, name, now)
+        limit = spec.batch_size if spec else 1
+        ids = list(
+            Task.objects.filter(_due(now), name=name).order_by('run_after', 'id').values_list('pk', flat=True)[:limit]
+        )
+    # Another worker may claim the same rows in between, the token tells which ones this worker got.
+    token = uuid.uuid4().hex
+    Task.objects.filter(_due(now), pk__in=ids).update(
+        status=RUNNING,
+        claimed_by=token,
+        locked_until=now + timedelta(seconds=settings.TASK_LEASE_SECONDS),
+        attempts=F('attempts') + 1,
+        modified=now,
+    )
+    return spec, list(Task.objects.filter(claimed_by=token).order_by('run_after', 'id'))
+
+
+def _give_up_or_retry(spec, job, error):
+    released = Task.objects.filter(pk=job.pk, claimed_by=job.claimed_by)
+    if spec is None or job.attempts >= _max_attempts(spec):
+        released.update(status=FAILED, last_error=error, claimed_by=None, locked_until=None)
+        return
+    try:
+        with transaction.atomic():
+            released.update(
+                status=PENDING,
+                run_after=timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+                last_error=error,
+                claimed_by=None,
+                locked_until=None,
+            )
+    except IntegrityError:
+        # An equivalent job was enqueued while this one ran, it will do the work.
+        released.delete()
+
+
+def run_batch(spec, jobs):
+    """ Runs a batch of claimed jobs, deleting them when the task succeeds and scheduling a retry when it fails """
+
+    try:
+        if spec is None:
+            raise LookupError(f'Unknown task: {jobs[0].name}')
+        if spec.batch_size > 1:
+            spec.func([job.payload for job in jobs])
+        else:
+            spec.func(**jobs[0].payload)
+    except Exception:
+        logger.exception('Task %s failed (%d job(s))', jobs[0].name, len(jobs))
+        error = traceback.format_exc()
+        for job in jobs:
+            _give_up_or_retry(spec, job, error)
+    else:
+        Task.objects.filter(pk__in=[job.pk for job in jobs], claimed_by=jobs[0].claimed_by).delete()
+
+
+def run_pending():
+    """ Runs batches of due jobs until none is left. Returns the number of jobs run. """
+
+    count = 0
+    while True:
+        spec, jobs = claim()
+        if not jobs:
+            return count
+        run_batch(spec, jobs)
+        count += len(jobs)
+
+
+def work(burst=False, poll_interval=None):
+    """ Runs due jobs as they come, polling every ``poll_interval`` seconds, or until none is left with ``burst`` """
+
+    poll_interval = settings.TASK_POLL_INTERVAL if poll_interval is None else poll_interval
+    while True:
+        ran = run_pending()
+        close_old_connections()
+        if burst:
+            return
+        if not ran:
+            time.sleep(poll_interval)
@@ -0,0 +1,18 @@
+"""
+Entry point of the worker processes started by the run_tasks command.
+
+Worker processes are spawned rather than forked, so they do not share the database connections of the parent. This
+module is imported by them before Django is set up, hence it imports nothing from the apps at module level.
+"""
+
+import django
+
+
+def main(burst, poll_interval):
+    """ Sets Django up in a fresh process and works off the queue """
+
+    django.setup()
+
+    from core.task_queue import work
+
+    work(burst=burst, poll_interval=poll_interval)
@@ -0,0 +1,101 @@
+""" Background tasks of the core app, run by the run_tasks command (see core.task_queue) """
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+
+from authentication.models import Profile, Skill
+from core import search, storage
+from core.images import delete_derivatives, generate_derivatives_for
+from core.models import Project
+from core.recommendations import profile_recommender, project_recommender
+from core.task_queue import enqueue, task
+
+
+@task
+def generate_image_derivatives(model, pk, field_name):
+    """ Generates the resized derivatives of an uploaded image """
+
+    generate_derivatives_for(apps.get_model(model), pk, field_name)
+
+
+@task(batch_size=500)
+def refresh_similar_projects(payloads):
+    """ Refreshes the similar projects of the projects whose skills changed """
+
+    project_recommender().refresh({payload['pk'] for payload in payloads})
+
+
+@task(batch_size=500)
+def refresh_similar_profiles(payloads):
+    """ Refreshes the similar profiles of the profiles whose skills changed """
+
+    profile_recommender().refresh({payload['pk'] for payload in payloads})
+
+
+@task(batch_size=500)
+def reindex_projects(payloads):
+    """ Reindexes the projects that were saved or had their skills changed """
+
+    search.index_projects({payload['pk'] for payload in payloads})
+
+
+@task(batch_size=500)
+def reindex_profiles(payloads):
+    """ Reindexes the profiles that were saved or had their skills changed """
+
+    search.index_profiles({payload['pk'] for payload in payloads})
+
+
+@task(batch_size=100)
+def reindex_user_documents(payloads):
+    """ Reindexes the profiles and the projects of renamed users """
+
+    users = User.objects.filter(pk__in=[payload['pk'] for payload in payloads])
+    search.index_profiles(Profile.objects.filter(user__in=users).values_list('pk', flat=True))
+    search.index_projects(Project.objects.filter(user__in=users).values_list('pk', flat=True))
+
+
+@task(batch_size=100)
+def reindex_skill_documents(payloads):
+    """ Reindexes the profiles and the projects that use renamed skills """
+
+    skills = Skill.objects.filter(pk__in=[payload['pk'] for payload in payloads])
+    search.index_profiles(Profile.objects.filter(skills__in=skills).values_list('pk', flat=True).distinct())
+    search.index_projects(Project.objects.filter(skills__in=skills).values_list('pk', flat=True).distinct())
+
+
+@task(batch_size=100)
+def collect_orphan_blobs(payloads):
+    """ Deletes the stored images, and their derivatives, that no project or profile references anymore """
+
+    for name in {payload['name'] for payload in payloads}:
+        if not storage.is_blob(name) or not default_storage.exists(name) or storage.references(name):
+            continue
+        if storage.recently_reused(name):
+            schedule_blob_collection(name, delay=settings.BLOB_GRACE_SECONDS)
+            continue
+        delete_derivatives(name)
+        default_storage.delete(name)
+
+
+def schedule_blob_collection(name, delay=0):
+    """ Queues deleting a blob once nothing references it """
+
+    if storage.is_blob(name):
+        enqueue('collect_orphan_blobs', {'name': name}, dedupe_key=f'collect-blob:{name}', delay=delay)
+
+
+def schedule_project_reindex(project_ids):
+    """ Queues reindexing the given projects for full-text search """
+
+    for pk in project_ids:
+        enqueue('reindex_projects', {'pk': pk}, dedupe_key=f'reindex-project:{pk}')
+
+
+def schedule_profile_reindex(profile_ids):
+    """ Queues reindexing the given profiles for full-text search """
+
+    for pk in profile_ids:
+        enqueue('reindex_profiles', {'pk': pk}, dedupe_key=f'reindex-profile:{pk}')
@@ -0,0 +1,91 @@
+"""
+A Django template backend adding the time spent rendering templates to the metrics of the current request.
+
+It also imports the template tag libraries lazily. Django imports the library of every installed app when the engine
+is created, e.g. ``rest_framework``'s (which imports ``requests``, ``yaml`` and the REST framework renderers) before the
+first page of the site is rendered. Here a library is only imported the first time a template ``{% load %}``s it.
+"""
+
+import importlib.util
+import pkgutil
+import time
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.library import import_library
+
+from core.middleware import current_metrics
+
+# Set while a template renders, so the templates rendered from within it (e.g. by a template tag) are not counted twice.
+_rendering = ContextVar('rendering', default=False)
+
+
+class TimedTemplate(Template):
+    """ A template timing its renders within a request """
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics()
+        if metrics is None or _rendering.get():
+            return super().render(context, request)
+
+        token = _rendering.set(True)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.add_template_time(time.perf_counter() - start)
+            _rendering.reset(token)
+
+
+def template_tag_modules():
+    """ Yields the ``(name, module path)`` of the template tag libraries of Django and the installed apps """
+
+    candidates = ['django.templatetags', *(f'{app_config.name}.templatetags' for app_config in apps.get_app_configs())]
+    for candidate in candidates:
+        # Finding the package imports the app but not its templatetags package.
+        spec = importlib.util.find_spec(candidate)
+        if spec is None or spec.submodule_search_locations is None:
+            continue
+        for module in pkgutil.walk_packages(spec.submodule_search_locations, f'{candidate}.'):
+            if not module.ispkg:
+                yield module.name[len(candidate) + 1:], module.name
+
+
+class LazyLibraries(dict):
+    """ Template tag libraries by name, given as module paths and imported when a template first loads them """
+
+    def __getitem__(self, name):
+        library = super().__getitem__(name)
+        if isinstance(library, str):
+            library = import_library(library)
+            self[name] = library
+        return library
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, with its templates timed by ``QueryInstrumentationMiddleware`` and its template tag
+    libraries imported lazily.
+    """
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.engine.libraries = self.lazy_libraries
+        self.engine.template_libraries = LazyLibraries(self.lazy_libraries)
+
+    def get_templatetag_libraries(self, custom_libraries):
+        # The engine imports every library it is created with, so it gets none and the lazy ones are set afterwards.
+        self.lazy_libraries = dict(template_tag_modules())
+        self.lazy_libraries.update(custom_libraries)
+        return {}
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,45 @@
+""" Template tags for caching rendered project and profile cards """
+
+from django import template
+
+from authentication.models import Profile
+from core.card_cache import get_or_render, profile_card_key, project_card_key
+from core.models import Project
+
+register = template.Library()
+
+KEY_FUNCTIONS = {
+    Project: project_card_key,
+    Profile: profile_card_key,
+}
+
+
+class CardCacheNode(template.Node):
+    """ Renders its content once per version of the object and serves it from the cache afterwards """
+
+    def __init__(self, nodelist, obj):
+        self.nodelist = nodelist
+        self.obj = obj
+
+    def render(self, context):
+        obj = self.obj.resolve(context)
+        key = KEY_FUNCTIONS[type(obj)](obj)
+        return get_or_render(key, lambda: self.nodelist.render(context))
+
+
+@register.tag('cardcache')
+def do_cardcache(parser, token):
+    """
+    Caches the enclosed card of a project or a profile.
+
+    Usage::
+
+        {% cardcache project %} ... {% endcardcache %}
+    """
+
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag takes exactly one argument, the object of the card.")
+    nodelist = parser.parse(('endcardcache',))
+    parser.delete_first_token()
+    return CardCacheNode(nodelist, parser.compile_filter(bits[1]))
@@ -0,0 +1,33 @@
+""" Template tags for rendering uploaded images through their resized derivatives """
+
+from django import template
+
+from core.images import image_sources
+
+register = template.Library()
+
+# The ``sizes`` attribute for each named size, telling the browser how wide the image is displayed.
+SIZES_ATTRIBUTES = {
+    'avatar': '96px',
+    'card': '(min-width: 768px) 33vw, 100vw',
+    'detail': '(min-width: 768px) 700px, 100vw',
+}
+
+
+@register.inclusion_tag('core/_responsive_image.html')
+def responsive_image(image, size, alt='', css_class='', width=''):
+    """
+    Renders a <picture> for an image field with WebP and JPEG ``srcset`` candidates of the given named size.
+
+    Usage::
+
+        {% responsive_image project.featured_image 'card' alt=project.title css_class='card-img-top' %}
+    """
+
+    return {
+        'sources': image_sources(image, size),
+        'sizes': SIZES_ATTRIBUTES[size],
+        'alt': alt,
+        'css_class': css_class,
+        'width': width,
+    }
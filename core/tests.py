@@ -1,3 +1,1076 @@
-from django.test import TestCase
+""" Tests for the core app."""
+
+import json
+import math
+import os
+import shutil
+import time
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from authentication.models import Profile, Skill
+from core.benchmark import run_benchmark
+from core.bulk_io import export_records, import_records, iter_fixture, iter_records, write_jsonl
+from core import card_cache
+from core.card_cache import get_stats, reset_stats
+from core.images import (
+    DERIVATIVE_WIDTHS, derivative_name, derivatives_directory, generate_derivatives, image_sources,
+)
+from core.concurrency import warm_read_workers
+from core.middleware import BudgetExceeded, QueryInstrumentationMiddleware
+from core.models import Project, Review, SimilarProject, Task
+from core.views import AsyncSingleProjectView, SingleProjectView, serve_blob
+from core.pagination import KeysetPaginator
+from core.profiling import aggregate, load_profiles
+from core.provisioning import iter_rows, provision_users
+from core.query_audit import audit_routes, explain, plan_problems
+from core.ranking import rebase_trending_scores, trending_weight, wilson_lower_bound
+from core.recommendations import Recommender, project_recommender
+from core.routers import PrimaryReplicaRouter, replica_reads
+from core.search import search
+from core.startup import import_times, parse_import_times
+from core.skill_index import bitmap_to_ids, filter_by_skills, ids_to_bitmap, match_skills
+from core.task_queue import enqueue, run_pending, task
+from core.utils import recompute_vote_counters
+
+
+class ProjectVoteCountersTests(TestCase):
+    """ Tests that the denormalized vote counters of a project follow its reviews """
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='password')
+        self.reviewer = User.objects.create_user(username='reviewer', password='password')
+        self.project = Project.objects.create(user=self.author, title='Project')
+
+    def assertCounters(self, up_votes, down_votes, review_count):
+        self.project.refresh_from_db()
+        self.assertEqual(
+            (self.project.up_votes, self.project.down_votes, self.project.review_count),
+            (up_votes, down_votes, review_count),
+        )
+
+    def test_counters_follow_review_writes(self):
+        review = Review.objects.create(user=self.reviewer, project=self.project, vote='Up')
+        Review.objects.create(user=self.author, project=self.project, vote='Down')
+        self.assertCounters(1, 1, 2)
+        self.assertEqual(self.project.votes_ratio, 50)
+
+        review.vote = 'Down'
+        review.save()
+        self.assertCounters(0, 2, 2)
+
+        review.delete()
+        self.assertCounters(0, 1, 1)
+
+    def test_counters_never_go_below_zero(self):
+        review = Review.objects.create(user=self.reviewer, project=self.project, vote='Up')
+        Project.objects.filter(pk=self.project.pk).update(up_votes=0, review_count=0)
+        review.delete()
+        self.assertCounters(0, 0, 0)
+
+    def test_review_is_not_saved_without_its_counters(self):
+        with mock.patch('core.signals.apply_vote_deltas', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                Review.objects.create(user=self.reviewer, project=self.project, vote='Up')
+        self.assertFalse(Review.objects.exists())
+        self.assertCounters(0, 0, 0)
+
+    def test_recompute_command_repairs_drift(self):
+        Review.objects.create(user=self.reviewer, project=self.project, vote='Up')
+        Project.objects.filter(pk=self.project.pk).update(up_votes=7, down_votes=3, review_count=0)
+
+        call_command('recompute_project_counters', stdout=StringIO())
+        self.assertCounters(1, 0, 1)
+
+    def test_ranking_scores_follow_review_writes(self):
+        review = Review.objects.create(user=self.reviewer, project=self.project, vote='Up')
+        other = Review.objects.create(user=self.author, project=self.project, vote='Up')
+        self.project.refresh_from_db()
+        self.assertAlmostEqual(self.project.wilson_score, wilson_lower_bound(2, 0))
+        expected = trending_weight('Up', review.created) + trending_weight('Up', other.created)
+        self.assertTrue(math.isclose(self.project.trending_score, expected))
+
+        review.vote = 'Down'
+        review.save()
+        self.project.refresh_from_db()
+        self.assertAlmostEqual(self.project.wilson_score, wilson_lower_bound(1, 1))
+
+        scores = (self.project.wilson_score, self.project.trending_score)
+        Project.objects.filter(pk=self.project.pk).update(wilson_score=0, trending_score=0)
+        recompute_vote_counters()
+        self.project.refresh_from_db()
+        self.assertAlmostEqual(self.project.wilson_score, scores[0])
+        # An up vote turned down cancels out, so the difference is compared with the weight of a single vote.
+        self.assertTrue(math.isclose(self.project.trending_score, scores[1], abs_tol=1e-9 * expected))
+
+    def test_trending_epoch_moves_forward(self):
+        Review.objects.create(user=self.reviewer, project=self.project, vote='Up')
+
+        # Without moving the epoch, the weight of a vote this far ahead would overflow.
+        later = settings.TRENDING_EPOCH + timedelta(seconds=settings.TRENDING_HALF_LIFE * 2000)
+        with self.assertRaises(OverflowError):
+            trending_weight('Up', later)
+        self.assertEqual(rebase_trending_scores(later), 2000)
+        self.assertEqual(rebase_trending_scores(later), 0)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.trending_score, 0)
+
+        Review.objects.create(user=self.author, project=self.project, vote='Up', created=later)
+        self.project.refresh_from_db()
+        self.assertTrue(math.isclose(self.project.trending_score, trending_weight('Up', later, 2000)))
+
+        recompute_vote_counters()
+        self.project.refresh_from_db()
+        self.assertTrue(math.isclose(self.project.trending_score, trending_weight('Up', later, 2000)))
+
+    def test_wilson_lower_bound_favours_confidence(self):
+        self.assertEqual(wilson_lower_bound(0, 0), 0)
+        self.assertGreater(wilson_lower_bound(95, 5), wilson_lower_bound(1, 0))
+        self.assertGreater(wilson_lower_bound(10, 1), wilson_lower_bound(10, 5))
+
+    def test_projects_view_sorts_by_score(self):
+        Profile.objects.create(user=self.author)
+        projects = [self.project] + [Project.objects.create(user=self.author, title=f'P{index}') for index in range(4)]
+        for index, project in enumerate(projects):
+            Project.objects.filter(pk=project.pk).update(wilson_score=index / 10)
+
+        pages, query = [], 'sort=top&page_size=2'
+        while query is not None:
+            page = self.client.get(f'{reverse("core:projects")}?{query}').context['cursor_page']
+            pages.extend(page.object_list)
+            query = page.next_query if page.has_next else None
+        self.assertEqual(pages, projects[::-1])
+
+
+class ProjectsViewQueryCountTests(TestCase):
+    """ Tests that the project list renders its cards with a constant number of queries """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.skills = [Skill.objects.create(name=f'Skill {index}') for index in range(3)]
+
+    def create_projects(self, count):
+        for _ in range(count):
+            index = Project.objects.count()
+            user = User.objects.create_user(username=f'user-{index}', first_name='First', last_name='Last')
+            Profile.objects.create(user=user)
+            project = Project.objects.create(user=user, title=f'Project {index}')
+            project.skills.set(self.skills)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('core:projects'))
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_projects(self):
+        self.create_projects(2)
+        queries = self.count_queries()
+
+        self.create_projects(10)
+        self.assertEqual(self.count_queries(), queries)
+
+    def test_skills_keep_their_sorted_order(self):
+        self.create_projects(1)
+        project = Project.objects.get()
+        project.skills.set([self.skills[2], self.skills[0]])
+
+        skills = list(Project.objects.for_cards().get().skills.all())
+        self.assertEqual(skills, [self.skills[2], self.skills[0]])
+
+
+class KeysetPaginatorTests(TestCase):
+    """ Tests walking through projects with the keyset paginator """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='author')
+        cls.projects = [Project.objects.create(user=user, title=f'Project {index}') for index in range(5)]
+        # Equal timestamps make the id the tie breaker of the ordering.
+        Project.objects.update(created=timezone.now())
+
+    def test_pages_walk_forward_and_backward(self):
+        paginator = KeysetPaginator(Project.objects.all(), page_size=2)
+
+        pages = [paginator.get_page(QueryDict())]
+        while pages[-1].has_next:
+            pages.append(paginator.get_page(QueryDict(pages[-1].next_query)))
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual([project for page in pages for project in page], self.projects)
+        self.assertFalse(pages[0].has_previous)
+
+        previous = paginator.get_page(QueryDict(pages[-1].previous_query))
+        self.assertEqual(previous.object_list, pages[1].object_list)
+        self.assertTrue(previous.has_next)
+
+    def test_deep_pages_seek_the_index(self):
+        paginator = KeysetPaginator(Project.objects.all(), page_size=2)
+        cursor = paginator._decode(QueryDict(paginator.get_page(QueryDict()).next_query), 'after')
+        sql, params = paginator._seek(Project.objects.all(), cursor, forward=True)[:3].query.sql_with_params()
+        self.assertEqual(explain(sql, params), ['SEARCH core_project USING INDEX project_created_id_idx (created>?)'])
+
+    def test_invalid_cursor_returns_first_page(self):
+        page = KeysetPaginator(Project.objects.all(), page_size=2).get_page(QueryDict('after=garbage'))
+        self.assertEqual(page.object_list, self.projects[:2])
+
+
+class SearchTests(TestCase):
+    """ Tests that the search index follows model changes and ranks the results """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ada', first_name='Ada', last_name='Lovelace')
+        cls.profile = Profile.objects.create(user=cls.user, short_intro='Analytical engines', bio='Poetical science')
+        cls.django = Skill.objects.create(name='Django')
+        cls.project = Project.objects.create(user=cls.user, title='Bernoulli numbers', description='Note G')
+        run_pending()
+
+    def kinds(self, query):
+        return [(hit.kind, hit.object.pk) for hit in search(query)]
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.kinds('bernoulli'), [('project', self.project.pk)])
+        self.assertEqual(self.kinds('poetic'), [('profile', self.profile.pk)])
+
+        self.project.title = 'Difference engine'
+        self.project.save()
+        # The save only queues the reindex.
+        self.assertEqual(self.kinds('bernoulli'), [('project', self.project.pk)])
+        run_pending()
+        self.assertEqual(self.kinds('bernoulli'), [])
+
+        self.project.delete()
+        self.assertEqual(self.kinds('difference'), [])
+
+    def test_index_follows_related_names_and_skills(self):
+        self.project.skills.set([self.django])
+        run_pending()
+        self.assertEqual(self.kinds('django'), [('project', self.project.pk)])
+
+        self.django.name = 'Flask'
+        self.django.save()
+        run_pending()
+        self.assertEqual(self.kinds('flask'), [('project', self.project.pk)])
+
+        self.user.last_name = 'Byron'
+        self.user.save()
+        run_pending()
+        self.assertEqual(sorted(self.kinds('byron')), [('profile', self.profile.pk), ('project', self.project.pk)])
+
+    def test_title_matches_rank_first(self):
+        other = Project.objects.create(user=self.user, title='Other', description='Bernoulli appears in the text')
+        run_pending()
+        self.assertEqual(self.kinds('bernoulli'), [('project', self.project.pk), ('project', other.pk)])
+
+    def test_operators_in_the_query_are_treated_as_text(self):
+        self.assertEqual(search('"* ('), [])
+        self.assertEqual(self.kinds('bernoulli AND'), [])
+
+    def test_rebuild_command_restores_the_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM search_index')
+        self.assertEqual(self.kinds('bernoulli'), [])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.kinds('bernoulli'), [('project', self.project.pk)])
+
+    def test_search_view(self):
+        response = self.client.get(reverse('core:search'), {'q': 'bern'})
+        self.assertContains(response, 'Bernoulli numbers')
+
+
+class SkillIndexTests(TestCase):
+    """ Tests filtering projects by skills through the skill index """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='author')
+        Profile.objects.create(user=user)
+        cls.django, cls.react, cls.php = (Skill.objects.create(name=name) for name in ('Django', 'React', 'PHP'))
+        cls.fullstack = Project.objects.create(user=user, title='Full stack')
+        cls.fullstack.skills.set([cls.django, cls.react])
+        cls.legacy = Project.objects.create(user=user, title='Legacy')
+        cls.legacy.skills.set([cls.django, cls.react, cls.php])
+        cls.backend = Project.objects.create(user=user, title='Backend')
+        cls.backend.skills.set([cls.django])
+
+    def setUp(self):
+        cache.clear()
+
+    def filtered(self, **kwargs):
+        queryset, match = filter_by_skills(Project.objects.all(), 'project', **kwargs)
+        return {project for project in queryset if match is None or project.pk in match}
+
+    def test_bitmap_round_trip(self):
+        self.assertEqual(bitmap_to_ids(ids_to_bitmap([0, 7, 8, 1000])), [0, 7, 8, 1000])
+        self.assertEqual(bitmap_to_ids(ids_to_bitmap([])), [])
+
+    def test_boolean_queries(self):
+        django, react, php = self.django.pk, self.react.pk, self.php.pk
+        self.assertEqual(self.filtered(all_of=[django, react], none_of=[php]), {self.fullstack})
+        self.assertEqual(self.filtered(any_of=[react, php]), {self.fullstack, self.legacy})
+        self.assertEqual(self.filtered(none_of=[react]), {self.backend})
+
+    def test_postings_follow_skill_changes(self):
+        self.assertEqual(self.filtered(all_of=[self.php.pk]), {self.legacy})
+
+        self.backend.skills.add(self.php)
+        self.assertEqual(self.filtered(all_of=[self.php.pk]), {self.legacy, self.backend})
+
+        self.legacy.skills.clear()
+        self.assertEqual(self.filtered(all_of=[self.php.pk]), {self.backend})
+
+        self.php.Project.remove(self.backend)
+        self.assertEqual(self.filtered(all_of=[self.php.pk]), set())
+
+    def test_projects_view_filters_by_skills(self):
+        response = self.client.get(reverse('core:projects'), {'skills': f'{self.django.pk},{self.react.pk}',
+                                                              'exclude_skills': str(self.php.pk)})
+        self.assertEqual(response.context['projects'], [self.fullstack])
+
+    @override_settings(SKILL_FILTER_MAX_IDS=0, KEYSET_PAGE_SIZE=1)
+    def test_large_matches_are_walked_page_by_page(self):
+        queryset, match = filter_by_skills(Project.objects.all(), 'project', all_of=[self.django.pk])
+        self.assertIsNotNone(match)
+        self.assertNotIn(' IN (', str(queryset.query))
+
+        pages, params = [], {'any_skills': f'{self.react.pk},{self.php.pk}'}
+        while True:
+            page = self.client.get(reverse('core:projects'), params).context['cursor_page']
+            pages.append(page.object_list)
+            if not page.has_next:
+                break
+            params = QueryDict(page.next_query)
+        self.assertEqual(pages, [[self.fullstack], [self.legacy]])
+
+        response = self.client.get(reverse('api:project-list'), {'exclude_skills': str(self.react.pk)})
+        self.assertEqual([project['title'] for project in response.json()['results']], ['Backend'])
+
+
+class RecommendationsTests(TestCase):
+    """ Tests computing, refreshing and showing the similar projects """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+        Profile.objects.create(user=cls.user)
+        cls.django, cls.react, cls.php = (Skill.objects.create(name=name) for name in ('Django', 'React', 'PHP'))
+        cls.fullstack = Project.objects.create(user=cls.user, title='Full stack')
+        cls.fullstack.skills.set([cls.django, cls.react])
+        cls.legacy = Project.objects.create(user=cls.user, title='Legacy')
+        cls.legacy.skills.set([cls.django, cls.react, cls.php])
+        cls.backend = Project.objects.create(user=cls.user, title='Backend')
+        cls.backend.skills.set([cls.django])
+        cls.website = Project.objects.create(user=cls.user, title='Website')
+        cls.website.skills.set([cls.php])
+        project_recommender().rebuild()
+
+    def similar(self, project):
+        return [recommendation.similar for recommendation in project.similar_projects.all()]
+
+    def test_rebuild_ranks_by_shared_skills(self):
+        self.assertEqual(self.similar(self.fullstack), [self.legacy, self.backend])
+        self.assertEqual(self.similar(self.website), [self.legacy])
+        scores = SimilarProject.objects.filter(project=self.fullstack).values_list('score', flat=True)
+        self.assertTrue(all(0 < score <= 1 for score in scores))
+
+    def test_long_posting_lists_are_pruned(self):
+        scores = dict(SimilarProject.objects.filter(project=self.fullstack).values_list('similar_id', 'score'))
+        Recommender(Project, SimilarProject, 'project_id', max_frequency=1).rebuild()
+        # Only the project of smallest norm of every skill is found, but its score is not approximated.
+        self.assertEqual(self.similar(self.fullstack), [self.backend])
+        self.assertAlmostEqual(SimilarProject.objects.get(project=self.fullstack).score, scores[self.backend.pk])
+
+    def test_refreshed_when_skills_change(self):
+        self.website.skills.set([self.django, self.react])
+        run_pending()
+        self.assertEqual(self.similar(self.website)[0], self.fullstack)
+        self.assertIn(self.website, self.similar(self.fullstack))
+
+        self.website.skills.clear()
+        run_pending()
+        self.assertEqual(self.similar(self.website), [])
+
+    def test_project_page_lists_similar_projects_in_one_query(self):
+        url = reverse('core:project', kwargs={'pk': self.fullstack.pk})
+        response = self.client.get(url)
+        self.assertContains(response, 'SIMILAR PROJECTS')
+        self.assertEqual(list(response.context['similar_projects'])[0].similar, self.legacy)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        # The page validator reads the latest neighbour timestamps, the list itself takes a single query.
+        listings = [query for query in context.captured_queries if '"core_similarproject"."score"' in query['sql']]
+        self.assertEqual(len(listings), 1)
+
+
+class ConditionalDetailPageTests(TestCase):
+    """ Tests answering conditional GETs of the project page """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', password='password')
+        cls.reviewer = User.objects.create_user(username='reviewer')
+        Profile.objects.create(user=cls.author)
+        Profile.objects.create(user=cls.reviewer)
+        cls.project = Project.objects.create(user=cls.author, title='Cached project')
+        cls.review = Review.objects.create(user=cls.reviewer, project=cls.project, vote='Up', body='Nice')
+        cls.url = reverse('core:project', kwargs={'pk': cls.project.pk})
+
+    def test_not_modified_until_the_data_changes(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertIn('Cookie', response['Vary'])
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(context.captured_queries), 1)
+
+        self.review.body = 'Edited'
+        self.review.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Edited')
+
+    def test_modified_when_a_reviewer_changes(self):
+        etag = self.client.get(self.url)['ETag']
+
+        profile = self.reviewer.profile
+        profile.short_intro = 'New intro'
+        profile.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        self.reviewer.first_name = 'Grace'
+        self.reviewer.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(response, 'Grace')
+
+    def test_modified_when_the_recommendations_change(self):
+        other = Project.objects.create(user=self.reviewer, title='Similar project')
+        etag = self.client.get(self.url)['ETag']
+
+        project_recommender().store([self.project.pk], {self.project.pk: [(0.5, other.pk)]})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Similar project')
+
+        other.title = 'Renamed project'
+        other.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(response, 'Renamed project')
+
+    def test_authenticated_pages_are_private(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(self.author)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+    def test_missing_project(self):
+        self.assertEqual(self.client.get(reverse('core:project', kwargs={'pk': 0})).status_code, 404)
+
+
+class ReviewThreadTests(TestCase):
+    """ Tests loading the review thread of a project in pages """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author')
+        Profile.objects.create(user=author)
+        cls.project = Project.objects.create(user=author, title='Popular project')
+        for index in range(5):
+            reviewer = User.objects.create_user(username=f'reviewer-{index}', first_name=f'Reviewer{index}')
+            Profile.objects.create(user=reviewer)
+            Review.objects.create(user=reviewer, project=cls.project, vote='Up', body=f'Review {index}')
+
+    def test_pages_cost_the_same_queries_whatever_their_size(self):
+        url = reverse('core:project', kwargs={'pk': self.project.pk})
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url, {'reviews_page_size': 1})
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url, {'reviews_page_size': 5})
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertFalse(any('COUNT(' in query['sql'] for query in large.captured_queries))
+        self.assertContains(response, 'Reviews (5)')
+
+    def test_fragment_endpoint_serves_the_next_pages(self):
+        response = self.client.get(reverse('core:project', kwargs={'pk': self.project.pk}), {'reviews_page_size': 2})
+        self.assertContains(response, 'Review 1')
+        self.assertNotContains(response, 'Review 2')
+
+        url = reverse('core:project-reviews', kwargs={'pk': self.project.pk})
+        page = response.context['reviews']
+        bodies = []
+        while page.has_next:
+            response = self.client.get(f'{url}?{page.next_query}')
+            self.assertNotContains(response, '<html')
+            page = response.context['reviews']
+            bodies.extend(review.body for review in page)
+        self.assertEqual(bodies, ['Review 2', 'Review 3', 'Review 4'])
+        self.assertNotContains(response, 'More reviews')
+
+
+class CardCacheTests(TestCase):
+    """ Tests that project cards are served from the cache until something they render changes """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author', first_name='First', last_name='Last')
+        Profile.objects.create(user=cls.user)
+        cls.skill = Skill.objects.create(name='Django')
+        cls.projects = [Project.objects.create(user=cls.user, title=f'Project {index}') for index in range(3)]
+        cls.projects[0].skills.set([cls.skill])
+
+    def setUp(self):
+        cache.clear()
+        reset_stats()
+
+    def get_projects(self):
+        return self.client.get(reverse('core:projects'))
+
+    def test_cards_are_cached(self):
+        self.get_projects()
+        self.assertEqual((get_stats()['hits'], get_stats()['misses']), (0, 3))
+
+        self.get_projects()
+        self.assertEqual((get_stats()['hits'], get_stats()['misses']), (3, 3))
+
+    @override_settings(CARD_CACHE_STATS_INTERVAL=60)
+    def test_counts_are_added_to_the_shared_counters_in_batches(self):
+        self.get_projects()
+        self.assertIsNone(cache.get(card_cache.MISSES_KEY))
+        self.assertEqual(get_stats()['misses'], 3)
+        self.assertEqual(cache.get(card_cache.MISSES_KEY), 3)
+
+        with override_settings(CARD_CACHE_STATS_INTERVAL=0):
+            self.get_projects()
+        self.assertEqual(cache.get(card_cache.HITS_KEY), 3)
+
+    def test_related_changes_invalidate_the_affected_cards(self):
+        self.get_projects()
+
+        self.skill.name = 'Flask'
+        self.skill.save()
+        response = self.get_projects()
+        self.assertContains(response, 'Flask')
+        self.assertEqual((get_stats()['hits'], get_stats()['misses']), (2, 4))
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        response = self.get_projects()
+        self.assertContains(response, 'By Renamed Last')
+        self.assertEqual(get_stats()['misses'], 7)
+
+        Task.objects.all().delete()
+        self.user.last_login = timezone.now()
+        self.user.save()
+        self.get_projects()
+        self.assertEqual(get_stats()['misses'], 7)
+        self.assertFalse(Task.objects.filter(name='reindex_user_documents').exists())
+
+
+class ImageDerivativesTests(TestCase):
+    """ Tests generating and referencing the resized derivatives of uploaded images """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+        buffer = BytesIO()
+        Image.new('RGBA', (1000, 500), (255, 0, 0, 128)).save(buffer, 'PNG')
+        self.name = default_storage.save('projects/screenshot.png', ContentFile(buffer.getvalue()))
+
+    def test_generates_every_width_and_format(self):
+        self.assertEqual(generate_derivatives(self.name), len(DERIVATIVE_WIDTHS) * 2)
+        self.assertEqual(generate_derivatives(self.name), 0)
+
+        with default_storage.open(derivative_name(self.name, 400, 'webp')) as file:
+            self.assertEqual(Image.open(file).size, (400, 200))
+        with default_storage.open(derivative_name(self.name, 1600, 'jpg')) as file:
+            self.assertEqual(Image.open(file).size, (1000, 500))
+
+    def test_sources_fall_back_to_the_original(self):
+        user = User.objects.create_user(username='author')
+        project = Project.objects.create(user=user, featured_image=self.name)
+        self.assertEqual(image_sources(project.featured_image, 'card')['webp_srcset'], '')
+
+        generate_derivatives(self.name)
+        sources = image_sources(project.featured_image, 'card')
+        self.assertIn('400.webp 400w', sources['webp_srcset'])
+        self.assertTrue(sources['src'].endswith('/400.jpg'))
+
+
+class BulkImportExportTests(TestCase):
+    """ Tests streaming records out of and back into the database """
+
+    def test_fixture_import(self):
+        with open(settings.BASE_DIR / 'data.json', encoding='utf-8') as fixture:
+            counts, skipped = import_records(iter_records(fixture), batch_size=5)
+
+        with open(settings.BASE_DIR / 'data.json', encoding='utf-8') as fixture:
+            records = json.load(fixture)
+        profile = next(record for record in records if record['model'] == 'authentication.profile')
+
+        self.assertEqual(counts['core.project'], Project.objects.count())
+        self.assertEqual(skipped, sum(1 for record in records if record['model'] not in counts))
+        self.assertEqual(
+            list(Profile.objects.get(pk=profile['pk']).skills.values_list('pk', flat=True)),
+            profile['fields']['skills'],
+        )
+
+    def test_export_round_trip(self):
+        user = User.objects.create_user(username='author', first_name='First')
+        skills = [Skill.objects.create(name=name) for name in ('C', 'A', 'B')]
+        project = Project.objects.create(user=user, title='Project')
+        project.skills.set([skills[2], skills[0], skills[1]])
+        Review.objects.create(user=user, project=project, vote='Up', body='Nice')
+
+        lines = [json.dumps(record, cls=DjangoJSONEncoder) for record in export_records(chunk_size=2)]
+        exported = [json.loads(line) for line in lines]
+        for model in (Review, Project, Skill, User):
+            model.objects.all().delete()
+
+        counts, skipped = import_records(exported)
+        self.assertEqual((counts['core.project'], counts['core.review'], skipped), (1, 1, 0))
+        project = Project.objects.get()
+        self.assertEqual(list(project.skills.all()), [skills[2], skills[0], skills[1]])
+        self.assertEqual(project.user.first_name, 'First')
+
+    def test_import_command_refreshes_derived_data(self):
+        user = User.objects.create_user(username='author')
+        skill = Skill.objects.create(name='Django')
+        projects = [Project.objects.create(user=user, title=f'Imported {index}') for index in range(2)]
+        for project in projects:
+            project.skills.set([skill])
+        Review.objects.create(user=user, project=projects[0], vote='Up')
+        path = os.path.join(tempfile.mkdtemp(), 'export.jsonl')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, 'w', encoding='utf-8') as file:
+            write_jsonl(export_records(), file)
+        for model in (Review, Project, Skill, User):
+            model.objects.all().delete()
+        # Cache the posting list of the skill while no project has it.
+        self.assertEqual(match_skills('project', all_of=[skill.pk]).count(), 0)
+
+        call_command('import_jsonl', path, stdout=StringIO())
+        self.assertEqual(match_skills('project', all_of=[skill.pk]).count(), 2)
+        self.assertEqual(Project.objects.get(pk=projects[0].pk).review_count, 1)
+        self.assertEqual(len(search('imported')), 2)
+        self.assertTrue(SimilarProject.objects.filter(project=projects[0], similar=projects[1]).exists())
+
+    def test_fixture_parser_streams_small_chunks(self):
+        records = [{'model': 'a', 'pk': index, 'fields': {'text': '[,]' * index}} for index in range(20)]
+        self.assertEqual(list(iter_fixture(StringIO(json.dumps(records, indent=2)), chunk_size=7)), records)
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+    """ Tests the per request metrics and budgets of the instrumentation middleware """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='author')
+        Profile.objects.create(user=user)
+        Project.objects.create(user=user, title='Project')
+
+    @override_settings(DEBUG=True)
+    def test_metrics_are_exposed_as_headers(self):
+        response = self.client.get(reverse('core:projects'))
+        self.assertGreater(int(response['X-Query-Count']), 0)
+        self.assertEqual(response['X-Similar-Queries'], '0')
+        self.assertIn('template;dur=', response['Server-Timing'])
+
+    @override_settings(REQUEST_BUDGETS={'core:projects': {'queries': 0}}, REQUEST_BUDGET_ACTION='raise')
+    def test_exceeded_budget_raises(self):
+        with self.assertRaisesMessage(BudgetExceeded, 'core:projects exceeded its budget: queries='):
+            self.client.get(reverse('core:projects'))
+
+    @override_settings(REQUEST_BUDGETS={'core:projects': {'queries': 0}}, REQUEST_BUDGET_ACTION='log')
+    def test_exceeded_budget_is_logged(self):
+        with self.assertLogs('core.instrumentation', 'WARNING'):
+            self.client.get(reverse('core:projects'))
+
+
+class RequestProfilerTests(TestCase):
+    """ Tests profiling requests and aggregating their profiles """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='author')
+        Profile.objects.create(user=user)
+        Project.objects.create(user=user, title='Project')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def profiles(self):
+        return list(load_profiles(self.directory))
+
+    def test_listed_views_are_profiled_and_rotated(self):
+        with self.settings(REQUEST_PROFILE_DIR=self.directory, REQUEST_PROFILE_VIEWS=['core:projects'],
+                           REQUEST_PROFILE_MAX_FILES=2):
+            for _ in range(3):
+                self.client.get(reverse('core:projects'))
+            self.client.get(reverse('authentication:profiles'))
+
+        profiles = self.profiles()
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual(len(os.listdir(self.directory)), 4)
+        profile = profiles[0]
+        self.assertEqual(
+            (profile['view'], profile['trigger'], profile['profiler']), ('core:projects', 'view', 'cprofile')
+        )
+        self.assertGreater(profile['queries'], 0)
+        self.assertTrue(profile['statements'] and profile['functions'])
+
+        summary, = aggregate(profiles, top=5)
+        self.assertEqual((summary['view'], summary['requests'], len(summary['functions'])), ('core:projects', 2, 5))
+        output = StringIO()
+        call_command('profile_report', directory=self.directory, sort='self', stdout=output)
+        self.assertIn('core:projects: 2 request(s)', output.getvalue())
+
+    def test_requests_with_the_token_header_are_profiled(self):
+        with self.settings(REQUEST_PROFILE_DIR=self.directory, REQUEST_PROFILE_TOKEN='secret',
+                           REQUEST_PROFILER='sampling', REQUEST_PROFILE_SAMPLING_INTERVAL=0.001):
+            self.client.get(reverse('core:projects'))
+            self.client.get(reverse('core:projects'), HTTP_X_PROFILE_TOKEN='wrong')
+            self.client.get(reverse('core:projects'), HTTP_X_PROFILE_TOKEN='secret')
+
+        profile, = self.profiles()
+        self.assertEqual((profile['trigger'], profile['profiler']), ('header', 'sampling'))
+
+
+class StartupTests(TestCase):
+    """ Tests the startup benchmark and what a process imports when it starts """
+
+    def test_import_times_are_parsed(self):
+        imports = parse_import_times(
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     PIL.ImageMode\n'
+            'import time:      3733 |      21462 |   PIL.Image\n'
+        )
+        self.assertEqual([(module.module, module.cumulative_ms, module.depth) for module in imports],
+                         [('PIL.ImageMode', 0.12, 2), ('PIL.Image', 21.462, 1)])
+
+    def test_heavy_modules_are_imported_lazily(self):
+        # Loads what a web worker loads before its first request: the settings, the apps, the middleware and the URLs,
+        # then what rendering a page loads: the reverse() lookups and the template engine.
+        modules = {module.module for module in import_times([
+            '-c', "import importlib; importlib.import_module('Code-Book.wsgi'); "
+                  "from django.urls import reverse; reverse('core:projects'); "
+                  "from django.template import engines; engines.all()",
+        ])}
+        self.assertIn('core.images', modules)
+        self.assertFalse({'PIL.Image', 'pstats', 'cProfile', 'rest_framework.views', 'requests', 'yaml'} & modules)
+
+
+class BenchmarkTests(TestCase):
+    """ Tests generating a synthetic dataset and benchmarking the routes against it """
+
+    def test_generate_data_and_benchmark(self):
+        call_command('generate_data', users=20, skills=10, projects=30, max_reviews=10, stdout=StringIO())
+        self.assertEqual((User.objects.count(), Profile.objects.count(), Project.objects.count()), (20, 20, 30))
+        self.assertEqual(sum(Project.objects.values_list('review_count', flat=True)), Review.objects.count())
+
+        results = {result['route']: result for result in run_benchmark(requests=2)}
+        self.assertEqual(results['core:projects']['status'], 200)
+        self.assertEqual(results['authentication:user-profile']['status'], 200)
+        self.assertLessEqual(results['core:projects']['p50_ms'], results['core:projects']['p99_ms'])
+
+
+class AsyncSingleProjectViewTests(TransactionTestCase):
+    """ Tests that the async project page renders the same content as the sync one """
+
+    def setUp(self):
+        author = User.objects.create_user(username='author', first_name='First', last_name='Last')
+        reviewer = User.objects.create_user(username='reviewer', first_name='Re', last_name='Viewer')
+        Profile.objects.create(user=author)
+        Profile.objects.create(user=reviewer)
+        self.project = Project.objects.create(user=author, title='Async project')
+        self.project.skills.set([Skill.objects.create(name='Asyncio'), Skill.objects.create(name='Django')])
+        Review.objects.create(user=reviewer, project=self.project, vote='Up', body='Concurrent!')
+        # Like asgi.py does, so the queries measured are the page's and not the setup of new connections.
+        warm_read_workers()
+
+    def get_request(self):
+        request = RequestFactory().get(reverse('core:project', kwargs={'pk': self.project.pk}))
+        request.user = AnonymousUser()
+        return request
+
+    async def test_renders_like_the_sync_view(self):
+        response = await AsyncSingleProjectView.as_view()(self.get_request(), pk=self.project.pk)
+        self.assertEqual(response.status_code, 200)
+        for text in ('Async project', 'Asyncio', 'Django', 'Concurrent!', 'Re Viewer', 'Votes Ratio 100%'):
+            self.assertContains(response, text)
+
+    @override_settings(DEBUG=True)
+    def test_worker_queries_and_renders_are_measured(self):
+        view = async_to_sync(AsyncSingleProjectView.as_view())
+        middleware = QueryInstrumentationMiddleware(lambda request: view(request, pk=self.project.pk))
+        response = middleware(self.get_request())
+        # The validator, the project, its skills, its reviews and the similar projects each run a query in a worker.
+        self.assertEqual(response['X-Query-Count'], '5')
+        self.assertNotIn('template;dur=0.0,', response['Server-Timing'])
+
+    @override_settings(DEBUG=True)
+    def test_repeated_requests_reuse_the_worker_connections(self):
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(count_connection)
+        self.addCleanup(connection_created.disconnect, count_connection)
+        view = async_to_sync(AsyncSingleProjectView.as_view())
+        middleware = QueryInstrumentationMiddleware(lambda request: view(request, pk=self.project.pk))
+        for _ in range(3):
+            response = middleware(self.get_request())
+            self.assertLessEqual(int(response['X-Query-Count']), settings.REQUEST_BUDGETS['core:project']['queries'])
+            self.assertEqual(response['X-Duplicate-Queries'], '0')
+        self.assertEqual(opened, [])
+
+    def test_sync_view_renders_the_same_sections(self):
+        response = SingleProjectView.as_view()(self.get_request(), pk=self.project.pk)
+        for text in ('Async project', 'Asyncio', 'Django', 'Concurrent!', 'Re Viewer', 'Votes Ratio 100%'):
+            self.assertContains(response, text)
+
+
+class ReplicaRoutingTests(TestCase):
+    """ Tests splitting reads and writes between the primary and the replicas """
+
+    @override_settings(DATABASE_REPLICAS=['replica0'])
+    def test_reads_go_to_replicas_until_a_write(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Project), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Project), 'replica0')
+            self.assertEqual(router.db_for_write(Review), 'default')
+            self.assertEqual(router.db_for_read(Project), 'default')
+        self.assertFalse(router.allow_migrate('replica0', 'core'))
+
+    @override_settings(DATABASE_REPLICAS=['replica0', 'replica1', 'replica2'])
+    def test_a_request_reads_from_a_single_replica(self):
+        router = PrimaryReplicaRouter()
+        with replica_reads():
+            self.assertEqual(len({router.db_for_read(Project) for _ in range(20)}), 1)
+
+    def test_successful_writes_pin_the_session_to_the_primary(self):
+        author = User.objects.create_user(username='author')
+        reviewer = User.objects.create_user(username='reviewer')
+        project = Project.objects.create(user=author, title='Project')
+        url = reverse('core:add-review', kwargs={'pk': project.pk})
+
+        self.client.post(url, {'vote': 'Up', 'body': 'Good'})
+        self.assertNotIn('_primary_pinned_until', self.client.session)
+
+        self.client.force_login(reviewer)
+        self.client.post(reverse('core:add-project'), {'title': 'Project', 'skills': ['999999']})
+        self.assertNotIn('_primary_pinned_until', self.client.session)
+
+        self.client.post(url, {'vote': 'Up', 'body': 'Good'})
+        self.assertGreater(self.client.session['_primary_pinned_until'], time.time())
+
+        self.client.post(reverse('authentication:logout'))
+        self.assertNotIn('_primary_pinned_until', self.client.session)
+
+    def test_sqlite_connections_are_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+
+class QueryPlanAuditTests(TestCase):
+    """ Tests auditing the query plans of the routes """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author')
+        Profile.objects.create(user=author)
+        skill = Skill.objects.create(name='Django')
+        for title in ('Project', 'Other project', 'Last project'):
+            project = Project.objects.create(user=author, title=title)
+            project.skills.add(skill)
+        Profile.objects.create(user=User.objects.create_user(username='reviewer'))
+
+    def test_unindexed_plans_are_reported(self):
+        problems = plan_problems('SELECT * FROM core_project ORDER BY description')
+        self.assertEqual({problem.kind for problem in problems}, {'full scan', 'temp b-tree'})
+        self.assertEqual(plan_problems('SELECT * FROM core_project WHERE id = 1'), [])
+
+        sql = 'SELECT id FROM core_project WHERE created > %s OR id > %s ORDER BY created, id LIMIT 2'
+        self.assertEqual(plan_problems(sql, (timezone.now(), 1)), [])
+        self.assertEqual([problem.kind for problem in plan_problems(sql, (timezone.now(), 1), index_scans=True)],
+                         ['index scan'])
+
+    def test_hot_routes_use_indexes(self):
+        routes = [
+            ('core:projects', reverse('core:projects') + '?page_size=1'),
+            ('core:project', reverse('core:project', kwargs={'pk': Project.objects.first().pk})),
+            ('authentication:profiles', reverse('authentication:profiles') + '?page_size=1'),
+        ]
+        audits = audit_routes(routes, authenticated=False)
+        # The paginated routes are audited again past a cursor, where their index must be sought and not scanned.
+        self.assertEqual([audit.route for audit in audits],
+                         ['core:projects', 'core:projects', 'core:project', 'authentication:profiles',
+                          'authentication:profiles'])
+        self.assertIn('after=', audits[1].path)
+        for audit in audits:
+            self.assertEqual(audit.problems, [], audit.path)
+
+
+@task(batch_size=10)
+def record_batch(payloads):
+    """ A test task recording the batches it is called with """
+
+    record_batch.batches.append(sorted(payload['pk'] for payload in payloads))
+    if any(payload.get('fail') for payload in payloads):
+        raise RuntimeError('Failing on purpose')
+
+
+class TaskQueueTests(TestCase):
+    """ Tests enqueuing, batching and retrying background tasks """
+
+    def setUp(self):
+        record_batch.batches = []
+
+    def test_jobs_are_deduplicated_and_batched(self):
+        for pk in (1, 2, 1, 3):
+            enqueue('record_batch', {'pk': pk}, dedupe_key=f'record:{pk}')
+        self.assertEqual(Task.objects.count(), 3)
+
+        call_command('run_tasks', '--burst', stdout=StringIO())
+        self.assertEqual(record_batch.batches, [[1, 2, 3]])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASK_MAX_ATTEMPTS=2)
+    def test_failed_jobs_are_retried_with_backoff_then_kept(self):
+        job = enqueue('record_batch', {'pk': 1, 'fail': True})
+        with self.assertLogs('core.task_queue', 'ERROR'):
+            self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('Pending', 1))
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn('Failing on purpose', job.last_error)
+
+        # Nothing is due until the backoff has passed.
+        self.assertEqual(run_pending(), 0)
+        Task.objects.update(run_after=timezone.now())
+        with self.assertLogs('core.task_queue', 'ERROR'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('Failed', 2))
+
+    @override_settings(TASK_MAX_ATTEMPTS=2)
+    def test_jobs_whose_worker_died_are_retried_then_kept(self):
+        job = enqueue('record_batch', {'pk': 1})
+        expired = timezone.now() - timedelta(seconds=1)
+        Task.objects.update(status='Running', attempts=1, locked_until=expired)
+        self.assertEqual(run_pending(), 1)
+        self.assertFalse(Task.objects.exists())
+
+        job = enqueue('record_batch', {'pk': 2})
+        Task.objects.update(status='Running', attempts=2, locked_until=expired)
+        with self.assertLogs('core.task_queue', 'ERROR'):
+            self.assertEqual(run_pending(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('Failed', 2))
+        self.assertEqual(record_batch.batches, [[1]])
+
+
+class ProvisioningTests(TestCase):
+    """ Tests provisioning users in bulk """
+
+    def test_valid_rows_are_created_and_invalid_ones_reported(self):
+        User.objects.create_user(username='taken')
+        rows = StringIO(
+            'username,email,password,first_name,last_name,short_intro\n'
+            'ada,ada@example.com,secret,Ada,Lovelace,Poetical science\n'
+            'taken,,secret,,,\n'
+            'ada,,secret,,,\n'
+            'bad name!,,secret,,,\n'
+            'grace,not-an-email,,,,\n'
+            'alan,,,Alan,Turing,\n'
+        )
+        with CaptureQueriesContext(connection) as context:
+            report = provision_users(iter_rows(rows, 'csv'), batch_size=10, processes=1)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([(line, username) for line, username, _ in report.errors], [
+            (4, 'ada'), (5, 'bad name!'), (6, 'grace'), (3, 'taken'),
+        ])
+        # The usernames of the batch are checked by a single query.
+        self.assertEqual(sum(query['sql'].startswith('SELECT "auth_user"') for query in context.captured_queries), 1)
+
+        ada = User.objects.get(username='ada')
+        self.assertTrue(ada.check_password('secret'))
+        self.assertEqual((ada.get_full_name(), ada.profile.short_intro), ('Ada Lovelace', 'Poetical science'))
+        self.assertFalse(User.objects.get(username='alan').has_usable_password())
+        self.assertEqual(search('lovelace')[0].object, ada.profile)
+
+
+class BlobStorageTests(TestCase):
+    """ Tests storing uploads once per content and deleting them once unreferenced """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, BLOB_GRACE_SECONDS=0))
+
+        buffer = BytesIO()
+        Image.new('RGB', (600, 300), (0, 128, 255)).save(buffer, 'PNG')
+        self.content = buffer.getvalue()
+        self.user = User.objects.create_user(username='author')
+
+    def upload(self, name):
+        project = Project.objects.create(user=self.user, title=name)
+        project.featured_image.save(name, ContentFile(self.content))
+        return project
+
+    def test_identical_uploads_share_a_blob_until_unreferenced(self):
+        first, second = self.upload('screenshot.png'), self.upload('copy.PNG')
+        name = first.featured_image.name
+        self.assertEqual(second.featured_image.name, name)
+        self.assertTrue(name.startswith('blobs/') and name.endswith('.png'))
+        self.assertEqual(len(default_storage.listdir(os.path.dirname(name))[1]), 1)
+        generate_derivatives(name)
+
+        first.delete()
+        run_pending()
+        self.assertTrue(default_storage.exists(name))
+
+        second.featured_image = 'projects/default.jpg'
+        second.save()
+        run_pending()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(default_storage.listdir(derivatives_directory(name))[1])
+
+    def test_blobs_are_served_with_a_far_future_expiry(self):
+        response = serve_blob(
+            RequestFactory().get('/'), self.upload('screenshot.png').featured_image.name[len('blobs/'):],
+            document_root=os.path.join(settings.MEDIA_ROOT, 'blobs'),
+        )
+        self.assertIn('immutable', response['Cache-Control'])
 
-# Create your tests here.
@@ -1,5 +1,6 @@
 """ URL configuration for the 'core' app."""
 
+from django.conf import settings
 from django.urls import path
 
 from core import views
@@ -10,8 +11,16 @@ urlpatterns = [
     path('add-project/', views.AddOrEditProjectView.as_view(), name='add-project'),
     path('edit-project/<str:pk>/', views.AddOrEditProjectView.as_view(), name='edit-project'),
     path('projects/', views.ProjectsView.as_view(), name='projects'),
-    path('project<str:pk>', views.SingleProjectView.as_view(), name='project'),
+    path(
+        'project<str:pk>',
+        (views.AsyncSingleProjectView if settings.ASYNC_VIEWS else views.SingleProjectView).as_view(),
+        name='project'
+    ),
     path('project/<str:pk>/delete', views.DeleteProjectView.as_view(), name='delete-project'),
+    path('project/<str:pk>/reviews', views.ProjectReviewsView.as_view(), name='project-reviews'),
 
-    path('add-review/<str:pk>', views.AddReview.as_view(), name='add-review')
+    path('add-review/<str:pk>', views.AddReview.as_view(), name='add-review'),
+
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('cache-stats/', views.CardCacheStatsView.as_view(), name='cache-stats'),
 ]
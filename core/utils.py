@@ -0,0 +1,194 @@
+"""
+Contains utility functions for maintaining the denormalized vote counters and ranking scores of projects and the
+activity stats of profiles.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Now
+
+from authentication.models import Profile
+from core.models import Project, Review
+from core.ranking import trending_shift, trending_weight, trending_weight_expression, wilson_expression
+
+
+def vote_deltas(vote, sign=1, created=None):
+    """
+    Returns the counter changes caused by adding (sign=1) or removing (sign=-1) a review with the given vote.
+
+    ``created`` is when the review was written, it sets the weight of the review in the trending score, an expression
+    reading the current shift of the trending epoch (see core.ranking).
+    """
+
+    return {
+        'up_votes': sign if vote == 'Up' else 0,
+        'down_votes': sign if vote == 'Down' else 0,
+        'review_count': sign,
+        'trending_score': sign * trending_weight_expression(vote, created),
+    }
+
+
+COUNTERS = ('up_votes', 'down_votes', 'review_count')
+
+
+def shifted(field, delta):
+    """ Returns the expression adding ``delta`` to a counter, clamped at zero when counting down """
+
+    return F(field) + delta if delta > 0 else Greatest(F(field) + delta, Value(0))
+
+
+def apply_vote_deltas(project_id, deltas):
+    """
+    Atomically applies the counter changes to the project using a single UPDATE statement.
+
+    Counters never go below zero. The Wilson score is rewritten by the same statement from the new vote counts, so it
+    never needs all the reviews, and ``modified`` is bumped since the counters are part of what the project shows.
+    """
+
+    changes = {
+        field: shifted(field, delta) if field in COUNTERS else F(field) + delta
+        for field, delta in deltas.items() if delta
+    }
+    if project_id is None or not changes:
+        return
+    if deltas.get('up_votes') or deltas.get('down_votes'):
+        changes['wilson_score'] = wilson_expression(
+            changes.get('up_votes', F('up_votes')),
+            changes.get('down_votes', F('down_votes')),
+        )
+    Project.objects.filter(pk=project_id).update(modified=Now(), **changes)
+
+
+def _review_count_subquery(**filters):
+    """ Returns a subquery counting the reviews of the outer project that match the given filters """
+
+    reviews = (
+        Review.objects
+        .filter(project=OuterRef('pk'), **filters)
+        .order_by()
+        .values('project')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(reviews, output_field=IntegerField()), Value(0))
+
+
+def recompute_trending_scores(queryset, batch_size=1000):
+    """ Recomputes the trending scores of the given projects by streaming through their reviews """
+
+    scores = {}
+    shift = trending_shift()
+    reviews = Review.objects.filter(project__in=queryset).values_list('project_id', 'vote', 'created')
+    for project_id, vote, created in reviews.iterator(chunk_size=batch_size * 10):
+        scores[project_id] = scores.get(project_id, 0.0) + trending_weight(vote, created, shift)
+
+    queryset.update(trending_score=0.0)
+    Project.objects.bulk_update(
+        [Project(pk=project_id, trending_score=score) for project_id, score in scores.items()],
+        ['trending_score'],
+        batch_size=batch_size,
+    )
+
+
+def recompute_vote_counters(queryset=None):
+    """
+    Recomputes the vote counters and the ranking scores of the given projects (all projects by default).
+
+    The counters and the Wilson score are rewritten by set-based UPDATEs, so drift can be repaired without loading
+    any projects, and the trending scores are summed up from a single pass over the reviews.
+    Returns the number of projects updated.
+    """
+
+    if queryset is None:
+        queryset = Project.objects.all()
+
+    with transaction.atomic():
+        updated = queryset.update(
+            up_votes=_review_count_subquery(vote='Up'),
+            down_votes=_review_count_subquery(vote='Down'),
+            review_count=_review_count_subquery(),
+        )
+        queryset.update(wilson_score=wilson_expression())
+        recompute_trending_scores(queryset)
+    return updated
+
+
+def received_vote_deltas(vote, sign=1):
+    """ Returns the changes of the votes received by the author of a project when a review is added or removed """
+
+    return {
+        'up_votes_received': sign if vote == 'Up' else 0,
+        'down_votes_received': sign if vote == 'Down' else 0,
+    }
+
+
+def _per_user(queryset, user_field, aggregate):
+    """ Returns a subquery aggregating the rows of the queryset belonging to the user of the outer profile """
+
+    rows = (
+        queryset
+        .filter(**{user_field: OuterRef('user')})
+        .order_by()
+        .values(user_field)
+        .annotate(value=aggregate)
+        .values('value')
+    )
+    return Subquery(rows)
+
+
+def last_activity_expression():
+    """ Returns the latest of the creation of a profile and of the projects and reviews of its user """
+
+    return Greatest(
+        'created',
+        Coalesce(_per_user(Project.objects.all(), 'user', Max('created')), 'created'),
+        Coalesce(_per_user(Review.objects.all(), 'user', Max('created')), 'created'),
+    )
+
+
+def apply_profile_deltas(user_id, deltas, activity=None, recompute_activity=False):
+    """
+    Atomically applies the stats changes to the profile of a user using a single UPDATE statement.
+
+    ``user_id`` may be a subquery. The counts never go below zero. The last activity is moved forward to ``activity``,
+    or recomputed when something was deleted, and ``modified`` is bumped since the stats are part of what the profile
+    shows.
+    """
+
+    changes = {field: shifted(field, delta) for field, delta in deltas.items() if delta}
+    if activity is not None:
+        changes['last_activity'] = Greatest('last_activity', Value(activity))
+    if recompute_activity:
+        changes['last_activity'] = last_activity_expression()
+    if user_id is None or not changes:
+        return
+    Profile.objects.filter(user_id=user_id).update(modified=Now(), **changes)
+
+
+def apply_received_vote_deltas(project_id, deltas):
+    """ Applies the changes of the votes received to the profile of the author of a project """
+
+    if project_id is not None:
+        apply_profile_deltas(Subquery(Project.objects.filter(pk=project_id).values('user_id')[:1]), deltas)
+
+
+def recompute_profile_stats(queryset=None):
+    """
+    Recomputes the activity stats of the given profiles (all profiles by default) with a single set-based UPDATE.
+
+    Returns the number of profiles updated.
+    """
+
+    if queryset is None:
+        queryset = Profile.objects.all()
+
+    def count(queryset, user_field):
+        return Coalesce(_per_user(queryset, user_field, Count('pk')), Value(0))
+
+    return queryset.update(
+        project_count=count(Project.objects.all(), 'user'),
+        reviews_written=count(Review.objects.all(), 'user'),
+        up_votes_received=count(Review.objects.filter(vote='Up'), 'project__user'),
+        down_votes_received=count(Review.objects.filter(vote='Down'), 'project__user'),
+        last_activity=last_activity_expression(),
+    )
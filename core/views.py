@@ -1,14 +1,32 @@
 """ This module contains Django views for handling project-related actions """
 
 from django.contrib import messages
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render, reverse
 from django.urls import reverse_lazy
+from django.utils.cache import patch_cache_control
 from django.views import View
-from django.views.generic import CreateView, DeleteView, DetailView, ListView
+from django.views.generic import CreateView, DeleteView, DetailView, ListView, TemplateView
+from django.views.static import serve
 
+from core.card_cache import get_stats
+from core.concurrency import arender, gather_reads
+from core.conditional import ConditionalPageMixin, page_validator, project_last_modified
 from core.forms import ProjectForm, ReviewForm
-from core.models import Project, Review
+from core.images import schedule_derivatives
+from core.models import Project, Review, SimilarProject
+from core.pagination import KeysetPaginationMixin, KeysetPaginator, KeysetSortMixin
+from core.ranking import SORT_ORDERINGS
+from core.search import search
+from core.skill_index import SkillFilterMixin
+
+
+def review_page(project_id, params):
+    """ Returns a page of the reviews of a project with their authors and profiles joined in, one query per page """
+
+    reviews = Review.objects.filter(project_id=project_id).select_related('user__profile')
+    return KeysetPaginator(reviews, prefix='reviews_').get_page(params)
 
 
 class AddOrEditProjectView(LoginRequiredMixin, View):
@@ -40,14 +58,15 @@ class AddOrEditProjectView(LoginRequiredMixin, View):
             project = get_object_or_404(Project, pk=pk, user=user)
             form = ProjectForm(request.POST, request.FILES, instance=project)
         else:
-            form = ProjectForm(request.POST)
+            form = ProjectForm(request.POST, request.FILES)
 
         if form.is_valid():
             project = form.save(commit=False)
             project.user = user
             project.save()
-            tags_ids = request.POST.getlist('skills')
-            project.skills.set(tags_ids)
+            project.skills.set(form.cleaned_data['skills'])
+            if 'featured_image' in form.changed_data:
+                schedule_derivatives(project, 'featured_image')
             messages.success(request, 'Project added/edited!')
             return redirect(reverse('core:project', kwargs={'pk': project.id}))
 
@@ -87,37 +106,146 @@ class AddReview(LoginRequiredMixin, CreateView):
         return reverse('core:project', args=[self.kwargs['pk']])
 
 
-class ProjectsView(ListView):
-    """ A view to display list of projects """
+class ProjectsView(SkillFilterMixin, KeysetSortMixin, KeysetPaginationMixin, ListView):
+    """
+    A view to display list of projects.
+
+    ``?sort=top`` ranks the projects by their Wilson score and ``?sort=trending`` by their trending score, both walked
+    through an index on the score.
+    """
 
     page = 'Projects'
     model = Project
     template_name = 'core/projects.html'
     context_object_name = 'projects'
+    skill_index_kind = 'project'
+    queryset = Project.objects.for_cards()
+    sort_orderings = SORT_ORDERINGS
+    sort_labels = (('', 'Newest'), ('top', 'Top rated'), ('trending', 'Trending'))
 
 
-class SingleProjectView(DetailView):
-    """ A view to display a specific project """
+class SingleProjectView(ConditionalPageMixin, DetailView):
+    """ A view to display a specific project, answering with a 304 when the client's copy is current """
 
-    model = Project
+    queryset = Project.objects.select_related('user')
     template_name = 'core/single_project.html'
     context_object_name = 'project'
 
+    def get_last_modified(self):
+        return project_last_modified(self.kwargs['pk'])
+
     def get_context_data(self, **kwargs):
 
         context = super().get_context_data(**kwargs)
-        project = self.get_object()
-        context['project'] = project
+        project = self.object
         context['page'] = project.title
         context['tags'] = project.skills.all()
-        context['reviews'] = project.review_set.all()
-        context['user_reviewed'] = Review.objects.filter(project=project, user_id=self.request.user.pk).exists()
-        up_votes = Review.objects.filter(project=project, vote='Up').count()
-        try:
-            ratio = (up_votes * 100) // Review.objects.filter(project=project).count()
-        except ZeroDivisionError:
-            ratio = 0
-
-        context['votes_ratio'] = ratio
+        context['reviews'] = review_page(project.pk, self.request.GET)
+        context['user_reviewed'] = (
+            self.request.user.is_authenticated
+            and Review.objects.filter(project=project, user_id=self.request.user.pk).exists()
+        )
+        context['votes_ratio'] = project.votes_ratio
+        context['similar_projects'] = project.similar_projects.select_related('similar__user')
         context['form'] = ReviewForm()
         return context
+
+
+class AsyncSingleProjectView(View):
+    """
+    An async version of SingleProjectView for ASGI deployments.
+
+    The project, its skills, the page of reviews and the review check of the current user are independent reads, so
+    they are issued concurrently instead of one after another, once the validator shows the client's copy is stale.
+    """
+
+    async def get(self, request, pk):
+        """ Handle HTTP GET request for a project page """
+
+        [validator] = await gather_reads(lambda: page_validator(request, project_last_modified(pk)))
+        if validator is None:
+            raise Http404('No project found matching the query')
+        response = validator.not_modified()
+        if response is not None:
+            return response
+
+        skills = Project.skills.through.objects.filter(project_id=pk).select_related('skill').order_by('sort_value')
+        similar = SimilarProject.objects.filter(project_id=pk).select_related('similar__user')
+        project, tags, reviews, user_reviewed, similar_projects = await gather_reads(
+            lambda: Project.objects.select_related('user').filter(pk=pk).first(),
+            lambda: [row.skill for row in skills],
+            lambda: review_page(pk, request.GET),
+            lambda: (
+                request.user.is_authenticated
+                and Review.objects.filter(project_id=pk, user_id=request.user.pk).exists()
+            ),
+            lambda: list(similar),
+        )
+        if project is None:
+            raise Http404('No project found matching the query')
+
+        context = {
+            'project': project,
+            'page': project.title,
+            'tags': tags,
+            'reviews': reviews,
+            'user_reviewed': user_reviewed,
+            'votes_ratio': project.votes_ratio,
+            'similar_projects': similar_projects,
+            'form': ReviewForm(),
+        }
+        return validator.finalize(await arender(request, 'core/single_project.html', context))
+
+
+class ProjectReviewsView(View):
+    """ A view serving a page of the review thread of a project as an HTML fragment, for loading more reviews """
+
+    def get(self, request, pk):
+        """ Returns the page selected by the ``reviews_after`` cursor """
+
+        validator = page_validator(request, project_last_modified(pk))
+        if validator is None:
+            raise Http404('No project found matching the query')
+        response = validator.not_modified()
+        if response is not None:
+            return response
+
+        context = {'reviews': review_page(pk, request.GET), 'project_id': pk}
+        return validator.finalize(render(request, 'core/_review_page.html', context))
+
+
+class SearchView(TemplateView):
+    """ A view to search projects and profiles by their text, author names and skills """
+
+    template_name = 'core/search.html'
+    results_limit = 30
+
+    def get_context_data(self, **kwargs):
+
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['page'] = 'Search'
+        context['query'] = query
+        context['results'] = search(query, limit=self.results_limit) if query else []
+        return context
+
+
+class CardCacheStatsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """ A view exposing the hit and miss counters of the card cache, summed over all processes, to staff users """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        """ Returns the counters as JSON """
+
+        return JsonResponse(get_stats())
+
+
+def serve_blob(request, path, document_root=None):
+    """ Serves a stored image in development, with a far future expiry since its name changes with its content """
+
+    response = serve(request, path, document_root=document_root)
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    return response
+